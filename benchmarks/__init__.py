@@ -0,0 +1 @@
+"""Seibot benchmarks"""
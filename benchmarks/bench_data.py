@@ -0,0 +1,51 @@
+"""Spectral estimation benchmarks"""
+import seibot.spectral
+
+from . import synthetic
+
+
+class SpectraSuite:
+    """Welch ASD and coherence of synthetic time series"""
+    params = [[1024, 3072], [8, 256], [1, -1]]
+    param_names = ["duration", "fs", "workers"]
+
+    def setup(self, duration, fs, workers):
+        self.data = synthetic.make_data(
+            synthetic.get_frequency(), workers=workers)
+        self.ts_seismometer = synthetic.make_seismometer_time_series(
+            duration, fs)
+        self.ts_gs13 = synthetic.make_gs13_time_series(duration, fs)
+
+    def time_ts2asd(self, duration, fs, workers):
+        self.data.ts2asd(self.ts_seismometer, fs)
+
+    def time_ts2coh(self, duration, fs, workers):
+        self.data.ts2coh(self.ts_seismometer, self.ts_gs13, fs, fs)
+
+
+class ChunkedSpectraSuite:
+    """Chunk-accumulated ASDs and coherence of synthetic time series"""
+    params = [[1024, 3072], [8, 256], [64]]
+    param_names = ["duration", "fs", "chunk"]
+
+    def setup(self, duration, fs, chunk):
+        self.ts_seismometer = synthetic.make_seismometer_time_series(
+            duration, fs)
+        self.ts_gs13 = synthetic.make_gs13_time_series(duration, fs)
+
+    def estimate(self, duration, fs, chunk):
+        spectra = seibot.spectral.SpectralEstimator(
+            {"seismometer": fs, "gs13": fs}, duration, 5, 0.5,
+            asd=["seismometer", "gs13"], coherence=[("seismometer", "gs13")])
+        n = int(chunk * fs)
+        for k in range(0, len(self.ts_seismometer), n):
+            spectra.feed({"seismometer": self.ts_seismometer[k:k+n],
+                          "gs13": self.ts_gs13[k:k+n]})
+        spectra.flush()
+        return spectra
+
+    def time_estimate(self, duration, fs, chunk):
+        self.estimate(duration, fs, chunk)
+
+    def peakmem_estimate(self, duration, fs, chunk):
+        self.estimate(duration, fs, chunk)
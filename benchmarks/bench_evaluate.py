@@ -0,0 +1,46 @@
+"""Evaluate benchmarks on stand-in filter pools"""
+from . import synthetic
+
+
+class EvaluateSuite:
+    """Displacement matrix and RMS queries across pool sizes"""
+    params = [[4, 16], [8, 32], [1024]]
+    param_names = ["n_sc", "n_blend", "num"]
+
+    def setup(self, n_sc, n_blend, num):
+        self.evaluate = synthetic.make_evaluate(n_sc, n_blend, num)
+
+    def clear_cache(self):
+        # Setting the displacement matrix drops the cached RMS values.
+        self.evaluate.displacement_matrix = self.evaluate.displacement_matrix
+
+    def time_get_displacement_matrix(self, n_sc, n_blend, num):
+        self.evaluate.get_displacement_matrix()
+
+    def time_get_rms_matrix(self, n_sc, n_blend, num):
+        self.clear_cache()
+        self.evaluate.get_rms_matrix()
+
+    def time_get_band_rms_table(self, n_sc, n_blend, num):
+        self.clear_cache()
+        self.evaluate.get_band_rms_table()
+
+    def time_min_rms_displacement(self, n_sc, n_blend, num):
+        self.clear_cache()
+        self.evaluate.min_rms_displacement()
+
+    def time_min_rms_velocity(self, n_sc, n_blend, num):
+        self.clear_cache()
+        self.evaluate.min_rms_velocity()
+
+    def time_threshold_optimize(self, n_sc, n_blend, num):
+        self.clear_cache()
+        self.evaluate.threshold_optimize(
+            1e9, 1e9, 0.1, 0.5, "displacement")
+
+    def time_threshold_optimize_cached(self, n_sc, n_blend, num):
+        self.evaluate.threshold_optimize(
+            1e9, 1e9, 0.1, 0.5, "displacement")
+
+    def peakmem_get_displacement_matrix(self, n_sc, n_blend, num):
+        self.evaluate.get_displacement_matrix()
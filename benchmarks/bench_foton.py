@@ -0,0 +1,50 @@
+"""Foton parsing and filter pool benchmarks"""
+import shutil
+import tempfile
+
+import seibot.filter
+import seibot.foton
+
+from . import synthetic
+
+
+class FotonSuite:
+    """Parse synthetic foton files"""
+    params = [[10, 100], [4, 10]]
+    param_names = ["n_modules", "n_fm"]
+
+    def setup(self, n_modules, n_fm):
+        self.directory = tempfile.mkdtemp()
+        self.path = f"{self.directory}/synthetic_foton.txt"
+        self.modules = synthetic.make_foton_file(self.path, n_modules, n_fm)
+        self.foton = seibot.foton.Foton(self.path)
+        self.fm_list = list(range(1, n_fm+1))
+
+    def teardown(self, n_modules, n_fm):
+        shutil.rmtree(self.directory)
+
+    def time_parse(self, n_modules, n_fm):
+        seibot.foton.Foton(self.path)
+
+    def time_get_filter_tf(self, n_modules, n_fm):
+        self.foton.get_filter_tf(self.modules[0], self.fm_list)
+
+
+class FilterPoolSuite:
+    """Build filter pools from synthetic foton files"""
+    params = [[10, 50], [512, 1024]]
+    param_names = ["n_filters", "num"]
+
+    def setup(self, n_filters, num):
+        self.directory = tempfile.mkdtemp()
+        _, self.filter_config = synthetic.make_foton_pool_files(
+            self.directory, n_filters)
+        self.f = synthetic.get_frequency(num)
+
+    def teardown(self, n_filters, num):
+        shutil.rmtree(self.directory)
+
+    def time_filter_pool(self, n_filters, num):
+        # The registry would otherwise serve every build after the first.
+        seibot.filter.registry.clear()
+        seibot.filter.FilterPool(self.f, self.filter_config)
@@ -0,0 +1,270 @@
+"""Scaling of Evaluate with pool size and frequency resolution
+
+Sweeps the number of sensor correction filters, the number of blends
+and the number of frequency points with stand-in filter pools,
+and records wall time and peak traced memory of each stage.
+
+Usage::
+
+    python -m benchmarks.scaling --n-sc 2 4 8 --n-blend 4 8 --num 512 1024
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+
+import seibot.evaluate
+import seibot.filter
+
+from . import synthetic
+
+
+# Criteria timed with cold RMS caches, keyed by name.
+criteria = {
+    "min_rms_displacement": lambda evaluate: evaluate.min_rms_displacement(),
+    "min_rms_velocity": lambda evaluate: evaluate.min_rms_velocity(),
+    "threshold_optimize": lambda evaluate: evaluate.threshold_optimize(
+        np.inf, np.inf, 0.1, 0.5, "displacement"),
+    "band_rms_table": lambda evaluate: evaluate.get_band_rms_table(),
+}
+
+
+def measure(function, repeat=3):
+    """Measure wall time and peak traced memory of a function
+
+    Time and memory are measured in separate calls as tracing
+    slows down allocations.
+
+    Parameters
+    ----------
+    function : callable
+        Function without arguments.
+    repeat : int, optional
+        Number of timed calls.
+        Defaults 3.
+
+    Returns
+    -------
+    result
+        Return value of the last call.
+    wall_time : float
+        The minimum wall time in seconds.
+    peak_memory : int
+        The peak traced memory in bytes.
+    """
+    wall_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        wall_times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, min(wall_times), peak_memory
+
+
+def run_point(n_sc, n_blend, num, repeat=3):
+    """Measure all stages at one point of the sweep
+
+    Parameters
+    ----------
+    n_sc : int
+        Number of sensor correction filters.
+    n_blend : int
+        Number of blends.
+    num : int
+        Number of frequency points.
+    repeat : int, optional
+        Number of timed calls of each stage.
+        Defaults 3.
+
+    Returns
+    -------
+    dict
+        Wall time (s) and peak memory (bytes) of each stage.
+    """
+    f = synthetic.get_frequency(num)
+    seismic_noise = synthetic.get_seismic_asd(f)
+    stages = {}
+
+    def record(stage, function):
+        result, wall_time, peak_memory = measure(function, repeat)
+        stages[stage] = {"wall_time": wall_time, "peak_memory": peak_memory}
+        return result
+
+    pools = record(
+        "filter_pools",
+        lambda: synthetic.make_filter_pools(f, n_sc, n_blend))
+    isolation_system = record(
+        "isolation_system", lambda: synthetic.make_isolation_system(f))
+    filter_configurations = seibot.filter.FilterConfigurations(*pools)
+    evaluate = record(
+        "evaluate",
+        lambda: seibot.evaluate.Evaluate(
+            isolation_system, filter_configurations, f, seismic_noise))
+    record("displacement_matrix", evaluate.get_displacement_matrix)
+
+    for name, criterion in criteria.items():
+        def cold(criterion=criterion):
+            # Setting the displacement matrix drops the cached RMS values.
+            evaluate.displacement_matrix = evaluate.displacement_matrix
+            return criterion(evaluate)
+        record(name, cold)
+
+    return {
+        "n_sc": n_sc,
+        "n_blend": n_blend,
+        "num": num,
+        "displacement_matrix_bytes": evaluate.displacement_matrix.nbytes,
+        "stages": stages,
+    }
+
+
+def run(n_sc_list, n_blend_list, num_list, repeat=3, verbose=True):
+    """Sweep pool sizes and frequency resolutions
+
+    Parameters
+    ----------
+    n_sc_list : list of int
+        Numbers of sensor correction filters.
+    n_blend_list : list of int
+        Numbers of blends.
+    num_list : list of int
+        Numbers of frequency points.
+    repeat : int, optional
+        Number of timed calls of each stage.
+        Defaults 3.
+    verbose : bool, optional
+        Print progress.
+        Defaults True.
+
+    Returns
+    -------
+    dict
+        The report.
+    """
+    results = []
+    for n_sc, n_blend, num in itertools.product(
+            n_sc_list, n_blend_list, num_list):
+        point = run_point(n_sc, n_blend, num, repeat)
+        results.append(point)
+        if verbose:
+            stages = point["stages"]
+            print(f"n_sc={n_sc} n_blend={n_blend} num={num}: "
+                  f"evaluate {stages['evaluate']['wall_time']:.3g} s, "
+                  f"{stages['evaluate']['peak_memory']/2**20:.3g} MiB")
+
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "stages": list(results[0]["stages"]) if results else [],
+        "results": results,
+    }
+    return report
+
+
+def plot(report, directory):
+    """Plot wall time and peak memory against the number of configurations
+
+    Parameters
+    ----------
+    report : dict
+        The report from `run`.
+    directory : str
+        Output directory of the plots.
+
+    Returns
+    -------
+    paths : list of str
+        Paths of the plots.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    results = report["results"]
+    nums = sorted({result["num"] for result in results})
+    paths = []
+    for quantity, ylabel, scale in [
+            ("wall_time", "Wall time (s)", 1),
+            ("peak_memory", "Peak memory (MiB)", 1/2**20)]:
+        stages = report["stages"]
+        n_cols = 3
+        n_rows = int(np.ceil(len(stages)/n_cols))
+        fig, axes = plt.subplots(
+            n_rows, n_cols, figsize=(4*n_cols, 3*n_rows), squeeze=False)
+        for ax, stage in zip(axes.ravel(), stages):
+            for num in nums:
+                points = sorted(
+                    (result["n_sc"]*result["n_blend"],
+                     result["stages"][stage][quantity]*scale)
+                    for result in results if result["num"] == num)
+                x, y = zip(*points)
+                ax.loglog(x, y, "o-", label=f"num={num}")
+            ax.set_title(stage)
+            ax.set_xlabel("Number of configurations")
+            ax.set_ylabel(ylabel)
+            ax.grid(which="both", alpha=0.3)
+        for ax in axes.ravel()[len(stages):]:
+            ax.set_visible(False)
+        axes[0, 0].legend(loc=0)
+        fig.tight_layout()
+        path = os.path.join(directory, f"scaling_{quantity}.png")
+        fig.savefig(path)
+        plt.close(fig)
+        paths.append(path)
+
+    return paths
+
+
+def main():
+    """Command line interface"""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.scaling",
+        description="Scaling of Evaluate with pool size and "
+                    "frequency resolution.")
+    parser.add_argument(
+        "--n-sc", type=int, nargs="+", default=[2, 4, 8, 16],
+        help="Numbers of sensor correction filters.")
+    parser.add_argument(
+        "--n-blend", type=int, nargs="+", default=[4, 8, 16, 32],
+        help="Numbers of blends.")
+    parser.add_argument(
+        "--num", type=int, nargs="+", default=[256, 1024, 4096],
+        help="Numbers of frequency points.")
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="Number of timed calls of each stage.")
+    parser.add_argument(
+        "-o", "--output", default="scaling_report",
+        help="Output directory of the JSON report and plots.")
+    parser.add_argument(
+        "--no-plot", action="store_true",
+        help="Only write the JSON report.")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    report = run(args.n_sc, args.n_blend, args.num, args.repeat)
+    path = os.path.join(args.output, "scaling.json")
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Report written to {path}")
+    if not args.no_plot:
+        for path in plot(report, args.output):
+            print(f"Plot written to {path}")
+
+
+if __name__ == "__main__":
+    main()
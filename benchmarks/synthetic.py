@@ -0,0 +1,480 @@
+"""Synthetic inputs for benchmarks
+
+Everything here is generated locally so that benchmarks run
+without CDS access.
+"""
+import configparser
+import os
+
+import control
+import numpy as np
+import scipy.signal
+
+import seibot.data
+import seibot.evaluate
+import seibot.filter
+import seibot.isolation_system
+
+
+def get_frequency(num=1024, start=-3, end=2):
+    """Logarithmic frequency array as in the Seibot configuration
+
+    Parameters
+    ----------
+    num : int, optional
+        Number of frequency points.
+        Defaults 1024.
+    start : float, optional
+        log10 of the first frequency.
+        Defaults -3.
+    end : float, optional
+        log10 of the last frequency.
+        Defaults 2.
+
+    Returns
+    -------
+    f : array
+        Frequency array.
+    """
+    return np.logspace(start, end, num)
+
+
+def get_zpk_stage(rng, max_order=2):
+    """Random stable zero-pole-gain stage
+
+    Parameters
+    ----------
+    rng : numpy.random.Generator
+        Random number generator.
+    max_order : int, optional
+        Maximum number of zeros and poles.
+        Defaults 2.
+
+    Returns
+    -------
+    zeros : array
+        Zeros in Hz, foton "n" convention.
+    poles : array
+        Poles in Hz, foton "n" convention.
+    gain : float
+        DC gain.
+    """
+    order = rng.integers(1, max_order+1)
+    zeros = 10**rng.uniform(-2, 1, order)
+    poles = 10**rng.uniform(-2, 1, order)
+    gain = 1.
+    return zeros, poles, gain
+
+
+def get_sos(zeros, poles, gain, fs):
+    """Discretize a foton "n" zpk stage into foton SOS coefficients
+
+    Parameters
+    ----------
+    zeros : array
+        Zeros in Hz.
+    poles : array
+        Poles in Hz.
+    gain : float
+        DC gain.
+    fs : float
+        Sampling frequency.
+
+    Returns
+    -------
+    sos_gain : float
+        Overall gain.
+    coefficients : array
+        (a1, a2, b1, b2) of each second-order section.
+    """
+    zeros_s = -2*np.pi*np.asarray(zeros)
+    poles_s = -2*np.pi*np.asarray(poles)
+    gain_s = gain * np.prod(poles_s) / np.prod(zeros_s)
+    z, p, k = scipy.signal.bilinear_zpk(zeros_s, poles_s, gain_s, fs)
+    sos = scipy.signal.zpk2sos(z, p, k)
+    sos_gain = np.prod(sos[:, 0])
+    coefficients = np.column_stack([
+        sos[:, 4], sos[:, 5], sos[:, 1]/sos[:, 0], sos[:, 2]/sos[:, 0]])
+    return sos_gain, coefficients
+
+
+def format_roots(roots):
+    """Format roots for a foton design string"""
+    return ";".join(f"{root:.6g}" for root in roots)
+
+
+def make_foton_file(path, n_modules=10, n_fm=10, fs=4096, prefix="SYN",
+                    seed=0):
+    """Write a synthetic foton file
+
+    Parameters
+    ----------
+    path : str
+        Path of the output foton file.
+    n_modules : int, optional
+        Number of filter modules.
+        Defaults 10.
+    n_fm : int, optional
+        Number of FMs in each module, at most 10.
+        Defaults 10.
+    fs : float, optional
+        Sampling frequency.
+        Defaults 4096.
+    prefix : str, optional
+        Prefix of the module names.
+        Defaults "SYN".
+    seed : int, optional
+        Seed of the random filters.
+        Defaults 0.
+
+    Returns
+    -------
+    modules : list of str
+        Names of the filter modules.
+    """
+    if not 1 <= n_fm <= 10:
+        raise ValueError("n_fm must be between 1 and 10.")
+    rng = np.random.default_rng(seed)
+    modules = [f"{prefix}_FILT{i+1}" for i in range(n_modules)]
+
+    lines = [
+        "# FILTERS FOR ONLINE SYSTEM",
+        "#",
+        "# Computer generated file: DO NOT EDIT",
+        "#",
+    ]
+    for i in range(0, n_modules, 3):
+        lines.append("# MODULES " + " ".join(modules[i:i+3]))
+    lines += ["#", f"# SAMPLING RATE {fs}", "#"]
+
+    for module in modules:
+        lines += [
+            "#"*80,
+            f"### {module:<72} ###",
+            "#"*80,
+        ]
+        sections = []
+        for fm in range(n_fm):
+            zeros, poles, gain = get_zpk_stage(rng)
+            lines.append(
+                f"# DESIGN   {module} {fm} zpk([{format_roots(zeros)}],"
+                f"[{format_roots(poles)}],{gain:g},\"n\")")
+            sections.append((fm, *get_sos(zeros, poles, gain, fs)))
+        lines.append(f"### {'':<72} ###")
+        for fm, sos_gain, coefficients in sections:
+            rows = [
+                "  ".join(f"{c:20.16f}" for c in row) for row in coefficients]
+            lines.append(
+                f"{module} {fm} 21 {len(rows)}      0      0 FM{fm+1:<8} "
+                f"{sos_gain:.24e}  {rows[0]}")
+            lines += [" "*65 + row for row in rows[1:]]
+        lines.append("")
+
+    with open(path, "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+    return modules
+
+
+def make_filter_config(path, filter_file, modules, fm_lists):
+    """Write a filter pool configuration file
+
+    Parameters
+    ----------
+    path : str
+        Path of the output configuration file.
+    filter_file : str
+        Path of the foton file.
+    modules : list of str
+        Filter module of each filter.
+    fm_lists : list of list of int
+        Engaged FMs of each filter.
+    """
+    config = configparser.ConfigParser()
+    config.optionxform = str
+    for i, (module, fm) in enumerate(zip(modules, fm_lists)):
+        config[f"filter_{i}"] = {
+            "filter_file": os.path.abspath(filter_file),
+            "module": module,
+            "fm": ", ".join(str(fm_) for fm_ in fm),
+        }
+    with open(path, "w") as file:
+        config.write(file)
+
+
+def make_foton_pool_files(directory, n_filters, n_fm=10, n_engaged=2,
+                          seed=0):
+    """Write a synthetic foton file and a filter pool configuration
+
+    Parameters
+    ----------
+    directory : str
+        Output directory.
+    n_filters : int
+        Number of filters in the pool.
+    n_fm : int, optional
+        Number of FMs in each module.
+        Defaults 10.
+    n_engaged : int, optional
+        Number of engaged FMs of each filter.
+        Defaults 2.
+    seed : int, optional
+        Seed of the random filters.
+        Defaults 0.
+
+    Returns
+    -------
+    filter_file : str
+        Path of the foton file.
+    filter_config : str
+        Path of the filter pool configuration file.
+    """
+    rng = np.random.default_rng(seed)
+    filter_file = os.path.join(directory, "synthetic_foton.txt")
+    filter_config = os.path.join(directory, "synthetic_filters.ini")
+    modules = make_foton_file(filter_file, n_filters, n_fm, seed=seed)
+    fm_lists = [
+        sorted(rng.choice(np.arange(1, n_fm+1), n_engaged, replace=False))
+        for _ in modules]
+    make_filter_config(filter_config, filter_file, modules, fm_lists)
+    return filter_file, filter_config
+
+
+def get_seismic_asd(f):
+    """Seismic noise ASD with a secondary microseism peak (m/rtHz)"""
+    f = np.asarray(f, dtype=float)
+    f = np.where(f > 0, f, np.inf)
+    background = 1e-9 * (0.1/f)**2 + 1e-11
+    microseism = 3e-7 / (1 + ((f-0.15)/0.05)**2)
+    return background + microseism
+
+
+def get_gs13_noise_asd(f):
+    """GS13 sensor noise ASD (m/rtHz)"""
+    f = np.asarray(f, dtype=float)
+    f = np.where(f > 0, f, np.inf)
+    return 1e-12 * (1/f)**3.5 + 1e-12
+
+
+def make_time_series(asd, duration, fs, seed=0):
+    """Gaussian time series with a given ASD
+
+    Parameters
+    ----------
+    asd : callable
+        One-sided amplitude spectral density as a function of frequency.
+    duration : float
+        Duration in seconds.
+    fs : float
+        Sampling frequency.
+    seed : int, optional
+        Random seed.
+        Defaults 0.
+
+    Returns
+    -------
+    ts : array
+        Time series.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(duration*fs)
+    f = np.fft.rfftfreq(n, 1/fs)
+    white = rng.standard_normal(len(f)) + 1j*rng.standard_normal(len(f))
+    spectrum = white * asd(f) * np.sqrt(n*fs/4)
+    spectrum[0] = 0
+    ts = np.fft.irfft(spectrum, n)
+    return ts
+
+
+def make_seismometer_time_series(duration, fs=8, seed=0):
+    """Synthetic seismometer time series
+
+    Parameters
+    ----------
+    duration : float
+        Duration in seconds.
+    fs : float, optional
+        Sampling frequency.
+        Defaults 8.
+    seed : int, optional
+        Random seed.
+        Defaults 0.
+
+    Returns
+    -------
+    ts : array
+        Time series.
+    """
+    return make_time_series(get_seismic_asd, duration, fs, seed)
+
+
+def make_gs13_time_series(duration, fs=8, seed=1, seismic_seed=0):
+    """Synthetic GS13 time series, the seismic motion plus sensor noise
+
+    Parameters
+    ----------
+    duration : float
+        Duration in seconds.
+    fs : float, optional
+        Sampling frequency.
+        Defaults 8.
+    seed : int, optional
+        Random seed of the sensor noise.
+        Defaults 1.
+    seismic_seed : int, optional
+        Random seed of the seismic motion, shared with the seismometer
+        time series for coherent signals.
+        Defaults 0.
+
+    Returns
+    -------
+    ts : array
+        Time series.
+    """
+    seismic = make_time_series(get_seismic_asd, duration, fs, seismic_seed)
+    noise = make_time_series(get_gs13_noise_asd, duration, fs, seed)
+    return seismic + noise
+
+
+def make_data(f, n_average=5, overlap=0.5, workers=1):
+    """Data instance for spectral estimation without fetching data
+
+    Parameters
+    ----------
+    f : array
+        Frequency array.
+    n_average : int, optional
+        Number of Welch averages.
+        Defaults 5.
+    overlap : float, optional
+        Welch overlap.
+        Defaults 0.5.
+    workers : int, optional
+        Number of FFT worker threads, -1 for all cores.
+        Defaults 1.
+
+    Returns
+    -------
+    data : seibot.data.Data
+        Data instance with only the spectral estimation attributes set.
+    """
+    data = seibot.data.Data.__new__(seibot.data.Data)
+    data.f = f
+    data.n_average = n_average
+    data.overlap = overlap
+    data.workers = workers
+    return data
+
+
+def make_filter_pools(f, n_sc, n_blend, order=3):
+    """Stand-in filter pools that do not need foton
+
+    Parameters
+    ----------
+    f : array
+        Frequency array.
+    n_sc : int
+        Number of sensor correction filters.
+    n_blend : int
+        Number of complementary filter pairs.
+    order : int, optional
+        Filter order.
+        Defaults 3.
+
+    Returns
+    -------
+    sc_pool : list of seibot.filter.Filter
+        Sensor correction filters, high-passes from 10 to 100 mHz.
+    lp_pool : list of seibot.filter.Filter
+        Low-pass filters with blend frequencies from 30 mHz to 300 mHz.
+    hp_pool : list of seibot.filter.Filter
+        High-pass filters complementary to the low-pass filters.
+    """
+    s = control.tf("s")
+    sc_pool = []
+    for fc in np.logspace(-2, -1, n_sc):
+        wc = 2*np.pi*fc
+        sc_pool.append(seibot.filter.Filter(tf=(s/(s+wc))**order, f=f))
+
+    lp_pool = []
+    hp_pool = []
+    for fb in np.logspace(np.log10(3e-2), np.log10(3e-1), n_blend):
+        wb = 2*np.pi*fb
+        lp = (wb/(s+wb))**order
+        lp_pool.append(seibot.filter.Filter(tf=lp, f=f))
+        hp_pool.append(seibot.filter.Filter(tf=1-lp, f=f))
+
+    return sc_pool, lp_pool, hp_pool
+
+
+def make_isolation_system(f):
+    """Stand-in isolation system with synthetic noises and plant
+
+    Parameters
+    ----------
+    f : array
+        Frequency array.
+
+    Returns
+    -------
+    isolation_system : seibot.isolation_system.IsolationSystem
+        The isolation system.
+    """
+    s = control.tf("s")
+    w0 = 2*np.pi*1.
+    q = 10
+    plant = w0**2 / (s**2 + w0/q*s + w0**2)
+    transmissivity = (w0/q*s + w0**2) / (s**2 + w0/q*s + w0**2)
+    controller = 100 * (s+2*np.pi*0.1) / (s+2*np.pi*10)
+
+    s_ = 1j*2*np.pi*f
+    oltf = plant(s_) * controller(s_)
+    sensitivity = seibot.isolation_system.FrequencyResponse(f, 1/(1+oltf))
+    complement = seibot.isolation_system.FrequencyResponse(
+        f, oltf/(1+oltf))
+
+    transmissivity = seibot.isolation_system.Process(transmissivity)
+    transmissivity.mag = abs(transmissivity(s_))
+    isolation_system = seibot.isolation_system.IsolationSystem(
+        relative_sensor=seibot.isolation_system.Sensor(
+            f, 1e-10 * (1 + 1e-2/f)),
+        inertial_sensor=seibot.isolation_system.Sensor(
+            f, get_gs13_noise_asd(f)),
+        seismometer=seibot.isolation_system.Sensor(
+            f, 1e-12 * (1 + (1e-2/f)**2)),
+        plant=seibot.isolation_system.Process(plant),
+        transmissivity=transmissivity,
+        controller=seibot.isolation_system.Process(controller),
+        sensitivity=sensitivity,
+        complement=complement,
+    )
+
+    return isolation_system
+
+
+def make_evaluate(n_sc, n_blend, num=1024):
+    """Evaluate instance on stand-in pools and a synthetic system
+
+    Parameters
+    ----------
+    n_sc : int
+        Number of sensor correction filters.
+    n_blend : int
+        Number of complementary filter pairs.
+    num : int, optional
+        Number of frequency points.
+        Defaults 1024.
+
+    Returns
+    -------
+    evaluate : seibot.evaluate.Evaluate
+        The evaluate instance.
+    """
+    f = get_frequency(num)
+    sc_pool, lp_pool, hp_pool = make_filter_pools(f, n_sc, n_blend)
+    filter_configurations = seibot.filter.FilterConfigurations(
+        sc_pool=sc_pool, lp_pool=lp_pool, hp_pool=hp_pool)
+    isolation_system = make_isolation_system(f)
+    evaluate = seibot.evaluate.Evaluate(
+        isolation_system, filter_configurations, f, get_seismic_asd(f))
+    return evaluate
@@ -1,8 +1,9 @@
 from .data import Data
-from .evaluate import Evaluate
+from .evaluate import Evaluate, EnsembleEvaluate
 from .filter import Filter, FilterPool, FilterConfigurations
 from .forecast import Forecast
 from .foton import Foton
-from .isolation_system import Sensor, Process, IsolationSystem
+from .isolation_system import (
+    Sensor, Process, FrequencyResponse, IsolationSystem)
 from .model import Model
 from .seibot import Seibot
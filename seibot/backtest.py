@@ -0,0 +1,676 @@
+"""Historical backtesting
+
+Replays the filter selection over windows of a long data stretch and
+tabulates the recommended configuration and its predicted RMS
+for every window.
+"""
+import collections
+import configparser
+import csv
+import multiprocessing
+import os
+
+import numpy as np
+
+import seibot.data
+import seibot.evaluate
+import seibot.filter
+import seibot.lookup
+import seibot.seibot
+import seibot.spectral
+
+
+class TimeSeries:
+    """Time series with the attributes used from cdsutils time series
+
+    Parameters
+    ----------
+    data : array
+        The time series.
+    sample_rate : float
+        Sample rate in Hz.
+    """
+    def __init__(self, data, sample_rate):
+        """Constructor
+
+        Parameters
+        ----------
+        data : array
+            The time series.
+        sample_rate : float
+            Sample rate in Hz.
+        """
+        self.data = data
+        self.sample_rate = sample_rate
+
+    def slice(self, offset, duration):
+        """Get a segment of the time series
+
+        Parameters
+        ----------
+        offset : float
+            Start of the segment relative to the start of the time series,
+            in seconds.
+        duration : float
+            Length of the segment in seconds.
+
+        Returns
+        -------
+        TimeSeries
+            The segment.
+        """
+        start = int(round(offset*self.sample_rate))
+        stop = start + int(round(duration*self.sample_rate))
+        return TimeSeries(self.data[start:stop], self.sample_rate)
+
+
+class MagnitudeConfigurations:
+    """Filter configurations reduced to their magnitude responses
+
+    A picklable stand-in of `seibot.filter.FilterConfigurations` for
+    `seibot.evaluate.Evaluate` in worker processes.
+    Configurations are returned as their indices (i, j).
+
+    Parameters
+    ----------
+    sc : array
+        Sensor correction filters with shape (n_sc, 1, n_f).
+    sc_comp : array
+        Sensor correction complements with shape (n_sc, 1, n_f).
+    lp : array
+        Low-pass filters with shape (1, n_blend, n_f).
+    hp : array
+        High-pass filters with shape (1, n_blend, n_f).
+    """
+    def __init__(self, sc, sc_comp, lp, hp):
+        """Constructor
+
+        Parameters
+        ----------
+        sc : array
+            Sensor correction filters with shape (n_sc, 1, n_f).
+        sc_comp : array
+            Sensor correction complements with shape (n_sc, 1, n_f).
+        lp : array
+            Low-pass filters with shape (1, n_blend, n_f).
+        hp : array
+            High-pass filters with shape (1, n_blend, n_f).
+        """
+        self.magnitude_matrices = (sc, sc_comp, lp, hp)
+
+    def __call__(self, i, j):
+        """Get a configuration
+
+        Returns
+        -------
+        tuple of int
+            The indices (i, j).
+        """
+        return int(i), int(j)
+
+    def get_magnitude_matrices(self):
+        """Stacked magnitude responses of the pools"""
+        return self.magnitude_matrices
+
+
+# State of a worker process, set by init_worker.
+_worker = {}
+
+
+def init_worker(config, magnitude_configurations, criterion,
+                evaluate_options):
+    """Initialize a worker process
+
+    Parameters
+    ----------
+    config : str
+        Path of the Seibot configuration file.
+    magnitude_configurations : MagnitudeConfigurations
+        The filter configurations.
+    criterion : str
+        Name of the `Evaluate` criterion method.
+    evaluate_options : dict
+        Keyword arguments of `Evaluate`.
+    """
+    _worker["config"] = config
+    _worker["filter_configurations"] = magnitude_configurations
+    _worker["criterion"] = criterion
+    _worker["evaluate_options"] = evaluate_options
+
+
+def evaluate_window(window):
+    """Evaluate the filter configurations in a window
+
+    Parameters
+    ----------
+    window : (float, seibot.spectral.Spectra)
+        The GPS start time and the spectra of the window.
+
+    Returns
+    -------
+    row : dict or None
+        The recommendation and its RMS values (nm and nm/s).
+        None if the window cannot be evaluated.
+    """
+    gps, spectra = window
+    try:
+        data = seibot.data.Data(_worker["config"], spectra=spectra)
+        isolation_system = seibot.seibot.Seibot.get_isolation_system(data)
+        evaluate = seibot.evaluate.Evaluate(
+            isolation_system, _worker["filter_configurations"],
+            data.f, data.seismic_noise, **_worker["evaluate_options"])
+        i, j = getattr(evaluate, _worker["criterion"])()
+        displacement = evaluate.get_displacement(i, j)
+        band_rms = evaluate.get_band_rms(displacement) * 1e9  # m to nm
+        velocity_rms = evaluate.get_band_rms(displacement, "velocity") * 1e9
+    except (ValueError, np.linalg.LinAlgError) as e:
+        print(f"Window {gps} failed:", e)
+        return None
+
+    row = {
+        "gps": gps,
+        "i": i,
+        "j": j,
+        "rms_displacement": band_rms[0],
+        "rms_velocity": velocity_rms[0],
+    }
+    for (f_lower, f_upper), rms in zip(evaluate.bands, band_rms[1:]):
+        row[f"rms_displacement_{f_lower:g}_{f_upper:g}"] = rms
+
+    return row
+
+
+def get_window_seismic_noise(window):
+    """Get the seismic noise of a window
+
+    Parameters
+    ----------
+    window : (float, seibot.spectral.Spectra)
+        The GPS start time and the spectra of the window.
+
+    Returns
+    -------
+    seismic_noise : array or None
+        The seismic noise ASD.
+        None if it cannot be estimated.
+    """
+    gps, spectra = window
+    try:
+        data = seibot.data.Data(_worker["config"], spectra=spectra)
+    except (ValueError, np.linalg.LinAlgError) as e:
+        print(f"Window {gps} failed:", e)
+        return None
+    return data.seismic_noise
+
+
+def imap(pool, function, iterable, max_pending):
+    """Ordered `pool.imap` that consumes the iterable lazily
+
+    `multiprocessing.pool.Pool.imap` exhausts the iterable as fast as it
+    can, which would hold the spectra of every window in memory.
+
+    Parameters
+    ----------
+    pool : multiprocessing.pool.Pool
+        The pool.
+    function : callable
+        Function of an item.
+    iterable : iterable
+        The items.
+    max_pending : int
+        Number of items submitted and not yet returned.
+
+    Yields
+    ------
+    The results, in the order of the items.
+    """
+    pending = collections.deque()
+    for item in iterable:
+        pending.append(pool.apply_async(function, (item,)))
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+class WindowedSeibot(seibot.seibot.Seibot):
+    """Seibot over windows of data with the filter pools built once
+
+    Common setup of `Backtest` and `seibot.pipeline.Pipeline`.
+
+    Parameters
+    ----------
+    config : str
+        Path of the Seibot configuration file.
+        The window length is `duration` of `[CDSutils]`.
+    """
+    def __init__(self, config):
+        """Constructor
+
+        Parameters
+        ----------
+        config : str
+            Path of the Seibot configuration file.
+        """
+        self.path_config = config
+        self.config = configparser.ConfigParser(allow_no_value=True)
+        self.config.optionxform = str
+        self.config.read(config)
+        self.check_config()
+
+        self.f = seibot.data.get_frequency(self.config)
+        self.duration = self.config.getfloat("CDSutils", "duration")
+        self.criterion = self.config.get("Evaluate", "criterion")
+        self.filter_configurations = self.get_filter_configurations(self.f)
+
+    def check_config(self):
+        """Check the configuration before the filter pools are built
+
+        Raises
+        ------
+        ValueError
+            If the configuration is not supported.
+        """
+        pass
+
+    @property
+    def channels(self):
+        """Channels in the order expected by `seibot.data.Data`"""
+        return [
+            self.config.get("Channels", channel)
+            for channel in seibot.data.channel_names]
+
+    def fetch(self, start, end):
+        """Fetch the time series of a short stretch
+
+        Parameters
+        ----------
+        start : float
+            GPS start time.
+        end : float
+            GPS end time.
+
+        Returns
+        -------
+        list of TimeSeries
+            Time series of `channels`, starting at `start`.
+        """
+        return [
+            TimeSeries(ts.data, ts.sample_rate)
+            for ts in seibot.data.Data.fetch(self.channels, end-start, start)]
+
+
+class Backtest(WindowedSeibot):
+    """Replay the filter selection over historical data
+
+    The filter pools are built once and only their magnitude responses
+    are sent to the worker processes.
+    The stretch is fetched chunk by chunk and the spectra of the windows
+    are estimated as the chunks arrive, so only the unfinished windows
+    are held in memory.
+
+    Parameters
+    ----------
+    config : str
+        Path of the Seibot configuration file.
+        `dynamic` of `[Seismic]` must be True.
+        The window length is `duration` of `[CDSutils]` and the stretch
+        is fetched in chunks of `chunk` of `[CDSutils]`,
+        which defaults to the window length.
+    """
+    def __init__(self, config):
+        """Constructor
+
+        Parameters
+        ----------
+        config : str
+            Path of the Seibot configuration file.
+        """
+        super().__init__(config)
+        self.chunk = self.config.getfloat(
+            "CDSutils", "chunk", fallback=self.duration)
+        self.n_average = self.config.getint("Welch", "n_average")
+        self.overlap = self.config.getfloat("Welch", "overlap")
+        self.welch_workers = self.config.getint(
+            "Welch", "workers", fallback=1)
+        self.magnitude_configurations = MagnitudeConfigurations(
+            *self.filter_configurations.get_magnitude_matrices())
+
+    def check_config(self):
+        """Check the configuration before the filter pools are built
+
+        Raises
+        ------
+        ValueError
+            If the seismic noise is not dynamic.
+        """
+        # Only the seismic noise changes from window to window.
+        if not self.config.getboolean("Seismic", "dynamic", fallback=False):
+            raise ValueError(
+                "Backtesting requires dynamic seismic noise, "
+                "set dynamic = True in [Seismic].")
+
+    def fetch_chunk(self, start, duration, cache=None):
+        """Fetch a chunk of the stretch
+
+        Parameters
+        ----------
+        start : float
+            GPS start time of the chunk.
+        duration : float
+            Length of the chunk in seconds.
+        cache : str, optional
+            Directory of .npz caches of the chunks.
+            A chunk is loaded if it is cached, and cached otherwise.
+            Defaults None.
+
+        Returns
+        -------
+        list of TimeSeries
+            Time series of `channels`, starting at `start`.
+
+        Raises
+        ------
+        ValueError
+            If a time series is shorter than the chunk.
+        """
+        path = None
+        if cache is not None:
+            path = os.path.join(cache, f"{start:.9g}_{duration:.9g}.npz")
+        if path is not None and os.path.exists(path):
+            _, time_series = load_time_series(path)
+        else:
+            time_series = self.fetch(start, start+duration)
+            if path is not None:
+                os.makedirs(cache, exist_ok=True)
+                save_time_series(path, start, time_series)
+
+        for channel, ts in zip(self.channels, time_series):
+            if len(ts.data) < int(round(duration*ts.sample_rate)):
+                raise ValueError(
+                    f"{channel} has {len(ts.data)/ts.sample_rate:g} s of "
+                    f"data from {start:.9g}, expected {duration:g} s.")
+
+        return [ts.slice(0, duration) for ts in time_series]
+
+    def fetch_chunks(self, start, end, cache=None):
+        """Fetch a stretch chunk by chunk
+
+        Parameters
+        ----------
+        start : float
+            GPS start time.
+        end : float
+            GPS end time.
+        cache : str, optional
+            Directory of .npz caches of the chunks.
+            Defaults None.
+
+        Yields
+        ------
+        list of TimeSeries
+            Time series of `channels` of each chunk.
+        """
+        for offset, length in seibot.data.get_chunks(end-start, self.chunk):
+            yield self.fetch_chunk(start+offset, length, cache=cache)
+
+    def get_windows(self, start, end, stride=None, cache=None):
+        """Estimate the spectra of the windows of a stretch
+
+        Welch segments shared by overlapping windows are computed once
+        when the stride is a multiple of the segment step.
+
+        Parameters
+        ----------
+        start : float
+            GPS start time.
+        end : float
+            GPS end time.
+        stride : float, optional
+            Time between the starts of consecutive windows in seconds.
+            Defaults None, which uses the window length `duration`.
+        cache : str, optional
+            Directory of .npz caches of the chunks.
+            Defaults None.
+
+        Yields
+        ------
+        (float, seibot.spectral.Spectra)
+            GPS start time and the spectra of each window.
+
+        Raises
+        ------
+        ValueError
+            If the stretch is shorter than a window or the data do not
+            cover it.
+        """
+        if stride is None:
+            stride = self.duration
+        if end - start < self.duration:
+            raise ValueError("The stretch is shorter than a window.")
+        n_windows = int((end-start-self.duration) // stride) + 1
+
+        estimator = None
+        gps = start
+        for time_series in self.fetch_chunks(start, end, cache=cache):
+            if estimator is None:
+                estimator = seibot.spectral.SlidingSpectralEstimator(
+                    {name: ts.sample_rate for name, ts
+                     in zip(seibot.data.channel_names, time_series)},
+                    self.duration, stride, self.n_average, self.overlap,
+                    asd=seibot.data.asd_channels,
+                    coherence=seibot.data.coherence_channels,
+                    workers=self.welch_workers)
+            for spectra in estimator.feed(
+                    {name: ts.data for name, ts
+                     in zip(seibot.data.channel_names, time_series)}):
+                yield gps, spectra
+                gps += stride
+                n_windows -= 1
+        for spectra in estimator.flush():
+            yield gps, spectra
+            gps += stride
+            n_windows -= 1
+
+        if n_windows > 0:
+            raise ValueError(f"{n_windows} windows before {end} are missing.")
+
+    def get_pool(self, processes=None):
+        """Get a pool of worker processes
+
+        Parameters
+        ----------
+        processes : int, optional
+            Number of worker processes.
+            Defaults None, which uses the number of CPUs.
+
+        Returns
+        -------
+        multiprocessing.pool.Pool
+            The pool.
+        """
+        return multiprocessing.Pool(
+            processes, initializer=init_worker,
+            initargs=(self.path_config, self.magnitude_configurations,
+                      self.criterion, self.get_evaluate_options()))
+
+    def run(self, start, end, stride=None, processes=None, cache=None,
+            path=None):
+        """Evaluate every window of a stretch
+
+        Parameters
+        ----------
+        start : float
+            GPS start time.
+        end : float
+            GPS end time.
+        stride : float, optional
+            Time between the starts of consecutive windows in seconds.
+            Defaults None, which uses the window length.
+        processes : int, optional
+            Number of worker processes.
+            Defaults None, which uses the number of CPUs.
+        cache : str, optional
+            Directory of .npz caches of the chunks.
+            Defaults None.
+        path : str, optional
+            Path of the output CSV table.
+            Defaults None, which only returns the rows.
+
+        Returns
+        -------
+        rows : list of dict
+            One row per evaluated window, ordered by GPS time.
+        """
+        windows = self.get_windows(start, end, stride=stride, cache=cache)
+
+        filter_configurations = self.filter_configurations
+        rows = []
+        with self.get_pool(processes) as pool:
+            # Windows are estimated as the workers consume them.
+            max_pending = 2 * (processes or os.cpu_count())
+            for row in imap(pool, evaluate_window, windows, max_pending):
+                if row is None:
+                    continue
+                i, j = row["i"], row["j"]
+                get_label = seibot.filter.get_label
+                row["sc"] = get_label(filter_configurations.sc_pool[i])
+                row["lp"] = get_label(filter_configurations.lp_pool[j])
+                row["hp"] = get_label(filter_configurations.hp_pool[j])
+                rows.append(row)
+
+        if path is not None:
+            write_table(path, rows)
+
+        return rows
+
+    def build_lookup_table(self, start, end, n_states=3, stride=None,
+                           processes=None, cache=None, path=None):
+        """Build a recommendation lookup table from a stretch
+
+        The seismic noise of every window is clustered.
+        The isolation system is built from the first window.
+
+        Parameters
+        ----------
+        start : float
+            GPS start time.
+        end : float
+            GPS end time.
+        n_states : int, optional
+            Number of seismic states.
+            Defaults 3.
+        stride : float, optional
+            Time between the starts of consecutive windows in seconds.
+            Defaults None, which uses the window length.
+        processes : int, optional
+            Number of worker processes.
+            Defaults None, which uses the number of CPUs.
+        cache : str, optional
+            Directory of .npz caches of the chunks.
+            Defaults None.
+        path : str, optional
+            Path of the output .npz table.
+            Defaults None, which does not save the table.
+
+        Returns
+        -------
+        seibot.lookup.RecommendationTable
+            The table.
+        """
+        if self.criterion not in seibot.lookup.quantities:
+            raise ValueError(f"Lookup tables do not support the "
+                             f"{self.criterion} criterion.")
+        windows = self.get_windows(start, end, stride=stride, cache=cache)
+        first = []
+
+        def keep_first(windows):
+            for window in windows:
+                if not first:
+                    first.append(window)
+                yield window
+
+        with self.get_pool(processes) as pool:
+            max_pending = 2 * (processes or os.cpu_count())
+            seismic_noises = [
+                seismic_noise for seismic_noise in imap(
+                    pool, get_window_seismic_noise, keep_first(windows),
+                    max_pending)
+                if seismic_noise is not None]
+
+        _, spectra = first[0]
+        data = seibot.data.Data(self.path_config, spectra=spectra)
+        isolation_system = self.get_isolation_system(data)
+        table = seibot.lookup.RecommendationTable.from_spectra(
+            isolation_system, self.filter_configurations, self.f,
+            np.array(seismic_noises), n_states=n_states,
+            quantity=seibot.lookup.quantities[self.criterion])
+        if path is not None:
+            table.save(path)
+
+        return table
+
+
+def write_table(path, rows):
+    """Write backtest rows into a CSV table
+
+    Parameters
+    ----------
+    path : str
+        Path of the CSV file.
+    rows : list of dict
+        The rows.
+    """
+    fieldnames = ["gps", "i", "j", "sc", "lp", "hp"]
+    for row in rows:
+        fieldnames += [key for key in row if key not in fieldnames]
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({
+                key: (f"{value:.6g}"
+                      if isinstance(value, float) and key != "gps"
+                      else value)
+                for key, value in row.items()})
+
+
+def save_time_series(path, start, time_series):
+    """Save time series into an .npz file
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+    start : float
+        GPS start time.
+    time_series : list of TimeSeries
+        The time series.
+    """
+    arrays = {f"data_{k}": ts.data for k, ts in enumerate(time_series)}
+    np.savez(
+        path, start=start,
+        sample_rate=[ts.sample_rate for ts in time_series], **arrays)
+
+
+def load_time_series(path):
+    """Load time series from an .npz file
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+
+    Returns
+    -------
+    start : float
+        GPS start time.
+    time_series : list of TimeSeries
+        The time series.
+    """
+    with np.load(path) as file:
+        start = float(file["start"])
+        time_series = [
+            TimeSeries(file[f"data_{k}"], sample_rate)
+            for k, sample_rate in enumerate(file["sample_rate"])]
+    return start, time_series
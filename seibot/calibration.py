@@ -0,0 +1,95 @@
+"""Calibration of sensor readouts
+
+Readouts are calibrated by the inverse filters named in `[Calibration]`
+and converted from their units in `[Units]` to meters.
+The calibration responses are evaluated once per frequency array.
+"""
+import seibot.filter
+
+
+# Meters per readout unit.
+units = {
+    "m": 1.,
+    "mm": 1e-3,
+    "um": 1e-6,
+    "nm": 1e-9,
+}
+
+
+class Calibration:
+    """Calibration responses of the channels on a frequency array
+
+    Parameters
+    ----------
+    config : configparser.ConfigParser
+        The Seibot configuration.
+        The optional `[Calibration]` maps channel options of `[Channels]`
+        to inverse filters, and the optional `[Units]` maps them to the
+        units of the calibrated readouts, each defaulting to "nm".
+    f : array
+        Frequency array.
+    """
+    def __init__(self, config, f):
+        """Constructor
+
+        Parameters
+        ----------
+        config : configparser.ConfigParser
+            The Seibot configuration.
+        f : array
+            Frequency array.
+        """
+        self.f = f
+        # Static configurations do not need calibrations.
+        self.inverse_filters = {}
+        if config.has_section("Calibration"):
+            self.inverse_filters.update(config.items("Calibration"))
+        self.units = {channel: "nm" for channel in self.inverse_filters}
+        if config.has_section("Units"):
+            self.units.update(config.items("Units"))
+        for channel, unit in self.units.items():
+            if unit not in units:
+                raise ValueError(f"Unknown unit {unit} of {channel}, "
+                                 f"choose from {list(units)}.")
+        self.responses = {}
+
+    def get_response(self, channel):
+        """Get the calibration response of a channel
+
+        Parameters
+        ----------
+        channel : str
+            Name of the channel option, e.g. "seismometer".
+
+        Returns
+        -------
+        response : array
+            The read-only magnitude response, including the unit
+            conversion to meters.
+        """
+        if channel not in self.responses:
+            if channel not in self.inverse_filters:
+                raise ValueError(f"No calibration for {channel}.")
+            response = seibot.filter.registry.get_inverse_response(
+                self.inverse_filters[channel], self.f)
+            response = abs(response) * units[self.units[channel]]
+            response.flags.writeable = False
+            self.responses[channel] = response
+        return self.responses[channel]
+
+    def apply(self, channel, asd):
+        """Calibrate an amplitude spectral density
+
+        Parameters
+        ----------
+        channel : str
+            Name of the channel option.
+        asd : array
+            Amplitude spectral density of the readout.
+
+        Returns
+        -------
+        array
+            The calibrated amplitude spectral density in meters.
+        """
+        return asd * self.get_response(channel)
@@ -0,0 +1,255 @@
+"""Channel access layer"""
+import concurrent.futures
+import time
+
+
+class ChannelAccessError(Exception):
+    """Raised when channels cannot be read from the backend."""
+
+
+class EzcaBackend:
+    """Channel access backend using ezca
+
+    Parameters
+    ----------
+    prefix : str, optional
+        Ezca channel prefix.
+        Defaults "".
+    ifo : str, optional
+        Ezca interferometer prefix.
+        Defaults "".
+    """
+    def __init__(self, prefix="", ifo=""):
+        """Constructor
+
+        Parameters
+        ----------
+        prefix : str, optional
+            Ezca channel prefix.
+            Defaults "".
+        ifo : str, optional
+            Ezca interferometer prefix.
+            Defaults "".
+        """
+        import ezca
+
+        self.errors = (ezca.errors.EzcaConnectError,)
+        self.ezca = ezca.Ezca(prefix=prefix, ifo=ifo)
+
+    def read(self, channel):
+        """Read a channel
+
+        Parameters
+        ----------
+        channel : str
+            Channel name.
+
+        Returns
+        -------
+        float
+            The channel value.
+        """
+        return self.ezca.read(channel)
+
+    def get_swstat_mask(self, filter_chan):
+        """Get the engaged switches of a filter module
+
+        Parameters
+        ----------
+        filter_chan : str
+            The filter module channel.
+
+        Returns
+        -------
+        list of str
+            The switch status mask, e.g. ["FM1", "FM10", "INPUT"].
+        """
+        return self.ezca.LIGOFilter(filter_chan).get_current_swstat_mask()
+
+
+class FakeBackend:
+    """Local fake EPICS backend for offline use
+
+    Parameters
+    ----------
+    values : dict, optional
+        Channel values keyed by channel name.
+        Defaults None.
+    swstat_masks : dict, optional
+        Switch status masks keyed by filter module channel.
+        Defaults None.
+    delay : float, optional
+        Simulated round trip time of each read in seconds.
+        Defaults 0.
+    """
+    def __init__(self, values=None, swstat_masks=None, delay=0):
+        """Constructor
+
+        Parameters
+        ----------
+        values : dict, optional
+            Channel values keyed by channel name.
+            Defaults None.
+        swstat_masks : dict, optional
+            Switch status masks keyed by filter module channel.
+            Defaults None.
+        delay : float, optional
+            Simulated round trip time of each read in seconds.
+            Defaults 0.
+        """
+        if values is None:
+            values = {}
+        if swstat_masks is None:
+            swstat_masks = {}
+        self.errors = (KeyError,)
+        self.values = values
+        self.swstat_masks = swstat_masks
+        self.delay = delay
+
+    def read(self, channel):
+        """Read a channel
+
+        Parameters
+        ----------
+        channel : str
+            Channel name.
+
+        Returns
+        -------
+        float
+            The channel value.
+        """
+        time.sleep(self.delay)
+        return self.values[channel]
+
+    def get_swstat_mask(self, filter_chan):
+        """Get the engaged switches of a filter module
+
+        Parameters
+        ----------
+        filter_chan : str
+            The filter module channel.
+
+        Returns
+        -------
+        list of str
+            The switch status mask.
+        """
+        time.sleep(self.delay)
+        return self.swstat_masks[filter_chan]
+
+
+class ChannelAccess:
+    """Batched channel access
+
+    Reads are issued concurrently so that a batch of channels costs
+    one network round trip instead of one per channel.
+
+    Parameters
+    ----------
+    backend : EzcaBackend or FakeBackend, optional
+        The channel access backend.
+        Defaults None, which uses an `EzcaBackend`.
+    timeout : float, optional
+        Timeout of a batch of reads in seconds.
+        Defaults 5.
+    max_workers : int, optional
+        Maximum number of concurrent reads.
+        Defaults 8.
+    """
+    def __init__(self, backend=None, timeout=5, max_workers=8):
+        """Constructor
+
+        Parameters
+        ----------
+        backend : EzcaBackend or FakeBackend, optional
+            The channel access backend.
+            Defaults None, which uses an `EzcaBackend`.
+        timeout : float, optional
+            Timeout of a batch of reads in seconds.
+            Defaults 5.
+        max_workers : int, optional
+            Maximum number of concurrent reads.
+            Defaults 8.
+        """
+        self.timeout = timeout
+        self.max_workers = max_workers
+        try:
+            if backend is None:
+                backend = EzcaBackend()
+        except Exception as e:
+            raise ChannelAccessError(f"Cannot create ezca backend: {e}")
+        self.backend = backend
+
+    def read(self, channels):
+        """Read a batch of channels
+
+        Parameters
+        ----------
+        channels : list of str
+            Channel names.
+
+        Returns
+        -------
+        dict
+            Channel values keyed by channel name.
+        """
+        return self._batch(self.backend.read, channels)
+
+    def get_swstat_masks(self, filter_chans):
+        """Get switch status masks of a batch of filter modules
+
+        Parameters
+        ----------
+        filter_chans : list of str
+            Filter module channels.
+
+        Returns
+        -------
+        dict
+            Switch status masks keyed by filter module channel.
+        """
+        return self._batch(self.backend.get_swstat_mask, filter_chans)
+
+    def _batch(self, method, channels):
+        """Call a backend method on channels concurrently
+
+        Parameters
+        ----------
+        method : callable
+            Backend method taking a channel name.
+        channels : list of str
+            Channel names.
+
+        Returns
+        -------
+        dict
+            Results keyed by channel name.
+        """
+        channels = list(dict.fromkeys(channels))  # Unique, ordered.
+        max_workers = max(1, min(self.max_workers, len(channels)))
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers)
+        futures = {
+            channel: executor.submit(method, channel) for channel in channels}
+        results = {}
+        try:
+            done, not_done = concurrent.futures.wait(
+                futures.values(), timeout=self.timeout)
+            if not_done:
+                missing = [
+                    channel for channel, future in futures.items()
+                    if future in not_done]
+                raise ChannelAccessError(
+                    f"Timed out after {self.timeout} s reading {missing}")
+            for channel, future in futures.items():
+                try:
+                    results[channel] = future.result()
+                except self.backend.errors as e:
+                    raise ChannelAccessError(
+                        f"Cannot read {channel}: {e}") from e
+        finally:
+            # Don't block on reads that have timed out.
+            executor.shutdown(wait=False)
+
+        return results
@@ -2,8 +2,13 @@
 import argparse
 import configparser
 
+import seibot.backtest
 import seibot.config
+import seibot.data
+import seibot.pipeline
 import seibot.seibot
+import seibot.service
+import seibot.shared
 
 
 def parser():
@@ -14,6 +19,56 @@ def parser():
     parser.add_argument("--get-model-parameters", action="store_true")
     parser.add_argument("-c", "--config")
     parser.add_argument("-p", "--path")
+    parser.add_argument(
+        "--backtest", nargs=2, type=float, metavar=("START", "END"),
+        help="Backtest the GPS stretch [START, END) and write a CSV table "
+             "into the path.")
+    parser.add_argument(
+        "--lookup-table", nargs=2, type=float, metavar=("START", "END"),
+        help="Cluster the seismic states of the GPS stretch [START, END) "
+             "and write a recommendation lookup table into the path.")
+    parser.add_argument(
+        "--states", type=int, default=3,
+        help="Number of seismic states of the lookup table.")
+    parser.add_argument(
+        "--publish", metavar="NAME",
+        help="Publish the results into shared memory under NAME "
+             "until interrupted.")
+    parser.add_argument(
+        "--serve", type=int, metavar="PORT",
+        help="Serve recommendations as JSON over HTTP on PORT "
+             "until interrupted.")
+    parser.add_argument(
+        "--host", default="127.0.0.1",
+        help="Host address of the recommendation service.")
+    parser.add_argument(
+        "--interval", type=float,
+        help="Rerun and republish, or refresh the service, every "
+             "INTERVAL seconds.")
+    parser.add_argument(
+        "--monitor", action="store_true",
+        help="Evaluate consecutive windows as data arrive, with fetching "
+             "overlapped with evaluation, and append them to a CSV table "
+             "in the path until interrupted.")
+    parser.add_argument(
+        "--fit-noise", action="store_true",
+        help="Fit noise models to the seismometer and inertial sensor "
+             "noises of the data and write the model parameter files into "
+             "the path directory.")
+    parser.add_argument(
+        "--noise-model", default="noise2", choices=["noise1", "noise2"],
+        help="Noise model fitted by --fit-noise.")
+    parser.add_argument(
+        "--stride", type=float,
+        help="Time between backtest windows in seconds. "
+             "Defaults to the window duration.")
+    parser.add_argument(
+        "--processes", type=int,
+        help="Number of backtest worker processes. Defaults to the number "
+             "of CPUs.")
+    parser.add_argument(
+        "--cache",
+        help="Directory of .npz caches of the backtest chunks.")
     return parser
 
 
@@ -40,9 +95,49 @@ def main(args=None):
         raise ValueError("Configuration file is not specified. "
                          "Use the -c or --config flag to specify the "
                          "path of the configuration file.")
+    if options.serve is not None:
+        service = seibot.service.RecommendationService(
+            options.config, interval=options.interval)
+        service.serve(options.host, options.serve)
+        return
+
+    if options.publish is not None:
+        seibot.shared.publish_seibot(
+            options.config, options.publish, interval=options.interval)
+        return
+
     if options.path is None:
         raise ValueError("Please specify path of the output configuration "
                          "file using the -p or --path flag")
-    
+
+    if options.fit_noise:
+        data = seibot.data.Data(options.config)
+        for path in data.fit_sensor_noises(
+                options.path, model=options.noise_model):
+            print(f"Wrote {path}")
+        return
+
+    if options.lookup_table is not None:
+        start, end = options.lookup_table
+        backtest = seibot.backtest.Backtest(options.config)
+        backtest.build_lookup_table(
+            start, end, n_states=options.states, stride=options.stride,
+            processes=options.processes, cache=options.cache,
+            path=options.path)
+        return
+
+    if options.monitor:
+        pipeline = seibot.pipeline.Pipeline(options.config)
+        pipeline.monitor(options.path, stride=options.stride)
+        return
+
+    if options.backtest is not None:
+        start, end = options.backtest
+        backtest = seibot.backtest.Backtest(options.config)
+        backtest.run(
+            start, end, stride=options.stride, processes=options.processes,
+            cache=options.cache, path=options.path)
+        return
+
     bot = seibot.seibot.Seibot(options.config)
     bot.export_best_filters(options.path)
@@ -1,15 +1,31 @@
 """Seibot Data
 """
 import configparser
+import os
+import types
 
 import cdsutils
 import numpy as np
 import scipy
 import scipy.optimize
 
+import seibot.calibration
+import seibot.filter
+import seibot.fit
 import seibot.foton
 import seibot.gps
 import seibot.model
+import seibot.spectral
+
+
+# Channel options of [Channels], in the order of the time series.
+channel_names = [
+    "seismometer", "seismometer_coh", "inertial_sensor", "relative_sensor",
+    "witness_sensor"]
+# Spectra used from the channels.
+asd_channels = ["seismometer", "inertial_sensor", "witness_sensor"]
+coherence_channels = [
+    ("seismometer", "seismometer_coh"), ("inertial_sensor", "seismometer")]
 
 
 class Data:
@@ -19,6 +35,14 @@ class Data:
     ----------
     path_config : str
         Path of the configuration file.
+    time_series : list, optional
+        Time series of the channels in `[Channels]`, in the order
+        seismometer, seismometer_coh, inertial_sensor, relative_sensor
+        and witness_sensor, each with attributes `data` and `sample_rate`.
+        Defaults None, which fetches them with cdsutils.
+    spectra : seibot.spectral.Spectra, optional
+        Welch estimates of the channels, e.g. of a backtest window.
+        Defaults None, which estimates them from the time series.
 
     Attributes
     ----------
@@ -37,10 +61,19 @@ class Data:
     transmissivity : TransferFunction
         The transfer function of the transmissivity.
     """
-    def __init__(self, path_config):
+    def __init__(self, path_config, time_series=None, spectra=None):
         """Constructor
         path_config : str
             Path of the configuration file.
+        time_series : list, optional
+            Time series of the channels in `[Channels]`, in the order
+            seismometer, seismometer_coh, inertial_sensor, relative_sensor
+            and witness_sensor, each with attributes `data` and
+            `sample_rate`.
+            Defaults None, which fetches them with cdsutils.
+        spectra : seibot.spectral.Spectra, optional
+            Welch estimates of the channels, e.g. of a backtest window.
+            Defaults None, which estimates them from the time series.
         """
         self.config = configparser.ConfigParser(allow_no_value=True)
         self.config.optionxform = str
@@ -71,22 +104,44 @@ class Data:
         if start is None:
             start = seibot.gps.get_gpstime_now() - duration
 
+        # Welch
+        self.n_average = self.config.getint("Welch", "n_average")
+        self.overlap = self.config.getfloat("Welch", "overlap")
+        # FFT worker threads, one by default as Seibot often runs in
+        # worker processes and threads, e.g. in backtests and pipelines.
+        self.workers = self.config.getint("Welch", "workers", fallback=1)
+
+        # Spectra are accumulated chunk by chunk if chunk is set.
+        chunk = self.config["CDSutils"].getfloat("chunk", fallback=None)
+        self.spectra = spectra
+        # Interpolated spectra keyed by channel(s).
+        self.spectrum_cache = {}
+
         try:
         # Try in case not working with LIGO workstations.
-            time_series = self.fetch(channel_list, duration, start)
+            if self.spectra is not None:
+                for name, fs in self.spectra.sample_rates.items():
+                    setattr(self, f"fs_{name}", fs)
+                time_series = [None] * len(channel_list)
+            elif chunk is not None:
+                self.spectra = self.estimate_spectra(
+                    channel_list, duration, start, chunk, time_series)
+                # The time series are not kept.
+                time_series = [None] * len(channel_list)
+            elif time_series is None:
+                time_series = self.fetch(channel_list, duration, start)
             
             # Unpack time series
-            ts_seismometer = time_series[0].data
-            ts_seismometer_coh = time_series[1].data
-            ts_inertial_sensor = time_series[2].data
-            ts_relative_sensor = time_series[3].data
-            ts_witness_sensor = time_series[4].data
-
-            self.fs_seismometer = time_series[0].sample_rate
-            self.fs_seismometer_coh = time_series[1].sample_rate
-            self.fs_inertial_sensor = time_series[2].sample_rate
-            self.fs_relative_sensor = time_series[3].sample_rate
-            self.fs_witness_sensor = time_series[4].sample_rate
+            ts_seismometer, ts_seismometer_coh, ts_inertial_sensor, \
+                ts_relative_sensor, ts_witness_sensor = [
+                    None if ts is None else ts.data for ts in time_series]
+
+            if self.spectra is None:
+                self.fs_seismometer = time_series[0].sample_rate
+                self.fs_seismometer_coh = time_series[1].sample_rate
+                self.fs_inertial_sensor = time_series[2].sample_rate
+                self.fs_relative_sensor = time_series[3].sample_rate
+                self.fs_witness_sensor = time_series[4].sample_rate
             
             # Resample
             # fs = fs_seismometer  # Adhere to seismometer readout.
@@ -112,6 +167,7 @@ class Data:
             self.ts_witness_sensor = ts_witness_sensor
 
         except:
+            self.spectra = None
             self.ts_seismometer = None
             self.ts_seismometer_coh = None
             self.ts_inertial_sensor = None
@@ -119,32 +175,17 @@ class Data:
             self.ts_witness_sensor = None
             print("CDS error")
 
-        # Welch
-        self.n_average = self.config.getint("Welch", "n_average")
-        self.overlap = self.config.getfloat("Welch", "overlap")
-
         # Initiallize dummy frequency axis:
-        logspace = self.config.getboolean("Frequency", "logspace")
-        start = self.config.getfloat("Frequency", "start")
-        end = self.config.getfloat("Frequency", "end")
-        num = self.config.getint("Frequency", "num")
-        
-        if logspace:
-            self.f = np.logspace(start, end, num)
-        else:
-            self.f = np.linspace(start, end, num)
+        self.f = get_frequency(self.config)
+
+        # Calibration responses on the frequency array.
+        self.calibration = seibot.calibration.Calibration(self.config, self.f)
 
         # Make witness spectrum if not None
-        if self.ts_witness_sensor is not None:
-            _, self.witness_sensor = self.ts2asd(
-                self.ts_witness_sensor, self.fs_witness_sensor)
-            calibration = self.config["Calibration"]["witness_sensor"]
-            inv_filter = seibot.filter.InverseFilters()
-            cal_filter = getattr(inv_filter, calibration)
-            self.witness_sensor = (self.witness_sensor
-                                   * abs(cal_filter(1j*2*np.pi*self.f))
-            )
-            self.witness_sensor = self.witness_sensor * 1e-9  # From nm to m. TODO avoid hardcode.
+        if self.ts_witness_sensor is not None or self.spectra is not None:
+            _, self.witness_sensor = self.get_asd("witness_sensor")
+            self.witness_sensor = self.calibration.apply(
+                "witness_sensor", self.witness_sensor)
         else:
             self.witness_sensor = None
 
@@ -365,7 +406,8 @@ class Data:
 
         fm_list = [int(fm.strip()) for fm in fm.split(",")]
 
-        foton = seibot.foton.Foton(filter_file)
+        # Parsed once per process, e.g. across backtest windows.
+        foton = seibot.filter.registry.get_foton(filter_file)
         controller = foton.get_filter_tf(module, fm_list)
 
         f = self.f  # Dummy
@@ -499,11 +541,50 @@ class Data:
         model_method = getattr(model, model_name)
 
         # Fit
-        param, _ = scipy.optimize.curve_fit(model_method,
-                                            xdata=f,
-                                            ydata=seismometer_noise)
+        if model_name in seibot.fit.NoiseFit.models:
+            # Fit in log space.
+            param = seibot.fit.NoiseFit(model_name).fit(
+                f, seismometer_noise)[0]
+        else:
+            param, _ = scipy.optimize.curve_fit(model_method,
+                                                xdata=f,
+                                                ydata=seismometer_noise)
         return model_method(self.f, *param)
 
+    def fit_sensor_noises(self, directory, model="noise2"):
+        """Fit noise models to the measured sensor noises
+
+        The seismometer and inertial sensor noises are estimated from the
+        data regardless of `dynamic`, fitted at once and written into
+        model parameter files "seismometer.txt" and "inertial_sensor.txt".
+
+        Parameters
+        ----------
+        directory : str
+            Directory of the model parameter files.
+        model : str, optional
+            The noise model. Choose from ["noise1", "noise2"].
+            Defaults "noise2".
+
+        Returns
+        -------
+        paths : list of str
+            Paths of the model parameter files.
+        """
+        if self.ts_seismometer is None and self.spectra is None:
+            raise ValueError("No data to fit the sensor noises to.")
+        _, seismometer_asd = self.dynamic_seismometer_asd()
+        _, inertial_asd = self.dynamic_inertial_asd()
+
+        os.makedirs(directory, exist_ok=True)
+        paths = [
+            os.path.join(directory, f"{channel}.txt")
+            for channel in ["seismometer", "inertial_sensor"]]
+        seibot.fit.fit_noise(
+            self.f, [seismometer_asd, inertial_asd], paths, model=model)
+
+        return paths
+
     def pad_seismic_noise(self, seismic_asd, coherence):
         """Edge-pad seismometer noise from seismic noise readout
         
@@ -535,17 +616,11 @@ class Data:
         seismic_asd : array
             Amplitude spectral density of the seismic noise.
         """
-        f, seismic_asd = self.ts2asd(self.ts_seismometer, self.fs_seismometer)
-        _, coh = self.ts2coh(
-            self.ts_seismometer, self.ts_seismometer_coh,
-            self.fs_seismometer, self.fs_seismometer_coh)
+        f, seismic_asd = self.get_asd("seismometer")
+        _, coh = self.get_coh("seismometer", "seismometer_coh")
 
         # Calibrate spectrum to displacement unit.
-        calibration = self.config["Calibration"]["seismometer"]
-        inv_filter = seibot.filter.InverseFilters()
-        cal_filter = getattr(inv_filter, calibration)
-        seismic_asd = seismic_asd * abs(cal_filter(1j*2*np.pi*f))
-        seismic_asd = seismic_asd * 1e-9  # From nm to m. TODO avoid hardcode.
+        seismic_asd = self.calibration.apply("seismometer", seismic_asd)
 
         seismic_asd = self.pad_seismic_noise(seismic_asd, coh)
 
@@ -561,17 +636,11 @@ class Data:
         seismometer_asd : array
             Amplitude spectral density of the seismometer noise.
         """
-        f, seismic_asd = self.ts2asd(self.ts_seismometer, self.fs_seismometer)
-        _, coh = self.ts2coh(
-            self.ts_seismometer, self.ts_seismometer_coh,
-            self.fs_seismometer, self.fs_seismometer_coh)
+        f, seismic_asd = self.get_asd("seismometer")
+        _, coh = self.get_coh("seismometer", "seismometer_coh")
 
         # Calibrate spectrum to displacement unit.
-        calibration = self.config["Calibration"].get("seismometer")
-        inv_filter = seibot.filter.InverseFilters()
-        cal_filter = getattr(inv_filter, calibration)
-        seismic_asd = seismic_asd * abs(cal_filter(1j*2*np.pi*f))
-        seismic_asd = seismic_asd * 1e-9  # From nm to m. TODO avoid hardcode.
+        seismic_asd = self.calibration.apply("seismometer", seismic_asd)
 
         # cutoff_i = self._get_seismometer_cutoff(seismic_asd, coh)
         # # v TODO avoid Hardcode 0.01 
@@ -597,11 +666,8 @@ class Data:
         inertial_asd : array
             Amplitude spectral density of the inertial sensor noise.
         """
-        f, inertial_asd = self.ts2asd(
-            self.ts_inertial_sensor, self.fs_inertial_sensor)
-        _, coh = self.ts2coh(
-            self.ts_inertial_sensor, self.ts_seismometer,
-            self.fs_inertial_sensor, self.fs_seismometer)
+        f, inertial_asd = self.get_asd("inertial_sensor")
+        _, coh = self.get_coh("inertial_sensor", "seismometer")
         
         # f, seismic_asd = self.ts2asd(self.ts_seismometer, self.fs_seismometer)
         # _, sts_coh = self.ts2coh(
@@ -621,11 +687,7 @@ class Data:
         inertial_asd = (inertial_asd**2 * (1-coh**.5))**.5
 
         # Calibrate inertial sensor
-        calibration = self.config["Calibration"].get("inertial_sensor")
-        inv_filter = seibot.filter.InverseFilters()
-        cal_filter = getattr(inv_filter, calibration)
-        inertial_asd = inertial_asd * abs(cal_filter(1j*2*np.pi*f))
-        inertial_asd = inertial_asd * 1e-9  # From nm to m.TODO avoid hardcode.
+        inertial_asd = self.calibration.apply("inertial_sensor", inertial_asd)
 
         # coh = np.round(coh, 2)
         # mask = (coh < 0.2) * (f < f[cutoff_i])
@@ -717,25 +779,16 @@ class Data:
         # Parse config.
         model_name = self.config.get(instrument, "model")
         path_parameters = self.config.get(instrument, "parameters_path")
-        
-        # Get model
-        model = seibot.model.Model()
-        model_method = getattr(model, model_name)
         f = self.f
 
-        if model_name == "interpolate":
-            # Interpolate from data.
-            frequency_series = model_method(f, path_parameters)
-        else:
-            # Get parameters
-            parameters = np.loadtxt(path_parameters)
-
-            # Evaluate frequency series
-            frequency_series = model_method(f, *parameters)
+        # Evaluations are cached by model, parameters and frequency.
+        frequency_series = seibot.model.registry.evaluate(
+            model_name, path_parameters, f)
 
         return f, frequency_series
 
-    def fetch(self, channel, duration, start=None):
+    @staticmethod
+    def fetch(channel, duration, start=None):
         """ Fetch data given channel names
 
         Parameters
@@ -758,6 +811,80 @@ class Data:
 
         return time_series
 
+    @staticmethod
+    def fetch_chunks(channel, duration, start, chunk):
+        """Fetch data chunk by chunk
+
+        Parameters
+        ----------
+        channel : list of str
+            Channel names.
+        duration : float
+            Length of the data segment in seconds.
+        start : float
+            Start time of the data, in GPS time.
+        chunk : float
+            Length of the chunks in seconds.
+
+        Yields
+        ------
+        time_series : list of cdsutils.TimeSeries
+            The time series of a chunk.
+        """
+        for offset, length in get_chunks(duration, chunk):
+            yield Data.fetch(channel, length, start+offset)
+
+    def estimate_spectra(self, channel, duration, start, chunk,
+                         time_series=None):
+        """Accumulate the spectra chunk by chunk
+
+        Only one chunk of each channel and one Welch segment are held
+        in memory at a time, so long durations can be used.
+        The fs_* attributes are set from the first chunk.
+
+        Parameters
+        ----------
+        channel : list of str
+            Channel names, in the order of `[Channels]`.
+        duration : float
+            Length of the data segment in seconds.
+        start : float
+            Start time of the data, in GPS time.
+        chunk : float
+            Length of the chunks in seconds.
+        time_series : list, optional
+            Time series of the channels, each with attributes `data` and
+            `sample_rate`.
+            Defaults None, which fetches them chunk by chunk.
+
+        Returns
+        -------
+        seibot.spectral.SpectralEstimator
+            The accumulated spectra.
+        """
+        names = channel_names
+        if time_series is None:
+            chunks = self.fetch_chunks(channel, duration, start, chunk)
+        else:
+            chunks = split_time_series(time_series, chunk)
+
+        spectra = None
+        for time_series_chunk in chunks:
+            if spectra is None:
+                sample_rates = {}
+                for name, ts in zip(names, time_series_chunk):
+                    sample_rates[name] = ts.sample_rate
+                    setattr(self, f"fs_{name}", ts.sample_rate)
+                spectra = seibot.spectral.SpectralEstimator(
+                    sample_rates, duration, self.n_average, self.overlap,
+                    asd=asd_channels, coherence=coherence_channels,
+                    workers=self.workers)
+            spectra.feed({name: ts.data
+                          for name, ts in zip(names, time_series_chunk)})
+        spectra.flush()
+
+        return spectra
+
     def get_nperseg(self, n_data, n_average, overlap):
         """Get nperseg"""
         nperseg = n_data / ((1-overlap) * (n_average-1))
@@ -769,7 +896,8 @@ class Data:
         Parameters
         ----------
         ts : array
-            Time series.
+            Time series, or time series of equal lengths with shape
+            (n_channels, n), transformed in one FFT.
         fs : float
             Sampling frequency.
         return_zero_frequency : bool
@@ -781,26 +909,171 @@ class Data:
         f : array
             Frequency axis.
         asd : array
-            Amplitude spectral density.
+            Amplitude spectral density, with shape (n_channels, n_f)
+            for several time series.
         """
-        nperseg = len(ts) / ((1+(1-self.overlap)*(self.n_average-1)))
+        ts = np.asarray(ts)
+        nperseg = ts.shape[-1] / ((1+(1-self.overlap)*(self.n_average-1)))
         noverlap = self.overlap * nperseg
 
-        f, psd = scipy.signal.welch(
-            ts, fs=fs, nperseg=nperseg, noverlap=noverlap)
+        f, psd = seibot.spectral.welch(
+            ts, fs, nperseg, noverlap, workers=self.workers)
 
         asd = psd**.5
 
         if not return_zero_frequency:
-            asd = asd[f>0]
+            asd = asd[..., f>0]
             f = f[f>0]
 
         # Update 2025-05-16
         # Interpolate using new frequency axis.
-        asd = np.interp(np.log10(self.f), np.log10(f), np.log10(asd))
-        asd = 10**asd
+        return self.f, self.interpolate_asd(f, asd)
 
-        return self.f, asd
+    def interpolate_asd(self, f, asd):
+        """Interpolate an amplitude spectral density in log-log scale
+
+        Parameters
+        ----------
+        f : array
+            Frequency axis of asd, without 0 Hz.
+        asd : array
+            Amplitude spectral density, with the frequency as the last axis.
+
+        Returns
+        -------
+        array
+            The amplitude spectral density at the frequency array.
+        """
+        x = np.log10(self.f)
+        xp = np.log10(f)
+        asd = np.apply_along_axis(
+            lambda fp: np.interp(x, xp, fp), -1, np.log10(asd))
+        return 10**asd
+
+    def interpolate_coh(self, f, coh):
+        """Interpolate a coherence in log frequency
+
+        Parameters
+        ----------
+        f : array
+            Frequency axis of coh, without 0 Hz.
+        coh : array
+            Coherence.
+
+        Returns
+        -------
+        array
+            The coherence at the frequency array.
+        """
+        return np.interp(np.log(self.f), np.log(f), coh)
+
+    def get_asd(self, channel):
+        """Amplitude spectral density of a channel in `[Channels]`
+
+        Uses the chunk-accumulated spectra if available,
+        or the time series otherwise.
+        Results are cached.
+
+        Parameters
+        ----------
+        channel : str
+            Name of the channel option, e.g. "seismometer".
+
+        Returns
+        -------
+        f : array
+            Frequency array.
+        asd : array
+            Amplitude spectral density.
+        """
+        if channel not in self.spectrum_cache:
+            if self.spectra is None:
+                self.estimate_asds(channel)
+            else:
+                f, asd = self.spectra.get_asd(channel)
+                self.spectrum_cache[channel] = self.interpolate_asd(
+                    f[f>0], asd[f>0])
+
+        return self.f, self.spectrum_cache[channel].copy()
+
+    def get_asd_channels(self):
+        """Channels in `[Channels]` whose ASDs the configuration uses
+
+        Returns
+        -------
+        list of str
+            Names of the channel options.
+        """
+        channels = ["witness_sensor"]
+        if (self.config.getboolean("Seismic", "dynamic")
+                or self.config.getboolean("Seismometer", "dynamic")):
+            channels.append("seismometer")
+        if self.config.getboolean("Inertial sensor", "dynamic"):
+            channels.append("inertial_sensor")
+        return channels
+
+    def estimate_asds(self, channel):
+        """Estimate the ASD of a channel from its time series
+
+        The uncached ASDs of `get_asd_channels` with the same sample rate
+        and length are estimated along, in one FFT.
+
+        Parameters
+        ----------
+        channel : str
+            Name of the channel option, e.g. "seismometer".
+        """
+        ts = getattr(self, f"ts_{channel}")
+        fs = getattr(self, f"fs_{channel}")
+        channels = [channel] + [
+            other for other in self.get_asd_channels()
+            if other != channel
+            and other not in self.spectrum_cache
+            and getattr(self, f"ts_{other}") is not None
+            and getattr(self, f"fs_{other}") == fs
+            and len(getattr(self, f"ts_{other}")) == len(ts)]
+
+        _, asds = self.ts2asd(
+            np.stack([getattr(self, f"ts_{other}") for other in channels]),
+            fs)
+        for other, asd in zip(channels, asds):
+            self.spectrum_cache[other] = asd
+
+    def get_coh(self, channel1, channel2):
+        """Coherence of two channels in `[Channels]`
+
+        Uses the chunk-accumulated spectra if available,
+        or the time series otherwise.
+        Results are cached.
+
+        Parameters
+        ----------
+        channel1 : str
+            Name of the first channel option, e.g. "seismometer".
+        channel2 : str
+            Name of the second channel option.
+
+        Returns
+        -------
+        f : array
+            Frequency array.
+        coh : array
+            Coherence.
+        """
+        key = (channel1, channel2)
+        if key not in self.spectrum_cache:
+            if self.spectra is None:
+                _, coh = self.ts2coh(
+                    getattr(self, f"ts_{channel1}"),
+                    getattr(self, f"ts_{channel2}"),
+                    getattr(self, f"fs_{channel1}"),
+                    getattr(self, f"fs_{channel2}"))
+            else:
+                f, coh = self.spectra.get_coherence(channel1, channel2)
+                coh = self.interpolate_coh(f[f>0], coh[f>0])
+            self.spectrum_cache[key] = coh
+
+        return self.f, self.spectrum_cache[key].copy()
 
     # def get_asd(self, channel, return_zero_frequency=False):
     #     """ Get an amplitude spectral density from a readout of a given channel
@@ -884,15 +1157,15 @@ class Data:
         nperseg = len(ts1) / ((1+(1-self.overlap)*(self.n_average-1)))
         noverlap = self.overlap * nperseg
 
-        f, coh = scipy.signal.coherence(
-            x=ts1, y=ts2, fs=fs1, nperseg=nperseg, noverlap=noverlap)
+        f, coh = seibot.spectral.coherence(
+            ts1, ts2, fs1, nperseg, noverlap, workers=self.workers)
 
         # Filters out 0 Hz
         if not return_zero_frequency:
             coh = coh[f>0]
             f = f[f>0]
         
-        coh = np.interp(np.log(self.f), np.log(f), coh)
+        coh = self.interpolate_coh(f, coh)
 
         return self.f, coh
 
@@ -959,3 +1232,78 @@ class Data:
         """
         ts = scipy.signal.decimate(ts, ftype="fir", q=q)
         return ts
+
+
+def get_frequency(config):
+    """Get the frequency array from the `[Frequency]` section
+
+    Parameters
+    ----------
+    config : configparser.ConfigParser
+        The Seibot configuration.
+
+    Returns
+    -------
+    f : array
+        Frequency array.
+    """
+    logspace = config.getboolean("Frequency", "logspace")
+    start = config.getfloat("Frequency", "start")
+    end = config.getfloat("Frequency", "end")
+    num = config.getint("Frequency", "num")
+
+    if logspace:
+        return np.logspace(start, end, num)
+    return np.linspace(start, end, num)
+
+
+def split_time_series(time_series, chunk):
+    """Split time series into consecutive chunks
+
+    Parameters
+    ----------
+    time_series : list
+        Time series, each with attributes `data` and `sample_rate`.
+    chunk : float
+        Length of the chunks in seconds.
+
+    Yields
+    ------
+    list of types.SimpleNamespace
+        The chunks, with attributes `data` and `sample_rate`.
+    """
+    duration = min(len(ts.data)/ts.sample_rate for ts in time_series)
+    for offset, length in get_chunks(duration, chunk):
+        yield [
+            types.SimpleNamespace(
+                data=ts.data[int(round(offset*ts.sample_rate)):
+                             int(round((offset+length)*ts.sample_rate))],
+                sample_rate=ts.sample_rate)
+            for ts in time_series]
+
+
+def get_chunks(duration, chunk):
+    """Split a duration into consecutive chunks
+
+    Parameters
+    ----------
+    duration : float
+        Total duration in seconds.
+    chunk : float
+        Length of the chunks in seconds.
+        The last chunk may be shorter.
+
+    Yields
+    ------
+    offset : float
+        Start of the chunk relative to the start, in seconds.
+    length : float
+        Length of the chunk in seconds.
+    """
+    if chunk <= 0:
+        raise ValueError("chunk must be positive.")
+    offset = 0
+    while offset < duration:
+        length = min(chunk, duration-offset)
+        yield offset, length
+        offset += length
@@ -13,8 +13,12 @@ class Evaluate:
     Each method takes a pool of configurations and a system and 
     returns the best configuration.
     """
+    default_bands = [(3e-2, 1e-1), (1e-1, 3e-1), (3e-1, 1), (1, 3)]
+
     def __init__(self, isolation_system, filter_configurations,
-                 f, seismic_noise):
+                 f, seismic_noise, bands=None,
+                 adaptive=False, coarse_step=8, rtol=1e-3,
+                 displacement_matrix=None):
         """Constructor
 
         Parameters
@@ -28,13 +32,48 @@ class Evaluate:
             Frequency array.
         seismic_noise : array
             The amplitude spectral density of the seismic noise.
+        bands : list of (float, float), optional
+            Frequency bands (f_lower, f_upper) of the band-limited RMS table.
+            Defaults None, which uses `Evaluate.default_bands`.
+        adaptive : bool, optional
+            Evaluate the criteria coarse-to-fine.
+            Configurations are ranked on every `coarse_step`-th frequency
+            and only the candidates that may be the best are refined,
+            in the coarse intervals where their spectra differ by more
+            than `rtol`. The displacement matrix is then only computed
+            when accessed.
+            Defaults False.
+        coarse_step : int, optional
+            Decimation of the coarse frequency grid.
+            Defaults 8.
+        rtol : float, optional
+            Relative tolerance of the adaptive RMS values with respect to
+            the full-resolution values.
+            Defaults 1e-3.
+        displacement_matrix : array, optional
+            Precomputed displacement matrix with shape
+            (n_sc, n_blend, n_f), e.g. attached from shared memory.
+            Defaults None, which computes it.
         """
+        if bands is None:
+            bands = self.default_bands
         self.isolation_system = isolation_system
         self.filter_configurations = filter_configurations
         self.f = f
         self.seismic_noise = seismic_noise
+        self.bands = bands
+        self.adaptive = adaptive
+        self.coarse_step = coarse_step
+        self.rtol = rtol
         
-        self.displacement_matrix = self.get_displacement_matrix()
+        # Computed when accessed in adaptive mode if not given.
+        self.displacement_matrix = displacement_matrix
+        if adaptive:
+            self.coarse_index = self.get_coarse_index()
+            self.coarse_matrix = self.get_displacement_matrix(
+                self.coarse_index)
+        elif displacement_matrix is None:
+            self.displacement_matrix = self.get_displacement_matrix()
 
     @property
     def isolation_system(self):
@@ -76,6 +115,18 @@ class Evaluate:
         """Seismic noise setter"""
         self._seismic_noise = _seismic_noise
 
+    @property
+    def bands(self):
+        """Frequency bands of the band-limited RMS table"""
+        return self._bands
+
+    @bands.setter
+    def bands(self, _bands):
+        """Frequency bands setter"""
+        self._bands = [(float(f_lower), float(f_upper))
+                       for f_lower, f_upper in _bands]
+        self._band_rms_tables = {}
+
     @property
     def n_sc(self):
         """Number of sensor correction filters"""
@@ -89,35 +140,303 @@ class Evaluate:
     @property
     def displacement_matrix(self):
         """Put all possible displacements spectrums in a matrix"""
+        if self._displacement_matrix is None:
+            self.displacement_matrix = self.get_displacement_matrix()
         return self._displacement_matrix
 
     @displacement_matrix.setter
     def displacement_matrix(self, _displacement_matrix):
         """Displacement matrix setter"""
         self._displacement_matrix = _displacement_matrix
+        self._rms_matrices = {}  # RMS matrices keyed by band and quantity.
+        self._band_rms_tables = {}
 
-    def get_displacement_matrix(self):
+    def get_displacement_matrix(self, index=None):
         """Set the displacement matrix.
         
+        Parameters
+        ----------
+        index : array, optional
+            Indices of the frequency array to evaluate at.
+            Defaults None, which evaluates at all frequencies.
+
         Returns
         -------
         displacement_matrix : ndarray
             The matrix with elements as spectrum of the
             possible displacements.
         """
-        shape = (self.n_sc, self.n_blend, len(self.f))
-        displacement_matrix = np.empty(shape)
-
-        for i in range(self.n_sc):
-            for j in range(self.n_blend):
-                filter_config = self.filter_configurations(i, j)
-                self.isolation_system.filter_configuration = filter_config
-                displacement = self.isolation_system.get_displacement(
-                    self.seismic_noise)
-                displacement_matrix[i, j] = displacement
+        sc, sc_comp, lp, hp = self.filter_configurations.get_magnitude_matrices()
+        displacement_matrix = self.isolation_system.forecast(
+            self.seismic_noise, sc, sc_comp, lp, hp, index=index)
 
         return displacement_matrix
 
+    def get_displacement(self, i, j):
+        """Displacement spectrum of a configuration
+
+        Only the configuration is forecast unless the displacement
+        matrix is already computed, e.g. in adaptive mode.
+
+        Parameters
+        ----------
+        i : int
+            Sensor correction index.
+        j : int
+            Complementary filter index.
+
+        Returns
+        -------
+        displacement : array
+            The displacement ASD.
+        """
+        if self._displacement_matrix is not None:
+            return self._displacement_matrix[i, j]
+        sc, sc_comp, lp, hp = self.filter_configurations.get_magnitude_matrices()
+        displacement = self.isolation_system.forecast(
+            self.seismic_noise, sc[i:i+1], sc_comp[i:i+1],
+            lp[:, j:j+1], hp[:, j:j+1])
+        return displacement[0, 0]
+
+    def get_coarse_index(self):
+        """Indices of the coarse frequency grid
+
+        Returns
+        -------
+        index : array
+            Every `coarse_step`-th index, including the last one.
+        """
+        index = np.arange(0, len(self.f), self.coarse_step)
+        if index[-1] != len(self.f) - 1:
+            index = np.append(index, len(self.f) - 1)
+        return index
+
+    def get_weighted(self, asd, f, quantity):
+        """Weight displacement ASDs for the RMS quantity
+
+        Parameters
+        ----------
+        asd : array
+            Displacement ASDs with the frequency as the last axis.
+        f : array
+            Frequency array of the ASDs.
+        quantity : str
+            Choose from "displacement" or "velocity".
+
+        Returns
+        -------
+        asd : array
+            The displacement or velocity ASDs.
+        """
+        if quantity == "velocity":
+            return 2*np.pi*f*asd
+        elif quantity != "displacement":
+            raise ValueError(f"Quantity {quantity} is not supported. "
+                             "Choose from displacement or velocity.")
+        return asd
+
+    def get_coarse_rms(self, f_lower, f_upper, quantity):
+        """RMS values on the coarse grid and their error estimates
+
+        The error is estimated from the difference to the RMS values
+        on every other coarse frequency.
+
+        Parameters
+        ----------
+        f_lower : float
+            Lower bound of the frequency band.
+        f_upper : float
+            Upper bound of the frequency band.
+        quantity : str
+            Choose from "displacement" or "velocity".
+
+        Returns
+        -------
+        rms : array
+            Coarse RMS values with shape (n_sc, n_blend).
+        error : array
+            Estimated absolute errors of the RMS values.
+        """
+        f = self.f[self.coarse_index]
+        mask = (f > f_lower) * (f < f_upper)
+        f = f[mask]
+        asd = self.get_weighted(self.coarse_matrix[..., mask], f, quantity)
+        rms = self.get_rms(f, asd)
+        if len(f) < 3:
+            # Too few points for an estimate, refine everything.
+            return rms, np.full(rms.shape, np.inf)
+        half = np.arange(0, len(f), 2)
+        if half[-1] != len(f) - 1:
+            half = np.append(half, len(f) - 1)
+        error = abs(rms - self.get_rms(f[half], asd[..., half]))
+        return rms, error
+
+    def refine_rms(self, i, j, f_lower, f_upper, quantity):
+        """Full-resolution RMS values of some configurations
+
+        Only coarse intervals where the coarse spectra of the
+        configurations differ by more than `rtol` are evaluated for
+        every configuration. The rest are integrated once, using the
+        configuration with the lowest coarse RMS.
+
+        Parameters
+        ----------
+        i : array
+            Sensor correction indices.
+        j : array
+            Complementary filter indices.
+        f_lower : float
+            Lower bound of the frequency band.
+        f_upper : float
+            Upper bound of the frequency band.
+        quantity : str
+            Choose from "displacement" or "velocity".
+
+        Returns
+        -------
+        rms : array
+            The RMS values of the configurations.
+        """
+        f = self.f
+        sc, sc_comp, lp, hp = self.filter_configurations.get_magnitude_matrices()
+        sc, sc_comp = sc[i, 0], sc_comp[i, 0]
+        lp, hp = lp[0, j], hp[0, j]
+
+        def forecast(k, index):
+            asd = self.isolation_system.forecast(
+                self.seismic_noise, sc[k], sc_comp[k], lp[k], hp[k],
+                index=index)
+            return self.get_weighted(asd, f[index], quantity)
+
+        # Trapezoid pieces between consecutive in-band frequencies,
+        # as in get_rms.
+        in_band = (f > f_lower) * (f < f_upper)
+        pieces = np.nonzero(in_band[:-1] * in_band[1:])[0]
+        if len(pieces) == 0:
+            return np.zeros(len(i))
+        interval = np.searchsorted(
+            self.coarse_index, pieces, side="right") - 1
+
+        # Coarse intervals where the configurations diverge.
+        coarse = self.get_weighted(
+            self.coarse_matrix[i, j], f[self.coarse_index], quantity)
+        upper = np.max(coarse, axis=0)
+        lower = np.min(coarse, axis=0)
+        spread = (upper-lower) / np.where(upper > 0, upper, 1)
+        diverge = spread > self.rtol
+        diverge = diverge[:-1] + diverge[1:]
+        diverge_pieces = diverge[interval]
+
+        def integrate(asd, index, pieces):
+            position = np.searchsorted(index, pieces)
+            power = asd**2
+            df = f[pieces+1] - f[pieces]
+            return np.sum(
+                (power[..., position] + power[..., position+1]) / 2 * df,
+                axis=-1)
+
+        # Shared contribution from the reference configuration.
+        reference = np.argmin(self.get_rms(
+            f[self.coarse_index], coarse))
+        shared_pieces = pieces[~diverge_pieces]
+        shared = 0
+        if len(shared_pieces) != 0:
+            index = np.unique(np.concatenate([shared_pieces, shared_pieces+1]))
+            shared = integrate(forecast(reference, index), index, shared_pieces)
+
+        refined_pieces = pieces[diverge_pieces]
+        refined = np.zeros(len(i))
+        if len(refined_pieces) != 0:
+            index = np.unique(
+                np.concatenate([refined_pieces, refined_pieces+1]))
+            refined = integrate(
+                forecast(slice(None), index), index, refined_pieces)
+
+        return np.sqrt(shared + refined)
+
+    def get_adaptive_index(self, f_lower=None, f_upper=None,
+                           quantity="displacement", mask=None):
+        """Index of the configuration with the lowest RMS, coarse-to-fine
+
+        Parameters
+        ----------
+        f_lower : float, default None
+            Lower bound of the frequency band.
+        f_upper : float, default None
+            Upper bound of the frequency band.
+        quantity : str, optional
+            Choose from "displacement" or "velocity".
+            Defaults "displacement".
+        mask : array, optional
+            Boolean array with shape (n_sc, n_blend) of the candidates.
+            Defaults None, which considers all configurations.
+
+        Returns
+        -------
+        Tuple
+            The index (i, j) of the optimal configuration.
+        float
+            Its RMS value, within `rtol` of the full-resolution value.
+        """
+        if f_lower is None:
+            f_lower = 0
+        if f_upper is None:
+            f_upper = np.inf
+        if mask is None:
+            mask = np.ones(self.coarse_matrix.shape[:2], dtype=bool)
+        if not np.any(mask):
+            raise ValueError("No configuration within the thresholds.")
+
+        rms, error = self.get_coarse_rms(f_lower, f_upper, quantity)
+        margin = 2*error + self.rtol*rms
+        best_upper = np.min(np.where(mask, rms+margin, np.inf))
+        survivors = mask * (rms-margin <= best_upper)
+        i, j = np.nonzero(survivors)
+
+        refined = self.refine_rms(i, j, f_lower, f_upper, quantity)
+        k = np.argmin(refined)
+
+        return (i[k], j[k]), refined[k]
+
+    def get_adaptive_threshold_mask(self, disp_thres, vel_thres):
+        """Returns a mask of configurations within thresholds, coarse-to-fine
+
+        Configurations clearly within or outside the thresholds on the
+        coarse grid are decided there, the rest are refined.
+
+        Parameters
+        ----------
+        disp_thres : float
+            RMS displacement threshold (nm).
+        vel_thres : float
+            RMS velocity threshold (nm/s).
+        
+        Returns
+        -------
+        mask : array
+            Boolean array with shape (n_sc, n_blend).
+        """
+        inside = np.ones(self.coarse_matrix.shape[:2], dtype=bool)
+        outside = np.zeros(self.coarse_matrix.shape[:2], dtype=bool)
+        for quantity, thres in [
+                ("displacement", disp_thres), ("velocity", vel_thres)]:
+            rms, error = self.get_coarse_rms(0, np.inf, quantity)
+            rms, margin = rms*1e9, (2*error + self.rtol*rms)*1e9  # m to nm
+            inside *= rms + margin <= thres
+            outside += rms - margin > thres
+
+        mask = inside.copy()
+        i, j = np.nonzero(~inside * ~outside)
+        if len(i) != 0:
+            within = np.ones(len(i), dtype=bool)
+            for quantity, thres in [
+                    ("displacement", disp_thres), ("velocity", vel_thres)]:
+                rms = self.refine_rms(i, j, 0, np.inf, quantity) * 1e9
+                within *= rms <= thres
+            mask[i, j] = within
+
+        return mask
+
     def get_rms(self, f, asd):
         """Get RMS value of from ASD
         
@@ -127,6 +446,7 @@ class Evaluate:
             Frequency array
         asd : array
             The amplitude spectral density.
+            The last axis is the frequency axis.
 
         Returns
         -------
@@ -136,8 +456,11 @@ class Evaluate:
         rms = np.sqrt(np.trapz(y=asd**2, x=f))
         return rms
 
-    def min_rms_displacement(self, f_lower=None, f_upper=None):
-        """Returns a configuration with lowest RMS displacement. 
+    def get_rms_matrix(self, f_lower=None, f_upper=None,
+                       quantity="displacement"):
+        """Get RMS values of all configurations.
+
+        The RMS matrices are computed once per band and quantity.
 
         Parameters
         ----------
@@ -145,19 +468,105 @@ class Evaluate:
             Lower bound of the frequency band.
         f_upper : float, default None
             Upper bound of the frequency band.
+        quantity : str, optional
+            Choose from "displacement" or "velocity".
+            Defaults "displacement".
+
+        Returns
+        -------
+        rms_matrix : array
+            The RMS values (m or m/s) with shape (n_sc, n_blend).
         """
         if f_lower is None:
             f_lower = 0
         if f_upper is None:
             f_upper = np.inf
-        mask = (self.f > f_lower) * (self.f < f_upper)
-        rms_displacement_matrix = np.empty(
-            np.shape(self.displacement_matrix[:, :, 0]))
-        for i in range(len(rms_displacement_matrix)):
-            for j in range(len(rms_displacement_matrix[0])):
-                f = self.f[mask]
-                displacement = self.displacement_matrix[i, j][mask]
-                rms_displacement_matrix[i, j] = self.get_rms(f, displacement)
+        key = (f_lower, f_upper, quantity)
+        if key not in self._rms_matrices:
+            mask = (self.f > f_lower) * (self.f < f_upper)
+            f = self.f[mask]
+            asd = self.displacement_matrix[:, :, mask]
+            if quantity == "velocity":
+                asd = 2*np.pi*f*asd
+            elif quantity != "displacement":
+                raise ValueError(f"Quantity {quantity} is not supported. "
+                                 "Choose from displacement or velocity.")
+            self._rms_matrices[key] = self.get_rms(f, asd)
+
+        return self._rms_matrices[key]
+
+    def get_band_rms_table(self, quantity="displacement"):
+        """Get overall and band-limited RMS values of all configurations.
+
+        Parameters
+        ----------
+        quantity : str, optional
+            Choose from "displacement" or "velocity".
+            Defaults "displacement".
+
+        Returns
+        -------
+        band_rms_table : array
+            The RMS values (m or m/s) with shape (n_sc, n_blend, 1+n_bands).
+            The first column is the overall RMS
+            and the rest follow the order of `bands`.
+        """
+        if quantity not in self._band_rms_tables:
+            rms_matrices = [self.get_rms_matrix(quantity=quantity)]
+            for f_lower, f_upper in self.bands:
+                rms_matrices.append(
+                    self.get_rms_matrix(f_lower, f_upper, quantity))
+            self._band_rms_tables[quantity] = np.stack(rms_matrices, axis=-1)
+
+        return self._band_rms_tables[quantity]
+
+    def get_band_rms(self, displacement, quantity="displacement"):
+        """Get overall and band-limited RMS values of displacements.
+
+        Parameters
+        ----------
+        displacement : array
+            Displacement ASDs with the frequency as the last axis.
+        quantity : str, optional
+            Choose from "displacement" or "velocity".
+            Defaults "displacement".
+
+        Returns
+        -------
+        band_rms : array
+            The RMS values (m or m/s) with shape (..., 1+n_bands),
+            ordered as in `get_band_rms_table`.
+        """
+        asd = np.asarray(displacement)
+        if quantity == "velocity":
+            asd = 2*np.pi*self.f*asd
+        elif quantity != "displacement":
+            raise ValueError(f"Quantity {quantity} is not supported. "
+                             "Choose from displacement or velocity.")
+        band_rms = [self.get_rms(self.f, asd)]
+        for f_lower, f_upper in self.bands:
+            mask = (self.f > f_lower) * (self.f < f_upper)
+            band_rms.append(self.get_rms(self.f[mask], asd[..., mask]))
+
+        return np.stack(band_rms, axis=-1)
+
+    def min_rms_displacement(self, f_lower=None, f_upper=None):
+        """Returns a configuration with lowest RMS displacement. 
+
+        Parameters
+        ----------
+        f_lower : float, default None
+            Lower bound of the frequency band.
+        f_upper : float, default None
+            Upper bound of the frequency band.
+        """
+        if self.adaptive:
+            (min_i, min_j), _ = self.get_adaptive_index(
+                f_lower, f_upper, "displacement")
+            return self.filter_configurations(min_i, min_j)
+
+        rms_displacement_matrix = self.get_rms_matrix(
+            f_lower, f_upper, "displacement")
 
         argmin = np.argmin(rms_displacement_matrix)
         min_i, min_j = np.unravel_index(argmin, rms_displacement_matrix.shape)
@@ -174,24 +583,42 @@ class Evaluate:
         f_upper : float, default None
             Upper bound of the frequency band.
         """
-        if f_lower is None:
-            f_lower = 0
-        if f_upper is None:
-            f_upper = np.inf
-        mask = (self.f > f_lower) * (self.f < f_upper)
-        rms_velocity_matrix = np.empty(
-            np.shape(self.displacement_matrix[:, :, 0]))
-        for i in range(len(rms_velocity_matrix)):
-            for j in range(len(rms_velocity_matrix[0])):
-                f = self.f[mask]
-                velocity = 2*np.pi*f*self.displacement_matrix[i, j][mask] 
-                rms_velocity_matrix[i, j] = self.get_rms(f, velocity)
+        if self.adaptive:
+            (min_i, min_j), _ = self.get_adaptive_index(
+                f_lower, f_upper, "velocity")
+            return self.filter_configurations(min_i, min_j)
+
+        rms_velocity_matrix = self.get_rms_matrix(
+            f_lower, f_upper, "velocity")
 
         argmin = np.argmin(rms_velocity_matrix)
         min_i, min_j = np.unravel_index(argmin, rms_velocity_matrix.shape)
         
         return self.filter_configurations(min_i, min_j)
 
+    def get_threshold_mask(self, disp_thres, vel_thres):
+        """Returns a mask of configurations within thresholds.
+        
+        Parameters
+        ----------
+        disp_thres : float
+            RMS displacement threshold (nm).
+        vel_thres : float
+            RMS velocity threshold (nm/s).
+        
+        Returns
+        -------
+        mask : array
+            Boolean array with shape (n_sc, n_blend).
+        """
+        if self.adaptive:
+            return self.get_adaptive_threshold_mask(disp_thres, vel_thres)
+
+        rms_displacement = self.get_rms_matrix() * 1e9  # m to nm
+        rms_velocity = self.get_rms_matrix(quantity="velocity") * 1e9
+        mask = (rms_displacement <= disp_thres) * (rms_velocity <= vel_thres)
+        return mask
+
     def get_threshold_indices(self, disp_thres, vel_thres):
         """Returns a list of indices of displacements within thresholds.
         
@@ -207,25 +634,52 @@ class Evaluate:
         List of Tuples
             A list of indices of the displacement matrix.
         """
-        list_indices = []
-        for i in range(len(self.displacement_matrix)):
-            for j in range(len(self.displacement_matrix[0])):
-                # Test RMS displacement
-                displacement = self.displacement_matrix[i, j]
-                rms_displacement = self.get_rms(self.f, displacement)
-                rms_displacement *= 1e9  # m to nm
-                if rms_displacement > disp_thres:
-                    continue
-                # Test RMS velocity
-                velocity = 2*np.pi*self.f*displacement
-                rms_velocity = self.get_rms(self.f, velocity)
-                rms_velocity *= 1e9
-                if rms_velocity > vel_thres:
-                    continue
-                # Passes two tests
-                list_indices.append((i, j))
+        mask = self.get_threshold_mask(disp_thres, vel_thres)
+        list_indices = [
+            (int(i), int(j)) for i, j in zip(*np.nonzero(mask))]
         return list_indices
 
+    def get_threshold_optimal_index(
+            self, disp_thres, vel_thres, f_lower, f_upper, optimize):
+        """Eliminate and then optimize within frequency band
+        
+        Parameters
+        ----------
+        disp_thres : float
+            RMS displacement threshold (nm).
+        vel_thres : float
+            RMS velocity threshold (nm/s).
+        f_lower : float
+            Lower bound of the frequency band.
+        f_upper : float
+            Upper bound of the frequency band.
+        optimize : str
+            Optimize RMS displacement or velocity within the frequency band.
+            Choose from "displacement" or "velocity"
+
+        Returns
+        -------
+        Tuple
+            The index (i, j) of the optimal configuration.
+        """
+        mask = self.get_threshold_mask(disp_thres, vel_thres)
+        if not np.any(mask):
+            raise ValueError("No configuration within the thresholds.")
+        if optimize != "velocity":
+            optimize = "displacement"
+        if self.adaptive:
+            index, _ = self.get_adaptive_index(
+                f_lower, f_upper, optimize, mask=mask)
+            return index
+
+        rms = self.get_rms_matrix(f_lower, f_upper, optimize)
+        rms = np.where(mask, rms, np.inf)
+
+        argmin = np.argmin(rms)
+        min_i, min_j = np.unravel_index(argmin, rms.shape)
+
+        return min_i, min_j
+
     def threshold_optimize(
             self, disp_thres, vel_thres, f_lower, f_upper, optimize):
         """Eliminate and then optimize within frequency band
@@ -251,22 +705,292 @@ class Evaluate:
             thresholds that gives optimized band-limited
             displacement/velocity RMS.
         """
-        list_indices = self.get_threshold_indices(disp_thres, vel_thres)
-        list_rms = []
+        min_i, min_j = self.get_threshold_optimal_index(
+            disp_thres, vel_thres, f_lower, f_upper, optimize)
+
+        return self.filter_configurations(min_i, min_j)
+
+
+class EnsembleEvaluate(Evaluate):
+    """Evaluate configurations over an ensemble of seismic spectra
+
+    The RMS values of all configurations are computed for every member
+    of the ensemble and reduced to a statistic across the ensemble,
+    which the criteria of `Evaluate` then use.
+    The displacement matrix is the forecast of the root-mean-square
+    seismic noise of the ensemble.
+
+    Parameters
+    ----------
+    isolation_system : seibot.isolation_system.IsolationSystem
+       The isolation system with sensors and plants specified.
+    filter_configurations : seibot.filter.FilterConfigurations
+        The Filter configurations with all possible
+        seismic isolation control configurations.
+    f : array
+        Frequency array.
+    seismic_noises : array
+        The amplitude spectral densities of the seismic noise
+        with shape (n_ensemble, n_f).
+    bands : list of (float, float), optional
+        Frequency bands (f_lower, f_upper) of the band-limited RMS table.
+        Defaults None, which uses `Evaluate.default_bands`.
+    statistic : str, optional
+        The RMS statistic across the ensemble used by the criteria.
+        Choose from "mean", "percentile" or "worst".
+        Defaults "mean".
+    percentile : float, optional
+        The percentile (0-100) of the "percentile" statistic.
+        Defaults 90.
+    chunk : int, optional
+        Number of ensemble members forecasted at once.
+        Defaults None, which forecasts all at once.
+    """
+    statistics = ["mean", "percentile", "worst"]
+
+    def __init__(self, isolation_system, filter_configurations,
+                 f, seismic_noises, bands=None,
+                 statistic="mean", percentile=90, chunk=None):
+        """Constructor
+
+        Parameters
+        ----------
+        isolation_system : seibot.isolation_system.IsolationSystem
+           The isolation system with sensors and plants specified.
+        filter_configurations : seibot.filter.FilterConfigurations
+            The Filter configurations with all possible
+            seismic isolation control configurations.
+        f : array
+            Frequency array.
+        seismic_noises : array
+            The amplitude spectral densities of the seismic noise
+            with shape (n_ensemble, n_f).
+        bands : list of (float, float), optional
+            Frequency bands (f_lower, f_upper) of the band-limited RMS table.
+            Defaults None, which uses `Evaluate.default_bands`.
+        statistic : str, optional
+            The RMS statistic across the ensemble used by the criteria.
+            Choose from "mean", "percentile" or "worst".
+            Defaults "mean".
+        percentile : float, optional
+            The percentile (0-100) of the "percentile" statistic.
+            Defaults 90.
+        chunk : int, optional
+            Number of ensemble members forecasted at once.
+            Defaults None, which forecasts all at once.
+        """
+        self.seismic_noises = seismic_noises
+        self.statistic = statistic
+        self.percentile = percentile
+        self.chunk = chunk
+        super().__init__(
+            isolation_system, filter_configurations, f,
+            self.seismic_noise, bands=bands)
+
+    @property
+    def seismic_noises(self):
+        """Seismic noise ensemble"""
+        return self._seismic_noises
+
+    @seismic_noises.setter
+    def seismic_noises(self, _seismic_noises):
+        """Seismic noise ensemble setter
+
+        Also sets the root-mean-square seismic noise of the ensemble and
+        resets the displacement matrix forecasted from it.
+        """
+        _seismic_noises = np.atleast_2d(_seismic_noises)
+        if _seismic_noises.ndim != 2:
+            raise ValueError("seismic_noises must have shape "
+                             "(n_ensemble, n_f).")
+        self._seismic_noises = _seismic_noises
+        self.seismic_noise = np.sqrt(np.mean(_seismic_noises**2, axis=0))
+        # Recomputed when accessed.
+        self.displacement_matrix = None
+        self._ensemble_rms_matrices = {}
+        self._statistic_rms_matrices = {}
+        self._band_rms_tables = {}
+
+    @property
+    def n_ensemble(self):
+        """Number of ensemble members"""
+        return len(self.seismic_noises)
+
+    @property
+    def statistic(self):
+        """The RMS statistic used by the criteria"""
+        return self._statistic
+
+    @statistic.setter
+    def statistic(self, _statistic):
+        """Statistic setter"""
+        if _statistic not in self.statistics:
+            raise ValueError(f"Statistic {_statistic} is not supported. "
+                             "Choose from mean, percentile or worst.")
+        self._statistic = _statistic
+        self._band_rms_tables = {}
+
+    @property
+    def percentile(self):
+        """Percentile of the percentile statistic"""
+        return self._percentile
+
+    @percentile.setter
+    def percentile(self, _percentile):
+        """Percentile setter"""
+        self._percentile = _percentile
+        self._statistic_rms_matrices = {}
+        self._band_rms_tables = {}
+
+    def get_ensemble_displacement(self, seismic_noises, index=None):
+        """Displacements of all configurations for each seismic spectrum
+
+        Parameters
+        ----------
+        seismic_noises : array
+            The amplitude spectral densities of the seismic noise
+            with shape (n, n_f).
+        index : array, optional
+            Indices of the frequency array to evaluate at.
+            Defaults None, which evaluates at all frequencies.
+
+        Returns
+        -------
+        displacement : array
+            The displacements with shape (n, n_sc, n_blend, n_f).
+        """
+        sc, sc_comp, lp, hp = self.filter_configurations.get_magnitude_matrices()
+        seismic_noises = np.asarray(seismic_noises)[:, None, None, :]
+        displacement = self.isolation_system.forecast(
+            seismic_noises, sc, sc_comp, lp, hp, index=index)
+
+        return displacement
+
+    def get_ensemble_rms_matrix(self, f_lower=None, f_upper=None,
+                                quantity="displacement"):
+        """Get RMS values of all configurations for each ensemble member
+
+        Ensemble members are forecasted `chunk` at a time and only
+        the RMS values are kept.
+
+        Parameters
+        ----------
+        f_lower : float, default None
+            Lower bound of the frequency band.
+        f_upper : float, default None
+            Upper bound of the frequency band.
+        quantity : str, optional
+            Choose from "displacement" or "velocity".
+            Defaults "displacement".
+
+        Returns
+        -------
+        rms_matrix : array
+            The RMS values (m or m/s) with shape (n_ensemble, n_sc, n_blend).
+        """
+        if f_lower is None:
+            f_lower = 0
+        if f_upper is None:
+            f_upper = np.inf
+        key = (f_lower, f_upper, quantity)
+        if key not in self._ensemble_rms_matrices:
+            index = np.nonzero((self.f > f_lower) * (self.f < f_upper))[0]
+            f = self.f[index]
+            chunk = self.chunk or self.n_ensemble
+            rms_matrices = []
+            for start in range(0, self.n_ensemble, chunk):
+                displacement = self.get_ensemble_displacement(
+                    self.seismic_noises[start:start+chunk], index=index)
+                asd = self.get_weighted(displacement, f, quantity)
+                rms_matrices.append(self.get_rms(f, asd))
+            self._ensemble_rms_matrices[key] = np.concatenate(rms_matrices)
+
+        return self._ensemble_rms_matrices[key]
+
+    def get_statistic_rms_matrix(self, statistic=None, f_lower=None,
+                                 f_upper=None, quantity="displacement"):
+        """Get an RMS statistic across the ensemble of all configurations
 
-        mask = (self.f > f_lower) * (self.f < f_upper)
-        f = self.f[mask]
+        Parameters
+        ----------
+        statistic : str, optional
+            Choose from "mean", "percentile" or "worst".
+            Defaults None, which uses `statistic`.
+        f_lower : float, default None
+            Lower bound of the frequency band.
+        f_upper : float, default None
+            Upper bound of the frequency band.
+        quantity : str, optional
+            Choose from "displacement" or "velocity".
+            Defaults "displacement".
 
-        for index in list_indices:
-            displacement = self.displacement_matrix[index][mask]
-            if optimize == "velocity":
-                asd = 2*np.pi*f*displacement
+        Returns
+        -------
+        rms_matrix : array
+            The RMS statistic (m or m/s) with shape (n_sc, n_blend).
+        """
+        if statistic is None:
+            statistic = self.statistic
+        key = (statistic, f_lower, f_upper, quantity)
+        if key not in self._statistic_rms_matrices:
+            rms = self.get_ensemble_rms_matrix(f_lower, f_upper, quantity)
+            if statistic == "mean":
+                rms_matrix = np.mean(rms, axis=0)
+            elif statistic == "percentile":
+                rms_matrix = np.percentile(rms, self.percentile, axis=0)
+            elif statistic == "worst":
+                rms_matrix = np.max(rms, axis=0)
             else:
-                asd = displacement
-            rms = self.get_rms(f, asd)
-            list_rms.append(rms)
+                raise ValueError(f"Statistic {statistic} is not supported. "
+                                 "Choose from mean, percentile or worst.")
+            self._statistic_rms_matrices[key] = rms_matrix
 
-        min_index = np.argmin(list_rms)
-        min_i, min_j = list_indices[min_index]
+        return self._statistic_rms_matrices[key]
 
-        return self.filter_configurations(min_i, min_j)
+    def get_rms_matrix(self, f_lower=None, f_upper=None,
+                       quantity="displacement"):
+        """Get the RMS statistic of all configurations.
+
+        Parameters
+        ----------
+        f_lower : float, default None
+            Lower bound of the frequency band.
+        f_upper : float, default None
+            Upper bound of the frequency band.
+        quantity : str, optional
+            Choose from "displacement" or "velocity".
+            Defaults "displacement".
+
+        Returns
+        -------
+        rms_matrix : array
+            The `statistic` of the RMS values (m or m/s)
+            with shape (n_sc, n_blend).
+        """
+        return self.get_statistic_rms_matrix(
+            None, f_lower, f_upper, quantity)
+
+    def get_ensemble_summary(self, f_lower=None, f_upper=None,
+                             quantity="displacement"):
+        """Get the expected, percentile and worst-case RMS values
+
+        Parameters
+        ----------
+        f_lower : float, default None
+            Lower bound of the frequency band.
+        f_upper : float, default None
+            Upper bound of the frequency band.
+        quantity : str, optional
+            Choose from "displacement" or "velocity".
+            Defaults "displacement".
+
+        Returns
+        -------
+        summary : dict
+            RMS matrices (m or m/s) with shape (n_sc, n_blend)
+            keyed by statistic.
+        """
+        return {
+            statistic: self.get_statistic_rms_matrix(
+                statistic, f_lower, f_upper, quantity)
+            for statistic in self.statistics}
@@ -1,5 +1,10 @@
 """Seibot filter class"""
+import collections
+import collections.abc
 import configparser
+import hashlib
+import itertools
+import os
 
 import control
 import numpy as np
@@ -18,6 +23,13 @@ class Filter(control.TransferFunction):
         The filter module the filter is in.
     fm : list of int
         The engaged FMs of this filter
+    response : array
+        The complex frequency response.
+
+    Note
+    ----
+    Use `registry.get_filter` to share foton filters with identical
+    specifications.
     """
     def __init__(
             self, tf=None,
@@ -28,26 +40,52 @@ class Filter(control.TransferFunction):
             inverse_filter = control.tf([1], [1])
         
         if tf is not None:
-            pass
+            tf = tf / inverse_filter
         elif (filter_file is not None
                 and module is not None
                 and fm is not None):
-            foton = seibot.foton.Foton(filter_file)
-            tf = foton.get_filter_tf(module, fm)
+            foton = registry.get_foton(filter_file)
+            tf = foton.get_filter_tf(module, fm) / inverse_filter
             self.filter_file = filter_file
             self.module = module
             self.fm = fm
         else:
             raise ValueError(
                 "Either tf or (filter_file, module, fm) must be specified")
-        tf = tf / inverse_filter
         super().__init__(tf)
 
+        self._response = None
+        self._mag = None
+        self._mag_comp = None
         if f is not None:
-            self.mag = abs(tf(1j*2*np.pi*f))
-            self.mag_comp = abs((1-tf)(1j*2*np.pi*f))
             self.f = f
+            self._response = self.get_response(tf, f)
+
+    @staticmethod
+    def get_response(tf, f):
+        """Evaluate a read-only frequency response
         
+        Parameters
+        ----------
+        tf : TransferFunction
+            The transfer function.
+        f : array
+            Frequency array.
+
+        Returns
+        -------
+        response : array
+            The complex frequency response.
+        """
+        response = np.asarray(tf(1j*2*np.pi*f), dtype=complex)
+        response.flags.writeable = False  # Shared between filters.
+        return response
+
+    @property
+    def response(self):
+        """Complex frequency response"""
+        return self._response
+
     @property
     def module(self):
         """Foton module name"""
@@ -83,6 +121,8 @@ class Filter(control.TransferFunction):
     @property
     def mag(self):
         """Magnitude response"""
+        if self._mag is None and self.response is not None:
+            self._mag = abs(self.response)
         return self._mag
     
     @mag.setter
@@ -93,6 +133,8 @@ class Filter(control.TransferFunction):
     @property
     def mag_comp(self):
         """Magnitude response of the complement filter"""
+        if self._mag_comp is None and self.response is not None:
+            self._mag_comp = abs(1-self.response)
         return self._mag_comp
     
     @mag_comp.setter
@@ -100,6 +142,13 @@ class Filter(control.TransferFunction):
         """mag_comp.setter"""
         self._mag_comp = _mag_comp
 
+    @property
+    def phase(self):
+        """Phase response in radians"""
+        if self.response is None:
+            return None
+        return np.angle(self.response)
+
     @property
     def f(self):
         """Frequency"""
@@ -110,6 +159,292 @@ class Filter(control.TransferFunction):
         """f.setter"""
         self._f = _f
 
+
+class FilterRegistry:
+    """Interned foton filters
+
+    Filters are keyed by (filter_file, contents of the foton file, module,
+    fm, inverse filter, frequency array), so the same filter referenced
+    by several pools or read as a current filter is constructed once and
+    shared.
+    Foton files are parsed once per contents, so edited files are
+    reparsed and the entries of their previous contents are dropped.
+    Each cache keeps at most `max_entries` entries and evicts the least
+    recently used ones, e.g. of foton files no longer referenced by a
+    long-lived process.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        Number of entries of each cache.
+        Defaults 4096.
+    """
+    def __init__(self, max_entries=4096):
+        """Constructor
+
+        Parameters
+        ----------
+        max_entries : int, optional
+            Number of entries of each cache.
+            Defaults 4096.
+        """
+        self.max_entries = max_entries
+        self._file_keys = {}  # (stat signature, digest) keyed by path.
+        # Least recently used entries first.
+        self._fotons = collections.OrderedDict()
+        self._filters = collections.OrderedDict()
+        self._fm_responses = collections.OrderedDict()
+        self._inverse_filters = {}
+        self._inverse_responses = collections.OrderedDict()
+
+    def __len__(self):
+        """Number of interned filters"""
+        return len(self._filters)
+
+    def get_file_key(self, filter_file):
+        """Get the digest of the contents of a foton file
+
+        The file is only read again when its modification time or size
+        changes.
+
+        Parameters
+        ----------
+        filter_file : str
+            Path of the foton file.
+
+        Returns
+        -------
+        str
+            The digest.
+        """
+        stat = os.stat(filter_file)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if filter_file in self._file_keys:
+            cached_signature, digest = self._file_keys[filter_file]
+            if cached_signature == signature:
+                return digest
+
+        with open(filter_file, "rb") as file:
+            digest = hashlib.sha1(file.read()).hexdigest()
+        if self._file_keys.get(filter_file, (None, digest))[1] != digest:
+            self.drop(filter_file)
+        self._file_keys[filter_file] = (signature, digest)
+        return digest
+
+    def drop(self, filter_file):
+        """Drop the cached foton file and filters of a path
+
+        Parameters
+        ----------
+        filter_file : str
+            Path of the foton file.
+        """
+        self._file_keys.pop(filter_file, None)
+        for cache in [self._fotons, self._filters, self._fm_responses]:
+            for key in [key for key in cache if key[0] == filter_file]:
+                del cache[key]
+
+    def get_cached(self, cache, key, build):
+        """Get an entry of a cache, building it if missing
+
+        Parameters
+        ----------
+        cache : collections.OrderedDict
+            The cache.
+        key : tuple
+            The key.
+        build : callable
+            Called without arguments to build a missing entry.
+
+        Returns
+        -------
+        entry
+            The cached entry.
+        """
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        cache[key] = entry = build()
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+        return entry
+
+    def get_foton(self, filter_file):
+        """Get the parsed foton file
+
+        Parameters
+        ----------
+        filter_file : str
+            Path of the foton file.
+
+        Returns
+        -------
+        seibot.foton.Foton
+            The foton file, parsed again if its contents changed.
+        """
+        key = (filter_file, self.get_file_key(filter_file))
+        return self.get_cached(
+            self._fotons, key, lambda: seibot.foton.Foton(filter_file))
+
+    def get_filter(self, filter_file, module, fm, f=None,
+                   inverse_filter=None):
+        """Get an interned filter
+
+        Parameters
+        ----------
+        filter_file : str
+            Path of the foton file.
+        module : str
+            The filter module.
+        fm : list of int
+            The engaged FMs.
+        f : array, optional
+            Frequency array.
+            Defaults None.
+        inverse_filter : TransferFunction, optional
+            Inverse filter embedded in the filter.
+            Defaults None.
+
+        Returns
+        -------
+        Filter
+            The filter, shared by all identical specifications.
+        """
+        if inverse_filter is None:
+            inverse_filter = control.tf([1], [1])
+        f_key = None if f is None else get_frequency_key(f)
+        key = (filter_file, self.get_file_key(filter_file), module,
+               tuple(fm), get_tf_key(inverse_filter), f_key)
+        return self.get_cached(self._filters, key, lambda: Filter(
+            filter_file=filter_file, module=module, fm=list(fm), f=f,
+            inverse_filter=inverse_filter))
+
+    def get_fm_response(self, filter_file, module, fm, f):
+        """Get the frequency response of a single FM
+
+        Parameters
+        ----------
+        filter_file : str
+            Path of the foton file.
+        module : str
+            The filter module.
+        fm : int
+            The FM.
+        f : array
+            Frequency array.
+
+        Returns
+        -------
+        response : array
+            The read-only complex frequency response.
+        """
+        key = (filter_file, self.get_file_key(filter_file), module, fm,
+               get_frequency_key(f))
+        return self.get_cached(
+            self._fm_responses, key, lambda: Filter.get_response(
+                self.get_foton(filter_file).get_filter_tf(module, [fm]), f))
+
+    def get_inverse_filter(self, name):
+        """Get an inverse filter of `InverseFilters`
+
+        Parameters
+        ----------
+        name : str
+            Name of the inverse filter, e.g. "gs13".
+
+        Returns
+        -------
+        TransferFunction
+            The inverse filter, built once.
+        """
+        if name not in self._inverse_filters:
+            if not isinstance(getattr(InverseFilters, name, None), property):
+                raise ValueError(f"Unknown inverse filter {name}.")
+            self._inverse_filters[name] = getattr(InverseFilters(), name)
+        return self._inverse_filters[name]
+
+    def get_inverse_response(self, name, f):
+        """Get the frequency response of an inverse filter
+
+        Parameters
+        ----------
+        name : str
+            Name of the inverse filter, e.g. "gs13".
+        f : array
+            Frequency array.
+
+        Returns
+        -------
+        response : array
+            The read-only complex frequency response.
+        """
+        key = (name, get_frequency_key(f))
+        return self.get_cached(
+            self._inverse_responses, key, lambda: Filter.get_response(
+                self.get_inverse_filter(name), f))
+
+    def clear(self):
+        """Clear interned filters and parsed foton files"""
+        self._file_keys.clear()
+        self._fotons.clear()
+        self._filters.clear()
+        self._fm_responses.clear()
+        self._inverse_filters.clear()
+        self._inverse_responses.clear()
+
+
+def get_label(filter_):
+    """Label a filter by its module and engaged FMs
+
+    Parameters
+    ----------
+    filter_ : Filter
+        The filter.
+
+    Returns
+    -------
+    str
+        e.g. "HAM8_SENSCOR_Y_UNCOR_FILT2 FM1 FM10".
+    """
+    fm = " ".join(f"FM{fm}" for fm in (filter_.fm or []))
+    return f"{filter_.module or ''} {fm}".strip()
+
+
+def get_tf_key(tf):
+    """Hashable key of a SISO transfer function
+    
+    Parameters
+    ----------
+    tf : TransferFunction
+        The transfer function.
+
+    Returns
+    -------
+    tuple
+        The numerator and denominator coefficients.
+    """
+    num = tuple(np.atleast_1d(tf.num[0][0]).tolist())
+    den = tuple(np.atleast_1d(tf.den[0][0]).tolist())
+    return num, den
+
+
+def get_frequency_key(f):
+    """Hashable key of a frequency array
+    
+    Parameters
+    ----------
+    f : array
+        Frequency array.
+
+    Returns
+    -------
+    tuple
+        The length and the digest of the array.
+    """
+    f = np.ascontiguousarray(f, dtype=float)
+    return len(f), hashlib.sha1(f.tobytes()).hexdigest()
+
+
 # def make_filter(filter_file, module
 class FilterPool(list):
     """Filter pool"""
@@ -153,23 +488,16 @@ class FilterPool(list):
         if inverse_filter is None:
             inverse_filter = control.tf([1], [1])
 
-        filter_file = ""
         for filter_ in self.config.sections():
-            # This if-else statement avoids unnecssary calls
-            # of the python-foton module, which is slow.
-            if filter_file == self.config[filter_].get("filter_file"):
-                pass
-            else:
-                filter_file = self.config[filter_].get("filter_file")
-                foton = seibot.foton.Foton(filter_file)
-
+            filter_file = self.config[filter_].get("filter_file")
             module = self.config[filter_].get("module")
             fm = self.config[filter_].get("fm")
 
             # Convert fm str to list.
             fm_list = [int(fm.strip()) for fm in fm.split(",")]
 
-            filter_obj = Filter(
+            # Identical filters are shared with other pools.
+            filter_obj = registry.get_filter(
                 filter_file=filter_file,
                 module=module,
                 fm=fm_list,
@@ -193,6 +521,205 @@ class FilterPool(list):
             self.append(filter_obj)
 
 
+class ResponseFilter:
+    """Filter defined by its frequency response
+
+    A lightweight stand-in for `Filter` in combinatorial pools.
+    The transfer function is only built when accessed.
+
+    Parameters
+    ----------
+    filter_file : str
+        The path of the foton file.
+    module : str
+        The filter module the filter is in.
+    fm : list of int
+        The engaged FMs of this filter.
+    f : array
+        Frequency array.
+    response : array
+        The complex frequency response.
+    inverse_filter : TransferFunction, optional
+        Inverse filter embedded in the filter.
+        Defaults None.
+    """
+    def __init__(self, filter_file, module, fm, f, response,
+                 inverse_filter=None):
+        """Constructor
+
+        Parameters
+        ----------
+        filter_file : str
+            The path of the foton file.
+        module : str
+            The filter module the filter is in.
+        fm : list of int
+            The engaged FMs of this filter.
+        f : array
+            Frequency array.
+        response : array
+            The complex frequency response.
+        inverse_filter : TransferFunction, optional
+            Inverse filter embedded in the filter.
+            Defaults None.
+        """
+        if inverse_filter is None:
+            inverse_filter = control.tf([1], [1])
+        self.filter_file = filter_file
+        self.module = module
+        self.fm = fm
+        self.f = f
+        self.response = response
+        self.inverse_filter = inverse_filter
+        self._tf = None
+        self._mag = None
+        self._mag_comp = None
+
+    def __call__(self, s):
+        """Evaluate the transfer function"""
+        return self.tf(s)
+
+    @property
+    def tf(self):
+        """Transfer function"""
+        if self._tf is None:
+            foton = registry.get_foton(self.filter_file)
+            self._tf = (foton.get_filter_tf(self.module, self.fm)
+                        / self.inverse_filter)
+        return self._tf
+
+    @property
+    def mag(self):
+        """Magnitude response"""
+        if self._mag is None:
+            self._mag = abs(self.response)
+        return self._mag
+
+    @property
+    def mag_comp(self):
+        """Magnitude response of the complement filter"""
+        if self._mag_comp is None:
+            self._mag_comp = abs(1-self.response)
+        return self._mag_comp
+
+    @property
+    def phase(self):
+        """Phase response in radians"""
+        return np.angle(self.response)
+
+
+class CombinatorialPool(collections.abc.Sequence):
+    """Filter pool of FM combinations enumerated by rules
+
+    Each section of the rule configuration enumerates FM combinations
+    of one filter module with the options
+
+    - `filter_file`: The path of the foton filter file.
+    - `module`: The filter module name.
+    - `always`: Optional. FMs engaged in every combination.
+    - `choose_from`: Optional. FMs to choose from.
+    - `n_choose`: Optional. Numbers of FMs chosen from `choose_from`.
+      Defaults 1.
+
+    e.g. `always = 10`, `choose_from = 1, 2, 3` and `n_choose = 1`
+    give FM1 + FM10, FM2 + FM10 and FM3 + FM10.
+    The response of each FM is evaluated once and the response of each
+    combination is the product of them, evaluated when the filter
+    is first accessed.
+    """
+    def __init__(self, f, filter_config, inverse_filter=None):
+        """Constructor
+        
+        Parameters
+        ----------
+        f : array
+            Frequency array
+        filter_config : str
+            Path of the rule configuration.
+        inverse_filter : control.TransferFunction, optional
+            Filter representing the inverse response of a sensor.
+            The filters are divided by the inverse_filter.
+            Defaults None.
+        """
+        if inverse_filter is None:
+            inverse_filter = control.tf([1], [1])
+        self.f = f
+        self.inverse_filter = inverse_filter
+        self.inverse_response = inverse_filter(1j*2*np.pi*f)
+        self.config = configparser.ConfigParser(allow_no_value=True)
+        self.config.optionxform = str
+        self.config.read(filter_config)
+
+        # (filter_file, module, fm) of all combinations.
+        self.specs = []
+        for section in self.config.sections():
+            self.specs += self.get_combinations(self.config[section])
+        self._filters = {}
+
+    def get_combinations(self, rule):
+        """Enumerate FM combinations of a rule
+
+        Parameters
+        ----------
+        rule : configparser.SectionProxy
+            The rule section.
+
+        Returns
+        -------
+        list of (str, str, list of int)
+            (filter_file, module, fm) of the combinations.
+        """
+        filter_file = rule.get("filter_file")
+        module = rule.get("module")
+        always = self.get_fm_list(rule.get("always", fallback=""))
+        choose_from = self.get_fm_list(rule.get("choose_from", fallback=""))
+        n_choose = self.get_fm_list(rule.get("n_choose", fallback="1"))
+        if not choose_from:
+            n_choose = [0]
+        for n in n_choose:
+            if not 0 <= n <= len(choose_from):
+                raise ValueError(
+                    f"n_choose {n} of [{rule.name}] must be between 0 and "
+                    f"the number of FMs in choose_from ({len(choose_from)}).")
+
+        combinations = []
+        for n in n_choose:
+            for chosen in itertools.combinations(choose_from, n):
+                fm = sorted(set(always) | set(chosen))
+                if fm:
+                    combinations.append((filter_file, module, fm))
+
+        return combinations
+
+    @staticmethod
+    def get_fm_list(fm):
+        """Convert a comma-separated string to a list of int"""
+        return [int(fm_.strip()) for fm_ in fm.split(",") if fm_.strip()]
+
+    def __len__(self):
+        """Number of combinations"""
+        return len(self.specs)
+
+    def __getitem__(self, index):
+        """Get the filter of a combination"""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("CombinatorialPool index out of range")
+        if index not in self._filters:
+            filter_file, module, fm = self.specs[index]
+            response = np.prod(
+                [registry.get_fm_response(filter_file, module, fm_, self.f)
+                 for fm_ in fm], axis=0) / self.inverse_response
+            response.flags.writeable = False
+            self._filters[index] = ResponseFilter(
+                filter_file, module, fm, self.f, response,
+                inverse_filter=self.inverse_filter)
+        return self._filters[index]
+
+
 class FilterConfigurations:
     """Function class for all available filter configurations
     
@@ -213,7 +740,7 @@ class FilterConfigurations:
     """
     def __init__(self,
                  sc_pool=None, lp_pool=None, hp_pool=None,
-                 sc_config=None, lp_config=None, hp_config=None):
+                 sc_config=None, lp_config=None, hp_config=None, f=None):
         """Constructor
         
         Parameters
@@ -239,25 +766,28 @@ class FilterConfigurations:
         hp_config : str, optional
             Path of the high-pass filter config.
             Defaults `None.
+        f : array, optional
+            Frequency array of pools constructed from configs.
+            Defaults `None`.
         """
         if sc_pool is None and sc_config is not None:
-            sc_pool = FilterPool(sc_config)
+            sc_pool = FilterPool(f, sc_config)
         elif sc_pool is None and sc_config is None:
             raise ValueError("sc_pool or sc_config must be provided.")
-        if lp_pool is None and sc_config is not None:
-            lp_pool = FilterPool(sc_config)
-        elif lp_pool is None and sc_config is None:
+        if lp_pool is None and lp_config is not None:
+            lp_pool = FilterPool(f, lp_config)
+        elif lp_pool is None and lp_config is None:
             raise ValueError("lp_pool or lp_config must be provided.")
-        if hp_pool is None and sc_config is not None:
-            hp_pool = FilterPool(sc_config)
-        elif hp_pool is None and sc_config is None:
+        if hp_pool is None and hp_config is not None:
+            hp_pool = FilterPool(f, hp_config)
+        elif hp_pool is None and hp_config is None:
             raise ValueError("hp_pool or hp_config must be provided.")
         self.sc_pool = sc_pool
         self.lp_pool = lp_pool
         self.hp_pool = hp_pool
 
     def __call__(self, i, j):
-        """ Returns a filter configuration tuple.
+        """ Returns a filter configuration record.
         
         Parameters
         ----------
@@ -268,22 +798,137 @@ class FilterConfigurations:
 
         Returns
         -------
-        filter_configuration : Dict
-            Dictionary with key words ["sensor correction filter",
+        filter_configuration : FilterConfigurationRecord
+            Read-only mapping with key words ["sensor correction filter",
             "low pass filter", "high pass filter"].
         """
-        sc = self.sc_pool[i]
-        lp = self.lp_pool[j]
-        hp = self.hp_pool[j]
+        return FilterConfigurationRecord(self, i, j)
+
+    def get_magnitude_matrices(self):
+        """Stacked magnitude responses of the pools
+
+        The shapes broadcast to (n_sc, n_blend, n_f).
+
+        Returns
+        -------
+        sc : array
+            Sensor correction filters with shape (n_sc, 1, n_f).
+        sc_comp : array
+            Sensor correction complements with shape (n_sc, 1, n_f).
+        lp : array
+            Low-pass filters with shape (1, n_blend, n_f).
+        hp : array
+            High-pass filters with shape (1, n_blend, n_f).
+        """
+        sc = np.stack([filter_.mag for filter_ in self.sc_pool])[:, None]
+        sc_comp = np.stack(
+            [filter_.mag_comp for filter_ in self.sc_pool])[:, None]
+        lp = np.stack([filter_.mag for filter_ in self.lp_pool])[None]
+        hp = np.stack([filter_.mag for filter_ in self.hp_pool])[None]
+        return sc, sc_comp, lp, hp
+
+
+class FilterConfigurationRecord(collections.abc.Mapping):
+    """Immutable filter configuration referring to pool indices
+
+    The filters are resolved from the pools on demand.
+    Records are hashable and compare equal if they refer to the same
+    indices of the same `FilterConfigurations`.
+
+    Parameters
+    ----------
+    filter_configurations : FilterConfigurations
+        The filter configurations.
+    i : int
+        Sensor correction index.
+    j : int
+        Complementary filter index.
+    """
+    __slots__ = ("_filter_configurations", "_i", "_j")
+    _keys = ("sensor correction filter", "low pass filter", "high pass filter")
+
+    def __init__(self, filter_configurations, i, j):
+        """Constructor
+
+        Parameters
+        ----------
+        filter_configurations : FilterConfigurations
+            The filter configurations.
+        i : int
+            Sensor correction index.
+        j : int
+            Complementary filter index.
+        """
+        object.__setattr__(
+            self, "_filter_configurations", filter_configurations)
+        object.__setattr__(self, "_i", int(i))
+        object.__setattr__(self, "_j", int(j))
+
+    def __setattr__(self, name, value):
+        """Records are immutable"""
+        raise AttributeError("FilterConfigurationRecord is immutable.")
+
+    def __reduce__(self):
+        """Copy and pickle through the constructor"""
+        return (FilterConfigurationRecord,
+                (self._filter_configurations, self._i, self._j))
 
-        filter_configuration = FilterConfiguration(sc, lp, hp)
-        # filter_configuration = {
-        #     "sensor correction filter": sc,
-        #     "low pass filter": lp,
-        #     "high pass filter": hp
-        # }
+    def __getitem__(self, key):
+        """Get a filter by its key word"""
+        if key == "sensor correction filter":
+            return self.sc
+        elif key == "low pass filter":
+            return self.lp
+        elif key == "high pass filter":
+            return self.hp
+        raise KeyError(key)
 
-        return filter_configuration
+    def __iter__(self):
+        """Iterate over key words"""
+        return iter(self._keys)
+
+    def __len__(self):
+        """Number of filters"""
+        return len(self._keys)
+
+    def __eq__(self, other):
+        """Same indices of the same filter configurations"""
+        if not isinstance(other, FilterConfigurationRecord):
+            return NotImplemented
+        return (self._filter_configurations is other._filter_configurations
+                and self.indices == other.indices)
+
+    def __hash__(self):
+        """Hash of the indices"""
+        return hash((id(self._filter_configurations), self._i, self._j))
+
+    def __repr__(self):
+        """Representation"""
+        return f"FilterConfigurationRecord(i={self._i}, j={self._j})"
+
+    @property
+    def indices(self):
+        """Sensor correction and complementary filter indices"""
+        return self._i, self._j
+
+    @property
+    def sc(self):
+        """Sensor correction filter"""
+        return self._filter_configurations.sc_pool[self._i]
+
+    @property
+    def lp(self):
+        """Low pass filter"""
+        return self._filter_configurations.lp_pool[self._j]
+
+    @property
+    def hp(self):
+        """High pass filter"""
+        return self._filter_configurations.hp_pool[self._j]
+
+    def export(self, path):
+        """Export filter configuration to path"""
+        FilterConfiguration(self.sc, self.lp, self.hp).export(path)
 
 
 class FilterConfiguration(dict):
@@ -383,3 +1028,6 @@ class InverseFilters:
     def none(self):
         """Returns 1"""
         return control.tf([1], [1])
+
+
+registry = FilterRegistry()
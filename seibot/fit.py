@@ -0,0 +1,249 @@
+"""Noise model fitting"""
+import numpy as np
+import scipy.optimize
+import scipy.sparse
+import scipy.special
+
+
+class NoiseFit:
+    """Batched log-space least-squares fit of sensor noise models
+
+    All spectra are fitted in one least-squares problem with a
+    block-diagonal analytic Jacobian.
+    Noise levels are fitted as natural logarithms so they stay positive.
+
+    Parameters
+    ----------
+    model : str, optional
+        The noise model in `seibot.model.Model`.
+        Choose from ["noise1", "noise2"].
+        Defaults "noise2".
+    """
+    models = {"noise1": 2, "noise2": 4}
+
+    def __init__(self, model="noise2"):
+        """Constructor
+
+        Parameters
+        ----------
+        model : str, optional
+            The noise model in `seibot.model.Model`.
+            Choose from ["noise1", "noise2"].
+            Defaults "noise2".
+        """
+        if model not in self.models:
+            raise ValueError(f"Model {model} is not supported. "
+                             f"Choose from {list(self.models)}.")
+        self.model = model
+
+    @property
+    def n_parameters(self):
+        """Number of model parameters"""
+        return self.models[self.model]
+
+    def fit(self, f, asds, p0=None, **kwargs):
+        """Fit noise models to amplitude spectral densities
+
+        Parameters
+        ----------
+        f : array
+            Frequency array.
+        asds : array
+            Amplitude spectral densities with shape (n, len(f)) or (len(f),).
+            Non-positive and non-finite values are ignored.
+        p0 : array, optional
+            Initial parameters in the `seibot.model.Model` order
+            with shape (n, n_parameters).
+            Defaults None, which uses log-log linear regressions.
+        **kwargs
+            Keyword arguments passed to `scipy.optimize.least_squares`.
+
+        Returns
+        -------
+        parameters : array
+            The fitted parameters in the `seibot.model.Model` order,
+            i.e. (na, a) for noise1 and (na, nb, a, b) for noise2,
+            with shape (n, n_parameters).
+        """
+        f = np.asarray(f, dtype=float)
+        asds = np.atleast_2d(np.asarray(asds, dtype=float))
+        valid = np.isfinite(asds) * (asds > 0) * (f > 0)
+        log_f = np.log(np.where(f > 0, f, 1))
+        log_asds = np.log(np.where(valid, asds, 1))
+        weights = valid.astype(float)
+
+        if p0 is None:
+            x0 = self._initial_guess(log_f, log_asds, weights)
+        else:
+            x0 = self._to_internal(np.atleast_2d(p0))
+
+        n, n_f = log_asds.shape
+        n_p = self.n_parameters
+        rows = np.repeat(np.arange(n*n_f), n_p)
+        cols = (np.arange(n)[:, None, None] * n_p
+                + np.arange(n_p)[None, None, :]
+                + np.zeros((1, n_f, 1), dtype=int)).ravel()
+
+        def residuals(x):
+            log_model, _ = self._evaluate(log_f, x.reshape(n, n_p))
+            return ((log_model - log_asds) * weights).ravel()
+
+        def jacobian(x):
+            _, jac = self._evaluate(log_f, x.reshape(n, n_p))
+            jac = jac * weights[:, :, None]
+            return scipy.sparse.csr_matrix(
+                (jac.ravel(), (rows, cols)), shape=(n*n_f, n*n_p))
+
+        kwargs.setdefault("method", "trf")
+        kwargs.setdefault("tr_solver", "lsmr")
+        kwargs.setdefault("x_scale", "jac")
+        result = scipy.optimize.least_squares(
+            residuals, x0.ravel(), jac=jacobian, **kwargs)
+
+        parameters = self._to_model(result.x.reshape(n, n_p))
+
+        return parameters
+
+    def _evaluate(self, log_f, x):
+        """Evaluate the log noise model and its Jacobian
+
+        Parameters
+        ----------
+        log_f : array
+            Natural logarithm of the frequency array.
+        x : array
+            Internal parameters with shape (n, n_parameters).
+
+        Returns
+        -------
+        log_model : array
+            Natural logarithm of the noise models, shape (n, len(f)).
+        jac : array
+            Derivatives of log_model w.r.t. the internal parameters,
+            shape (n, len(f), n_parameters).
+        """
+        if self.model == "noise1":
+            log_na, a = x[:, 0:1], x[:, 1:2]
+            log_model = log_na - a*log_f
+            jac = np.stack(
+                [np.ones_like(log_model), -log_f*np.ones_like(log_model)],
+                axis=-1)
+        else:
+            log_na, log_nb = x[:, 0:1], x[:, 1:2]
+            a, b = x[:, 2:3], x[:, 3:4]
+            # Log power of each term.
+            la = 2*(log_na - a*log_f)
+            lb = 2*(log_nb - b*log_f)
+            log_model = 0.5 * np.logaddexp(la, lb)
+            wa = scipy.special.expit(la - lb)  # Fraction of power in a.
+            wb = 1 - wa
+            jac = np.stack([wa, wb, -log_f*wa, -log_f*wb], axis=-1)
+
+        return log_model, jac
+
+    def _initial_guess(self, log_f, log_asds, weights):
+        """Initial internal parameters from log-log linear regressions
+
+        Parameters
+        ----------
+        log_f : array
+            Natural logarithm of the frequency array.
+        log_asds : array
+            Natural logarithm of the spectra.
+        weights : array
+            Weights of each point.
+
+        Returns
+        -------
+        x0 : array
+            Initial internal parameters.
+        """
+        if self.model == "noise1":
+            return self._regress(log_f, log_asds, weights)
+
+        # Fit each half of the frequency band with a power law.
+        half = len(log_f) // 2
+        low = self._regress(log_f[:half], log_asds[:, :half],
+                            weights[:, :half])
+        high = self._regress(log_f[half:], log_asds[:, half:],
+                             weights[:, half:])
+        x0 = np.column_stack([low[:, 0], high[:, 0], low[:, 1], high[:, 1]])
+
+        return x0
+
+    def _regress(self, log_f, log_asds, weights):
+        """Weighted linear regression of log_asds on log_f
+
+        Returns
+        -------
+        x : array
+            (log na, a) of each spectrum.
+        """
+        sum_w = np.maximum(np.sum(weights, axis=-1), 1)
+        mean_x = np.sum(weights*log_f, axis=-1) / sum_w
+        mean_y = np.sum(weights*log_asds, axis=-1) / sum_w
+        dx = log_f - mean_x[:, None]
+        dy = log_asds - mean_y[:, None]
+        var = np.sum(weights*dx**2, axis=-1)
+        slope = np.sum(weights*dx*dy, axis=-1) / np.where(var > 0, var, 1)
+        log_na = mean_y - slope*mean_x
+        return np.column_stack([log_na, -slope])
+
+    def _to_internal(self, parameters):
+        """Model parameters to internal parameters"""
+        x = np.array(parameters, dtype=float)
+        n_levels = self.n_parameters // 2
+        x[:, :n_levels] = np.log(x[:, :n_levels])
+        return x
+
+    def _to_model(self, x):
+        """Internal parameters to model parameters"""
+        parameters = np.array(x, dtype=float)
+        n_levels = self.n_parameters // 2
+        parameters[:, :n_levels] = np.exp(parameters[:, :n_levels])
+        return parameters
+
+
+def write_parameters(path, parameters):
+    """Write model parameters to a model parameter file
+
+    Parameters
+    ----------
+    path : str
+        Path of the model parameter file.
+    parameters : array
+        Model parameters of one model.
+    """
+    np.savetxt(path, np.atleast_2d(parameters), fmt="%.8g")
+
+
+def fit_noise(f, asds, paths, model="noise2", **kwargs):
+    """Fit noise models and write them to model parameter files
+
+    Parameters
+    ----------
+    f : array
+        Frequency array.
+    asds : array
+        Amplitude spectral densities with shape (len(paths), len(f)).
+    paths : list of str
+        Paths of the model parameter files, one for each spectrum.
+    model : str, optional
+        The noise model. Choose from ["noise1", "noise2"].
+        Defaults "noise2".
+    **kwargs
+        Keyword arguments passed to `NoiseFit.fit`.
+
+    Returns
+    -------
+    parameters : array
+        The fitted parameters with shape (len(paths), n_parameters).
+    """
+    asds = np.atleast_2d(asds)
+    if len(paths) != len(asds):
+        raise ValueError("Number of paths and spectra do not match.")
+    parameters = NoiseFit(model).fit(f, asds, **kwargs)
+    for path, parameter in zip(paths, parameters):
+        write_parameters(path, parameter)
+
+    return parameters
@@ -0,0 +1,88 @@
+"""Seibot GUI display decimation"""
+import numpy as np
+
+
+def get_indices(x, y, n_bins, log=True):
+    """Get indices of the min/max-preserving decimation
+
+    The x axis is divided into `n_bins` bins and
+    the indices of the minimum and the maximum in each bin are kept.
+
+    Parameters
+    ----------
+    x : array
+        Sorted x data.
+    y : array
+        y data with shape (len(x),) or (n, len(x)).
+    n_bins : int
+        Number of bins, e.g. the pixel width of the axis.
+    log : bool, optional
+        Use logarithmically spaced bins.
+        Defaults True.
+
+    Returns
+    -------
+    indices : array
+        Sorted indices of the kept points with shape (n, n_kept).
+        Rows may contain repeated indices.
+    """
+    x = np.asarray(x)
+    y = np.atleast_2d(y)
+    n = len(x)
+    if n <= 2*n_bins or n_bins < 1:
+        return np.broadcast_to(np.arange(n), y.shape)
+
+    if log and x[0] > 0:
+        edges = np.logspace(np.log10(x[0]), np.log10(x[-1]), n_bins+1)
+    else:
+        edges = np.linspace(x[0], x[-1], n_bins+1)
+    starts = np.unique(np.searchsorted(x, edges[:-1]))
+    starts = starts[starts < n]
+    bin_index = np.searchsorted(starts, np.arange(n), side="right") - 1
+
+    # First index of the minimum and the maximum in each bin.
+    arange = np.broadcast_to(np.arange(n), y.shape)
+    y_min = np.minimum.reduceat(y, starts, axis=-1)
+    y_max = np.maximum.reduceat(y, starts, axis=-1)
+    argmin = np.minimum.reduceat(
+        np.where(y == y_min[:, bin_index], arange, n), starts, axis=-1)
+    argmax = np.minimum.reduceat(
+        np.where(y == y_max[:, bin_index], arange, n), starts, axis=-1)
+
+    indices = np.sort(np.concatenate([argmin, argmax], axis=-1), axis=-1)
+    indices = np.minimum(indices, n-1)  # NaN-only bins.
+
+    return indices
+
+
+def decimate(x, y, n_bins, log=True):
+    """Min/max-preserving decimation
+
+    Parameters
+    ----------
+    x : array
+        Sorted x data.
+    y : array
+        y data with shape (len(x),) or (n, len(x)).
+    n_bins : int
+        Number of bins, e.g. the pixel width of the axis.
+    log : bool, optional
+        Use logarithmically spaced bins.
+        Defaults True.
+
+    Returns
+    -------
+    x : array
+        Decimated x data, with the same dimension as y.
+    y : array
+        Decimated y data.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    indices = get_indices(x, y, n_bins, log=log)
+    x_decimated = x[indices]
+    y_decimated = np.take_along_axis(np.atleast_2d(y), indices, axis=-1)
+    if y.ndim == 1:
+        return x_decimated[0], y_decimated[0]
+
+    return x_decimated, y_decimated
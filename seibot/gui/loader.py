@@ -0,0 +1,127 @@
+"""Seibot GUI background loader"""
+import queue
+import threading
+import tkinter
+import tkinter.ttk
+
+import seibot.seibot
+import seibot.shared
+
+
+class LoadCancelled(Exception):
+    """Raised in the worker thread when loading is cancelled."""
+
+
+class Loader(threading.Thread):
+    """Worker thread constructing a Seibot instance
+
+    Progress and results are put into `queue` as (kind, value) tuples,
+    where kind is "progress", "done", "cancelled" or "error".
+    The GUI must only read the queue, tkinter is not thread-safe.
+
+    Parameters
+    ----------
+    config : str
+        Path of the Seibot configuration file.
+    publication : str, optional
+        Name of a shared-memory publication to attach to instead of
+        running Seibot, see `seibot.shared.SharedSeibot`.
+        Defaults None.
+    """
+    def __init__(self, config, publication=None):
+        """Constructor
+
+        Parameters
+        ----------
+        config : str
+            Path of the Seibot configuration file.
+        publication : str, optional
+            Name of a shared-memory publication to attach to instead of
+            running Seibot.
+            Defaults None.
+        """
+        super().__init__(daemon=True)
+        self.config = config
+        self.publication = publication
+        self.queue = queue.Queue()
+        self.cancelled = threading.Event()
+
+    def run(self):
+        """Construct the Seibot instance"""
+        try:
+            if self.publication is not None:
+                bot = seibot.shared.SharedSeibot(
+                    self.publication, progress=self.report)
+            else:
+                # The panels read the evaluation on the main thread,
+                # build it here even if the lookup table has a match.
+                bot = seibot.seibot.Seibot(
+                    self.config, progress=self.report, always_evaluate=True)
+        except LoadCancelled:
+            self.queue.put(("cancelled", None))
+        except Exception as e:
+            self.queue.put(("error", e))
+        else:
+            if self.cancelled.is_set():
+                self.queue.put(("cancelled", None))
+            else:
+                self.queue.put(("done", bot))
+
+    def report(self, stage, fraction):
+        """Report progress, abort if cancelled
+
+        Parameters
+        ----------
+        stage : str
+            Description of the stage.
+        fraction : float
+            Fraction of the construction done.
+        """
+        if self.cancelled.is_set():
+            raise LoadCancelled()
+        self.queue.put(("progress", (stage, fraction)))
+
+    def cancel(self):
+        """Cancel loading at the next stage"""
+        self.cancelled.set()
+
+
+class ProgressWindow(tkinter.Toplevel):
+    """Loading progress window"""
+    def __init__(self, master, cancel):
+        """Constructor
+
+        Parameters
+        ----------
+        master
+            Tkinter parent.
+        cancel : callable
+            Called when the cancel button is clicked.
+        """
+        super().__init__(master)
+        self.title("Loading Seibot")
+        self.transient(master)
+        self.protocol("WM_DELETE_WINDOW", cancel)
+
+        self.stage_label = tkinter.Label(self, text="Starting", width=40)
+        self.progress_bar = tkinter.ttk.Progressbar(
+            self, orient="horizontal", length=300, mode="determinate",
+            maximum=1)
+        cancel_button = tkinter.Button(self, text="Cancel", command=cancel)
+
+        self.stage_label.grid(row=0, column=0, sticky="w", padx=10, pady=5)
+        self.progress_bar.grid(row=1, column=0, sticky="ew", padx=10)
+        cancel_button.grid(row=2, column=0, sticky="e", padx=10, pady=5)
+
+    def update_progress(self, stage, fraction):
+        """Update progress
+
+        Parameters
+        ----------
+        stage : str
+            Description of the stage.
+        fraction : float
+            Fraction of the construction done.
+        """
+        self.stage_label.config(text=stage)
+        self.progress_bar["value"] = fraction
@@ -1,7 +1,9 @@
 """Seibot GUI Main"""
 import tkinter
 import tkinter.font
+import tkinter.messagebox
 
+import seibot.gui.loader
 import seibot.gui.menubar
 import seibot.gui.plot
 import seibot.gui.option
@@ -40,6 +42,8 @@ class Root(tkinter.Tk):
         self.option_panel.grid(row=0, column=2, rowspan=2, sticky="ewns")
 
         self.seibot = None
+        self.loader = None
+        self.progress_window = None
 
     @property
     def seibot(self):
@@ -55,11 +59,79 @@ class Root(tkinter.Tk):
         """Run loop"""
         self.mainloop()
 
-    def load_seibot(self, config):
-        """Load seibot"""
-        self.seibot = seibot.Seibot(config)
-        self.initialize()
-        self.enable_options()
+    def load_seibot(self, config, publication=None):
+        """Load seibot in a worker thread
+        
+        Parameters
+        ----------
+        config : str
+            Path of the Seibot configuration file.
+        publication : str, optional
+            Name of a shared-memory publication to attach to instead.
+            Defaults None.
+        """
+        if self.loader is not None:
+            self.cancel_load()
+        self.loader = seibot.gui.loader.Loader(config, publication)
+        self.progress_window = seibot.gui.loader.ProgressWindow(
+            self, cancel=self.cancel_load)
+        self.loader.start()
+        self.poll_loader()
+
+    def attach_seibot(self, name):
+        """Attach to a Seibot publication in a worker thread
+
+        Parameters
+        ----------
+        name : str
+            Name of the publication, see `seibot --publish`.
+        """
+        self.load_seibot(None, publication=name)
+
+    def poll_loader(self, interval=100):
+        """Poll the loader queue
+        
+        Parameters
+        ----------
+        interval : int, optional
+            Polling interval in milliseconds.
+            Defaults 100.
+        """
+        loader = self.loader
+        if loader is None:
+            return
+        while not loader.queue.empty():
+            kind, value = loader.queue.get_nowait()
+            if kind == "progress":
+                self.progress_window.update_progress(*value)
+            elif kind == "done":
+                self.finish_load()
+                self.seibot = value
+                self.initialize()
+                self.enable_options()
+                return
+            elif kind == "error":
+                self.finish_load()
+                tkinter.messagebox.showerror(
+                    "Seibot", f"Failed to load Seibot: {value}")
+                return
+            elif kind == "cancelled":
+                return
+        self.after(interval, self.poll_loader)
+
+    def cancel_load(self):
+        """Cancel loading"""
+        if self.loader is not None:
+            # The worker stops at its next stage, its result is discarded.
+            self.loader.cancel()
+        self.finish_load()
+
+    def finish_load(self):
+        """Clean up after loading"""
+        self.loader = None
+        if self.progress_window is not None:
+            self.progress_window.destroy()
+            self.progress_window = None
 
     def initialize(self):
         """Initialize"""
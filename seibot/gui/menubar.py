@@ -1,5 +1,6 @@
 import tkinter
 import tkinter.filedialog
+import tkinter.simpledialog
 
 import seibot
 
@@ -23,6 +24,7 @@ class FileMenu(tkinter.Menu):
         self.root = root
         self.add_command(label="New")
         self.add_command(label="Open", command=self.open_config)
+        self.add_command(label="Attach", command=self.attach)
         self.add_command(label="Save")
         self.add_command(label="Save as")
         self.add_command(label="Exit", command=self.exit)
@@ -36,6 +38,13 @@ class FileMenu(tkinter.Menu):
         if config != ():
             self.root.load_seibot(config)
 
+    def attach(self):
+        """Attach to a shared-memory publication"""
+        name = tkinter.simpledialog.askstring(
+            "Attach to Seibot", "Publication name:", parent=self.root)
+        if name:
+            self.root.attach_seibot(name)
+
     def exit(self):
         """Exit"""
         # pass
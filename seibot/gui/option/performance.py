@@ -1,4 +1,3 @@
-import numpy as np
 import tkinter
 
 
@@ -20,7 +19,7 @@ class Performance(tkinter.LabelFrame):
         self.root = root
 
         self.choose_label = tkinter.Label(self, text="Choose:")
-        
+
         self.option_var = tkinter.StringVar()
         self.option_var.set("displacement")
         self.displacement_button = tkinter.Radiobutton(
@@ -32,169 +31,169 @@ class Performance(tkinter.LabelFrame):
             value="velocity", command=self.option_clicked
         )
 
-        performance_frame = tkinter.Frame(self)
-
-        frequency_label = tkinter.Label(performance_frame, text="Frequency (Hz):")
-        all_label = tkinter.Label(performance_frame, text="Overall")
-        label_3e2_1e1 = tkinter.Label(performance_frame, text="30 mHz - 100 mHz")
-        label_1e1_3e1 = tkinter.Label(performance_frame, text="100 mHz - 300 mHz)")
-        label_3e1_1 = tkinter.Label(performance_frame, text="300 mHz - 1 Hz")
-        label_1_3 = tkinter.Label(performance_frame, text="1 Hz - 3 Hz")
-
-        self.current_label = tkinter.Label(performance_frame, text="Current")
-        self.current_rms = tkinter.Label(
-            performance_frame, text="-", relief=tkinter.SUNKEN, width=10,
-            bg="white")
-        self.current_rms_3e2_1e1 = tkinter.Label(
-            performance_frame, text="-", relief=tkinter.SUNKEN, width=10, bg="white")
-        self.current_rms_1e1_3e1 = tkinter.Label(
-            performance_frame, text="-", relief=tkinter.SUNKEN, width=10, bg="white")
-        self.current_rms_3e1_1 = tkinter.Label(
-            performance_frame, text="-", relief=tkinter.SUNKEN, width=10, bg="white")
-        self.current_rms_1_3 = tkinter.Label(
-            performance_frame, text="-", relief=tkinter.SUNKEN, width=10, bg="white")
-
-        self.selected_label = tkinter.Label(performance_frame, text="Selected")
-        self.selected_rms = tkinter.Label(
-            performance_frame, text="-", relief=tkinter.SUNKEN, width=10, bg="white")
-        self.selected_rms_3e2_1e1 = tkinter.Label(
-            performance_frame, text="-", relief=tkinter.SUNKEN, width=10, bg="white")
-        self.selected_rms_1e1_3e1 = tkinter.Label(
-            performance_frame, text="-", relief=tkinter.SUNKEN, width=10, bg="white")
-        self.selected_rms_3e1_1 = tkinter.Label(
-            performance_frame, text="-", relief=tkinter.SUNKEN, width=10, bg="white")
-        self.selected_rms_1_3 = tkinter.Label(
-            performance_frame, text="-", relief=tkinter.SUNKEN, width=10, bg="white")
+        self.performance_frame = tkinter.Frame(self)
 
+        frequency_label = tkinter.Label(
+            self.performance_frame, text="Frequency (Hz):")
+        self.current_label = tkinter.Label(
+            self.performance_frame, text="Current")
+        self.selected_label = tkinter.Label(
+            self.performance_frame, text="Selected")
 
         self.choose_label.grid(row=0, column=0, sticky="w")
         self.displacement_button.grid(row=0, column=1, sticky="w")
         self.velocity_button.grid(row=0, column=2, sticky="w")
 
-        performance_frame.grid(
+        self.performance_frame.grid(
             row=1, column=0, columnspan=3, sticky="ensw")
         self.columnconfigure(0, weight=1)
-        performance_frame.columnconfigure(0, weight=1)
-        # self.all_label.grid(row=0, column=0, sticky="w")
+        self.performance_frame.columnconfigure(0, weight=1)
         frequency_label.grid(row=0, column=0, sticky="w")
-        all_label.grid(row=1, column=0, sticky="w", pady=5)
-        label_3e2_1e1.grid(row=2, column=0, sticky="w")
-        label_1e1_3e1.grid(row=3, column=0, sticky="w")
-        label_3e1_1.grid(row=4, column=0, sticky="w")
-        label_1_3.grid(row=5, column=0, sticky="w")
         self.current_label.grid(row=0, column=1)
-        self.current_rms.grid(row=1, column=1, sticky="w")
-        self.current_rms_3e2_1e1.grid(row=2, column=1, sticky="w")
-        self.current_rms_1e1_3e1.grid(row=3, column=1, sticky="w")
-        self.current_rms_3e1_1.grid(row=4, column=1, sticky="w")
-        self.current_rms_1_3.grid(row=5, column=1, sticky="w")
         self.selected_label.grid(row=0, column=2,)
-        self.selected_rms.grid(row=1, column=2, sticky="w")
-        self.selected_rms_3e2_1e1.grid(row=2, column=2, sticky="w")
-        self.selected_rms_1e1_3e1.grid(row=3, column=2, sticky="w")
-        self.selected_rms_3e1_1.grid(row=4, column=2, sticky="w")
-        self.selected_rms_1_3.grid(row=5, column=2, sticky="w")
+
+        # One row for the overall RMS and one for each band.
+        self.row_labels = []
+        self.current_rms = []
+        self.selected_rms = []
+        self.make_rows(["Overall"])
 
         self.buttons = [self.displacement_button, self.velocity_button]
         for button in self.buttons:
             button.config(state="disabled")
 
-        self.overall_c = None
-        self.rms_3e2_1e1_c = None
-        self.rms_1e1_3e1_c = None
-        self.rms_3e1_1_c = None
-        self.rms_1_3_c = None
+        # RMS tables (nm or nm/s) keyed by quantity.
+        self.band_rms_tables = None
+        self.current_band_rms = None
+
+    def make_rows(self, labels):
+        """Make a row of RMS values for each label
+
+        Parameters
+        ----------
+        labels : list of str
+            Row labels.
+        """
+        for widget in self.row_labels + self.current_rms + self.selected_rms:
+            widget.destroy()
+        self.row_labels = []
+        self.current_rms = []
+        self.selected_rms = []
+        for row, text in enumerate(labels, start=1):
+            label = tkinter.Label(self.performance_frame, text=text)
+            current = tkinter.Label(
+                self.performance_frame, text="-", relief=tkinter.SUNKEN,
+                width=10, bg="white")
+            selected = tkinter.Label(
+                self.performance_frame, text="-", relief=tkinter.SUNKEN,
+                width=10, bg="white")
+            pady = 5 if row == 1 else 0  # Separate the overall RMS.
+            label.grid(row=row, column=0, sticky="w", pady=pady)
+            current.grid(row=row, column=1, sticky="w")
+            selected.grid(row=row, column=2, sticky="w")
+            self.row_labels.append(label)
+            self.current_rms.append(current)
+            self.selected_rms.append(selected)
 
     def initialize(self):
         """Initialize"""
         for button in self.buttons:
             button.config(state="normal")
 
+        evaluate = self.root.seibot.evaluate
+        labels = ["Overall"]
+        for f_lower, f_upper in evaluate.bands:
+            labels.append(
+                f"{format_frequency(f_lower)} - {format_frequency(f_upper)}")
+        self.make_rows(labels)
+
+        # Look up the table indices of the selected filters.
+        filter_configurations = self.root.seibot.filter_configurations
+        self.sc_indices = {
+            id(filter_): i
+            for i, filter_ in enumerate(filter_configurations.sc_pool)}
+        self.blend_indices = {
+            (id(lp), id(hp)): j for j, (lp, hp) in enumerate(zip(
+                filter_configurations.lp_pool, filter_configurations.hp_pool))}
+
+        self.band_rms_tables = {}
+        self.current_band_rms = {}
+        current = self.master.plot_option.current
+        for quantity in ["displacement", "velocity"]:
+            self.band_rms_tables[quantity] = (
+                evaluate.get_band_rms_table(quantity) * 1e9)
+            if current is not None:
+                self.current_band_rms[quantity] = (
+                    evaluate.get_band_rms(current, quantity) * 1e9)
+
         self.update_current()
+        self.update_rms()
 
     def option_clicked(self):
         """Option clicked"""
-        self.update_rms()
         self.update_current()
+        self.update_rms()
 
     def update_current(self):
         """Get current performance"""
         selection = self.option_var.get()
-        f = self.master.selection_tabs.f
-        if self.master.plot_option.current is None:
+        if selection not in self.current_band_rms:
             return
-        displacement = self.master.plot_option.current.copy()
-        if selection == "velocity":
-            displacement *= 2*np.pi*f
-        evaluate = self.root.seibot.evaluate
-        self.overall_c = evaluate.get_rms(f, displacement) * 1e9
-        mask = (f>3e-2) * (f<1e-1)
-        self.rms_3e2_1e1_c = evaluate.get_rms(f[mask], displacement[mask]) * 1e9
-        mask = (f>1e-1) * (f<3e-1)
-        self.rms_1e1_3e1_c = evaluate.get_rms(f[mask], displacement[mask]) * 1e9
-        mask = (f>3e-1) * (f<1)
-        self.rms_3e1_1_c = evaluate.get_rms(f[mask], displacement[mask]) * 1e9
-        mask = (f>1) * (f<3)
-        self.rms_1_3_c = evaluate.get_rms(f[mask], displacement[mask]) * 1e9
-
-        self.current_rms.config(text=f"{self.overall_c:.3g}")
-        self.current_rms_3e2_1e1.config(text=f"{self.rms_3e2_1e1_c:.3g}")
-        self.current_rms_1e1_3e1.config(text=f"{self.rms_1e1_3e1_c:.3g}")
-        self.current_rms_3e1_1.config(text=f"{self.rms_3e1_1_c:.3g}")
-        self.current_rms_1_3.config(text=f"{self.rms_1_3_c:.3g}")
+        for label, rms in zip(
+                self.current_rms, self.current_band_rms[selection]):
+            label.config(text=f"{rms:.3g}")
 
-    def update_rms(self):
-        """Update rms values"""
+    def get_selected_band_rms(self):
+        """Get RMS values of the selected filters
+
+        Returns
+        -------
+        band_rms : array
+            Overall and band-limited RMS values (nm or nm/s).
+        """
         selection = self.option_var.get()
-        f = self.master.selection_tabs.f
-        displacement = self.master.selection_tabs.selected_displacement.copy()
-        if selection == "velocity":
-            displacement *= 2*np.pi*f
+        tabs = self.master.selection_tabs
+        i = self.sc_indices.get(id(tabs.selected_sc))
+        j = self.blend_indices.get(
+            (id(tabs.selected_lp), id(tabs.selected_hp)))
+        if i is not None and j is not None:
+            return self.band_rms_tables[selection][i, j]
+
+        # Not a configuration in the table.
         evaluate = self.root.seibot.evaluate
-        overall = evaluate.get_rms(f, displacement) * 1e9
-        mask = (f>3e-2) * (f<1e-1)
-        rms_3e2_1e1 = evaluate.get_rms(f[mask], displacement[mask]) * 1e9
-        mask = (f>1e-1) * (f<3e-1)
-        rms_1e1_3e1 = evaluate.get_rms(f[mask], displacement[mask]) * 1e9
-        mask = (f>3e-1) * (f<1)
-        rms_3e1_1 = evaluate.get_rms(f[mask], displacement[mask]) * 1e9
-        mask = (f>1) * (f<3)
-        rms_1_3 = evaluate.get_rms(f[mask], displacement[mask]) * 1e9
-
-        fg = "black"
-        if self.overall_c is not None:
-            if overall > self.overall_c:
-                fg = "red"
-            else:
-                fg = "green"
-        self.selected_rms.config(text=f"{overall:.3g}", fg=fg)
-
-        if self.rms_3e2_1e1_c is not None:
-            if rms_3e2_1e1 > self.rms_3e2_1e1_c:
-                fg = "red"
-            else:
-                fg = "green"
-        self.selected_rms_3e2_1e1.config(text=f"{rms_3e2_1e1:.3g}", fg=fg)
-
-        if self.rms_1e1_3e1_c is not None:
-            if rms_1e1_3e1 > self.rms_1e1_3e1_c:
-                fg = "red"
-            else:
-                fg = "green"
-        self.selected_rms_1e1_3e1.config(text=f"{rms_1e1_3e1:.3g}", fg=fg)
-
-        if self.rms_3e1_1_c is not None:
-            if rms_3e1_1 > self.rms_3e1_1_c:
-                fg = "red"
-            else:
-                fg = "green"
-        self.selected_rms_3e1_1.config(text=f"{rms_3e1_1:.3g}", fg=fg)
-
-        if self.rms_1_3_c is not None:
-            if rms_1_3 > self.rms_1_3_c:
-                fg = "red"
-            else:
-                fg = "green"
-        self.selected_rms_1_3.config(text=f"{rms_1_3:.3g}", fg=fg)
-
+        return evaluate.get_band_rms(
+            tabs.selected_displacement, selection) * 1e9
 
+    def update_rms(self):
+        """Update rms values"""
+        if self.band_rms_tables is None:
+            return
+        band_rms = self.get_selected_band_rms()
+        current_band_rms = self.current_band_rms.get(self.option_var.get())
+
+        for k, (label, rms) in enumerate(zip(self.selected_rms, band_rms)):
+            fg = "black"
+            if current_band_rms is not None:
+                if rms > current_band_rms[k]:
+                    fg = "red"
+                else:
+                    fg = "green"
+            label.config(text=f"{rms:.3g}", fg=fg)
+
+
+def format_frequency(f):
+    """Format a frequency for display
+
+    Parameters
+    ----------
+    f : float
+        Frequency in Hz.
+
+    Returns
+    -------
+    str
+        The frequency in mHz below 1 Hz, in Hz otherwise.
+    """
+    if f < 1:
+        return f"{f*1e3:g} mHz"
+    return f"{f:g} Hz"
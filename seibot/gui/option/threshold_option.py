@@ -55,26 +55,33 @@ class ThresholdOption(tkinter.LabelFrame):
         plot_bounds.grid(row=1, column=1, sticky="w")
         plot_curves.grid(row=1, column=2, sticky="w")
 
+        # Thresholds are set on a log scale, the slider values are log10.
+        self.log_disp_thres = tkinter.DoubleVar(value=0)
+        self.log_vel_thres = tkinter.DoubleVar(value=0)
+        self.update_pending = False
+
         rms_disp_label = tkinter.Label(
             self, text="Select RMS displacement threshold: ")
-        self.rms_disp_entry = tkinter.Entry(self, justify="right", width=10)
-        self.rms_disp_entry.insert(0, 1)
-        self.rms_disp_entry.bind("<Return>", self.update_thresholds)
-        rms_disp_unit = tkinter.Label(self, text="nm")
+        self.rms_disp_scale = tkinter.Scale(
+            self, variable=self.log_disp_thres, orient="horizontal",
+            showvalue=0, resolution=0.01, from_=-3, to=3,
+            command=self.schedule_update)
+        self.rms_disp_value = tkinter.Label(self, width=12, anchor="w")
         rms_vel_label = tkinter.Label(
             self, text="Select RMS velocity threshold: ")
-
-        self.rms_vel_entry = tkinter.Entry(self, justify="right", width=10)
-        self.rms_vel_entry.insert(0, 1)
-        self.rms_vel_entry.bind("<Return>", self.update_thresholds)
-        rms_vel_unit = tkinter.Label(self, text="nm/s")
+        self.rms_vel_scale = tkinter.Scale(
+            self, variable=self.log_vel_thres, orient="horizontal",
+            showvalue=0, resolution=0.01, from_=-3, to=3,
+            command=self.schedule_update)
+        self.rms_vel_value = tkinter.Label(self, width=12, anchor="w")
+        self.update_threshold_labels()
 
         rms_disp_label.grid(row=1, column=0, sticky="w")
-        self.rms_disp_entry.grid(row=1, column=1, sticky="e")
-        rms_disp_unit.grid(row=1, column=2, sticky="w")
+        self.rms_disp_scale.grid(row=1, column=1, sticky="ew")
+        self.rms_disp_value.grid(row=1, column=2, sticky="w")
         rms_vel_label.grid(row=2, column=0, sticky="w")
-        self.rms_vel_entry.grid(row=2, column=1, sticky="e")
-        rms_vel_unit.grid(row=2, column=2, sticky="w")
+        self.rms_vel_scale.grid(row=2, column=1, sticky="ew")
+        self.rms_vel_value.grid(row=2, column=2, sticky="w")
         
         self.plot_tebo_var = tkinter.IntVar()
         plot_tebo_button = tkinter.Checkbutton(
@@ -124,7 +131,7 @@ class ThresholdOption(tkinter.LabelFrame):
     
         self.buttons = [
             plot_all_button, plot_bounds, plot_curves,
-            self.rms_disp_entry, self.rms_vel_entry,
+            self.rms_disp_scale, self.rms_vel_scale,
             plot_tebo_button, optimize_displacement, optimize_velocity,
             self.frequency_lower_entry, self.frequency_upper_entry
         ]
@@ -141,11 +148,40 @@ class ThresholdOption(tkinter.LabelFrame):
         """Get data from seibot instance"""
         seibot = self.root.seibot
         self.f = seibot.data.f
+        self.set_threshold_ranges()
         self.all_displacements = self.get_all_displacement()
         self.bound_lower, self.bound_upper = self.get_bounds()
         self.tebo, self.tebo_filters = self.get_tebo()
         self.enable()
 
+    @property
+    def disp_thres(self):
+        """RMS displacement threshold (nm)"""
+        return 10**self.log_disp_thres.get()
+
+    @property
+    def vel_thres(self):
+        """RMS velocity threshold (nm/s)"""
+        return 10**self.log_vel_thres.get()
+
+    def set_threshold_ranges(self):
+        """Set slider ranges to span the RMS values of all configurations"""
+        evaluate = self.root.seibot.evaluate
+        for scale, variable, quantity in [
+                (self.rms_disp_scale, self.log_disp_thres, "displacement"),
+                (self.rms_vel_scale, self.log_vel_thres, "velocity")]:
+            log_rms = np.log10(evaluate.get_rms_matrix(quantity=quantity)*1e9)
+            lower = np.floor(np.min(log_rms)*100) / 100
+            upper = np.ceil(np.max(log_rms)*100) / 100
+            scale.config(from_=lower, to=upper)
+            variable.set(upper)  # Start with everything included.
+        self.update_threshold_labels()
+
+    def update_threshold_labels(self):
+        """Show the threshold values"""
+        self.rms_disp_value.config(text=f"{self.disp_thres:.3g} nm")
+        self.rms_vel_value.config(text=f"{self.vel_thres:.3g} nm/s")
+
     def get_all_displacement(self):
         """Get all displacement data withint RMS thresholds.
         
@@ -155,15 +191,10 @@ class ThresholdOption(tkinter.LabelFrame):
             An array of all displacements
         """
         seibot = self.root.seibot
-        f = seibot.data.f
         dm = seibot.evaluate.displacement_matrix
-        disp_thres = float(self.rms_disp_entry.get())
-        vel_thres = float(self.rms_vel_entry.get())
-        indices = seibot.evaluate.get_threshold_indices(disp_thres, vel_thres)
-        shape = (len(indices), len(f))
-        all_displacements = np.empty(shape)
-        for i in range(len(indices)):
-            all_displacements[i] = dm[indices[i]]
+        mask = seibot.evaluate.get_threshold_mask(
+            self.disp_thres, self.vel_thres)
+        all_displacements = dm[mask]
 
         return all_displacements
 
@@ -196,29 +227,37 @@ class ThresholdOption(tkinter.LabelFrame):
             Filter configuration.
         """
         seibot = self.root.seibot
-        seismic_noise = seibot.data.seismic_noise
         
         if len(self.all_displacements) != 0:
-            disp_thres = float(self.rms_disp_entry.get())
-            vel_thres = float(self.rms_vel_entry.get())
             f_lower = float(self.frequency_lower_entry.get())
             f_upper = float(self.frequency_upper_entry.get())
             optimize = self.optimize_option.get()
 
-            filters = seibot.evaluate.threshold_optimize(
-                disp_thres, vel_thres, f_lower, f_upper, optimize)
-
-            seibot.isolation_system.filter_configuration = filters
+            i, j = seibot.evaluate.get_threshold_optimal_index(
+                self.disp_thres, self.vel_thres, f_lower, f_upper, optimize)
 
-            displacement = seibot.isolation_system.get_displacement(seismic_noise)
+            filters = seibot.filter_configurations(i, j)
+            displacement = seibot.evaluate.displacement_matrix[i, j]
         else:
             displacement = None
             filters = None
 
         return displacement, filters
 
+    def schedule_update(self, value=None):
+        """Update thresholds when idle
+
+        Slider events arriving faster than the plots can be redrawn
+        are coalesced into one update.
+        """
+        self.update_threshold_labels()
+        if not self.update_pending:
+            self.update_pending = True
+            self.after_idle(self.update_thresholds)
+
     def update_thresholds(self, entry=None):
         """Update thresholds"""
+        self.update_pending = False
         self.all_displacements = self.get_all_displacement()
         self.bound_lower, self.bound_upper = self.get_bounds()
         self.plot_all()
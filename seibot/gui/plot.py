@@ -1,18 +1,31 @@
 """Seibot GUI Plot"""
 import tkinter
 
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.backends.backend_tkagg import NavigationToolbar2Tk
 import matplotlib.style as mplstyle
 
+import seibot.gui.decimate
+
 
 mplstyle.use('fast')
 plt.rcParams["font.size"] = 14
 
 
 class Plot(tkinter.Frame):
-    """Plot frame"""
+    """Plot frame
+
+    Lines are updated in place.
+    Animated lines are redrawn by blitting them onto a cached background,
+    everything else is redrawn with a full (idle) draw.
+    The full data are kept and decimated again to the screen resolution
+    whenever the x limits or the size of the axis change.
+    """
+    lines = {}  # Line name: (attribute name, legend label)
+
     def __init__(self, master, figsize):
         """Constructor
         
@@ -37,9 +50,230 @@ class Plot(tkinter.Frame):
         toolbar.update()
         self.canvas.get_tk_widget().pack(expand=1, side="top", fill="both")
 
+        self.background = None
+        self.draw_pending = False
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+
+        # Attribute name: (xdata, ydata) at full resolution.
+        self.full_data = {}
+        # Attribute name: number of bins of the shown data.
+        self.shown_bins = {}
+        self.ax.callbacks.connect("xlim_changed", self.on_view_changed)
+        self.canvas.mpl_connect("resize_event", self.on_view_changed)
+
+    @property
+    def animated(self):
+        """Animated artists, drawn by blitting"""
+        return [artist for artist in self.ax.get_children()
+                if artist.get_animated()]
+
+    def on_draw(self, event):
+        """Cache the background and draw animated artists on top"""
+        self.draw_pending = False
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.draw_animated()
+
+    def draw_animated(self):
+        """Draw animated artists"""
+        for artist in sorted(self.animated, key=lambda a: a.get_zorder()):
+            self.fig.draw_artist(artist)
+
+    def draw(self):
+        """Request a full redraw"""
+        self.draw_pending = True
+        self.canvas.draw_idle()
+
+    def on_view_changed(self, *args):
+        """Decimate the full data again for the new view or size"""
+        if self.redecimate():
+            self.draw()
+
+    def blit(self):
+        """Redraw animated artists only"""
+        if self.draw_pending or self.background is None:
+            # The pending full draw redraws the animated artists.
+            self.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_animated()
+        self.canvas.blit(self.fig.bbox)
+
+    def update_line(self, line, xdata=None, ydata=None):
+        """Update line
+
+        Parameters
+        ----------
+        line : str
+            Line to be updated. See `lines` for available lines.
+        xdata : array, optional
+            Updated x data.
+            Defaults None.
+        ydata : array, optional
+            Updated y data.
+            Defaults None.
+        """
+        if line not in self.lines:
+            raise ValueError(f"{line} line does not exist.")
+        attribute, label = self.lines[line]
+        ln = getattr(self, attribute)
+
+        shown = not ln.get_label().startswith("_")
+        self.shown_bins.pop(attribute, None)
+        if xdata is None or ydata is None:
+            self.full_data.pop(attribute, None)
+            ln.set_data([], [])
+            ln.set_label("_nolegend_")
+        else:
+            self.full_data[attribute] = (np.asarray(xdata), np.asarray(ydata))
+            ln.set_label(label)
+        legend_changed = shown != (xdata is not None and ydata is not None)
+        limits_changed = self.update_limits(xdata, ydata)
+        self.redecimate()
+
+        if legend_changed or limits_changed or not ln.get_animated():
+            self.update_legend()
+            self.draw()
+        else:
+            self.blit()
+
+    def get_n_bins(self, xdata):
+        """Number of decimation bins at the screen resolution
+
+        Parameters
+        ----------
+        xdata : array
+            Sorted x data.
+
+        Returns
+        -------
+        n_bins : int
+            One bin per pixel of the axis width in the current view.
+        """
+        n_bins = int(self.ax.bbox.width)
+        x_lower, x_upper = self.ax.get_xlim()
+        if (self.ax.get_xscale() == "log" and x_lower > 0 and xdata[0] > 0
+                and x_upper > x_lower):
+            # Data extending beyond the view keeps the same density.
+            span_data = np.log10(xdata[-1]/xdata[0])
+            span_view = np.log10(x_upper/x_lower)
+            n_bins = int(n_bins * max(1, span_data/span_view))
+        return n_bins
+
+    def decimate(self, xdata, ydata, n_bins=None):
+        """Reduce data to the screen resolution
+
+        Parameters
+        ----------
+        xdata : array
+            Sorted x data.
+        ydata : array
+            y data, 1D or 2D.
+        n_bins : int, optional
+            Number of decimation bins.
+            Defaults None, which uses `get_n_bins()`.
+
+        Returns
+        -------
+        xdata : array
+            Decimated x data, with the same dimension as ydata.
+        ydata : array
+            Decimated y data.
+        """
+        xdata = np.asarray(xdata)
+        if n_bins is None:
+            n_bins = self.get_n_bins(xdata)
+        return seibot.gui.decimate.decimate(
+            xdata, ydata, n_bins, log=self.ax.get_xscale() == "log")
+
+    def set_decimated(self, attribute, n_bins):
+        """Show the full data of an artist decimated
+
+        Parameters
+        ----------
+        attribute : str
+            Attribute name of the artist.
+        n_bins : int
+            Number of decimation bins.
+        """
+        xdata, ydata = self.full_data[attribute]
+        getattr(self, attribute).set_data(
+            *self.decimate(xdata, ydata, n_bins))
+
+    def redecimate(self):
+        """Decimate the full data again at the current screen resolution
+
+        Only artists whose number of bins has changed are updated.
+
+        Returns
+        -------
+        bool
+            True if any artist has been updated.
+        """
+        updated = False
+        for attribute, (xdata, ydata) in list(self.full_data.items()):
+            n_bins = self.get_n_bins(xdata)
+            if self.shown_bins.get(attribute) == n_bins:
+                continue
+            self.shown_bins[attribute] = n_bins
+            self.set_decimated(attribute, n_bins)
+            updated = True
+        return updated
+
+    def update_limits(self, xdata=None, ydata=None):
+        """Extend the data limits and autoscale
+
+        Parameters
+        ----------
+        xdata : array, optional
+            New x data.
+            Defaults None.
+        ydata : array, optional
+            New y data, 1D or 2D.
+            Defaults None.
+
+        Returns
+        -------
+        bool
+            True if the view limits have changed.
+        """
+        if xdata is None or ydata is None:
+            return False
+        x = np.asarray(xdata, dtype=float)
+        y = np.asarray(ydata, dtype=float).reshape(-1, len(x))
+        valid = np.isfinite(y) * (y > 0)
+        if not np.any(valid):
+            return False
+        x = np.broadcast_to(x, y.shape)[valid]
+        y = y[valid]
+        xlim = self.ax.get_xlim()
+        ylim = self.ax.get_ylim()
+        self.ax.update_datalim(
+            [[np.min(x), np.min(y)], [np.max(x), np.max(y)]])
+        self.ax.autoscale_view()
+        return xlim != self.ax.get_xlim() or ylim != self.ax.get_ylim()
+
 
 class MainPlot(Plot):
     """Main Plot"""
+    lines = {
+        "selected": ("selected_ln", "Selected"),
+        "min_disp": ("min_disp_ln", "Min. RMS displacement"),
+        "min_vel": ("min_vel_ln", "Min. RMS velocity"),
+        "tebo": ("tebo_ln", "Threshold-elmination-band-optimization"),
+        "seismic": ("seismic_ln", "Seismic noise"),
+        "seismometer": ("seismometer_ln", "Seismometer noise"),
+        "relative": ("relative_ln", "Relative sensor noise"),
+        "inertial": ("inertial_ln", "Inertial sensor noise"),
+        "witness": ("witness_ln", "Witness measurement"),
+        "current": ("current_ln", "Current"),
+    }
+    # Fill attribute name: (legend label, color, alpha, zorder)
+    bounds = {
+        "all_bound_ln": ("All estimated displacements (bounds)", "k", .1, 0),
+        "threshold_bound_ln": (
+            "All within RMS threshold (bounds)", "C0", .2, 1),
+    }
+
     def __init__(self, master, figsize=(16*2/3, 9*2/3)):
         """Constructor
         
@@ -52,10 +286,14 @@ class MainPlot(Plot):
             Defaults (16*2/3, 9*2/3).
         """
         super().__init__(master, figsize)
-        self.selected_ln, = self.ax.loglog([], [], "C1", zorder=2)
-        self.min_disp_ln, = self.ax.loglog([], [], "C2", zorder=3)
-        self.min_vel_ln, = self.ax.loglog([], [], "C3", zorder=4)
-        self.tebo_ln, = self.ax.loglog([], [], "C4", zorder=5)
+        # Highlighted lines are animated and redrawn by blitting.
+        self.selected_ln, = self.ax.loglog(
+            [], [], "C1", zorder=2, animated=True)
+        self.min_disp_ln, = self.ax.loglog(
+            [], [], "C2", zorder=3, animated=True)
+        self.min_vel_ln, = self.ax.loglog(
+            [], [], "C3", zorder=4, animated=True)
+        self.tebo_ln, = self.ax.loglog([], [], "C4", zorder=5, animated=True)
 
         self.seismic_ln, = self.ax.loglog([], [], "C0--", alpha=.5, zorder=0)
         self.seismometer_ln, = self.ax.loglog(
@@ -63,9 +301,12 @@ class MainPlot(Plot):
         self.relative_ln, = self.ax.loglog([], [], "C2--", alpha=.5, zorder=0)
         self.inertial_ln, = self.ax.loglog([], [], "C3--", alpha=.5, zorder=0)
 
-        self.all_ln = []
+        # Curve families are drawn as single collections.
+        self.all_ln = LineCollection([], colors="k", zorder=0)
+        self.ax.add_collection(self.all_ln, autolim=False)
         self.all_ln_label, = self.ax.loglog([], [], "k", alpha=.5, zorder=0)
-        self.threshold_ln = []
+        self.threshold_ln = LineCollection([], colors="C0", zorder=1)
+        self.ax.add_collection(self.threshold_ln, autolim=False)
         self.threshold_ln_label, = self.ax.loglog(
             [], [], "C0", alpha=.5, zorder=1)
 
@@ -73,7 +314,8 @@ class MainPlot(Plot):
         self.threshold_bound_ln = self.ax.fill_between([], [], [])
 
         self.witness_ln, = self.ax.loglog([], [], "C5", zorder=0)
-        self.current_ln, = self.ax.loglog([], [], "C0", zorder=1)
+        self.current_ln, = self.ax.loglog(
+            [], [], "C0", zorder=1, animated=True)
 
         self.ax.set_title("Isolation table motion")
         self.ax.set_ylabel(
@@ -81,93 +323,6 @@ class MainPlot(Plot):
         self.ax.set_xlabel("Frequency (Hz)")
         self.ax.grid(which="both")
 
-    def update_line(self, line, xdata=None, ydata=None):
-        """Update line
-
-        Parameters
-        ----------
-        line : str
-            Line to be updated.
-            Select from ["selected", "min_disp", "min_vel", "tebo",
-            "seismic", "seismometer", "relative", "inertial", "witness"]
-        xdata : array, optional
-            Updated x data.
-            Defaults None.
-        ydata : array, optional
-            Updated y data.
-            Defaults None.
-        """
-        if line == "selected":
-            ln = self.selected_ln
-            label = "Selected"
-        elif line == "min_disp":
-            ln = self.min_disp_ln
-            label = "Min. RMS displacement"
-        elif line == "min_vel":
-            ln = self.min_vel_ln
-            label = "Min. RMS velocity"
-        elif line == "tebo":
-            ln = self.tebo_ln
-            label = "Threshold-elmination-band-optimization"
-        elif line == "seismic":
-            ln = self.seismic_ln
-            label = "Seismic noise"
-        elif line == "seismometer":
-            ln = self.seismometer_ln
-            label = "Seismometer noise"
-        elif line == "relative":
-            ln = self.relative_ln
-            label = "Relative sensor noise"
-        elif line == "inertial":
-            ln = self.inertial_ln
-            label = "Inertial sensor noise"
-        elif line == "witness":
-            ln = self.witness_ln
-            label = "Witness measurement"
-        elif line == "current":
-            ln = self.current_ln
-            label = "Current"
-        else:
-            raise ValueError(f"{line} line does not exist.")
-
-        zorder = ln.zorder
-        color = ln.get_color()
-        ls = ln.get_ls()
-
-        # This is faster than set_data()
-        if ln in self.ax.lines: ln.remove()
-
-        if xdata is None or ydata is None:
-            ln, = self.ax.loglog([], [], color=color, ls=ls, zorder=zorder)
-        else:
-            ln, = self.ax.loglog(
-                xdata, ydata, color=color, ls=ls, zorder=zorder, label=label
-            )
-
-        if line == "selected":
-            self.selected_ln = ln
-        elif line == "min_disp":
-            self.min_disp_ln = ln
-        elif line == "min_vel":
-            self.min_vel_ln = ln
-        elif line == "tebo":
-            self.tebo_ln = ln
-        elif line == "seismic":
-            self.seismic_ln = ln
-        elif line == "seismometer":
-            self.seismometer_ln = ln
-        elif line == "relative":
-            self.relative_ln = ln
-        elif line == "inertial":
-            self.inertial_ln = ln
-        elif line == "witness":
-            self.witness_ln = ln
-        elif line == "current":
-            self.current_ln = ln
-        
-        self.update_legend()
-        self.canvas.draw()
-
     def update_all_lines(self, line, xdata=None, ydatas=None):
         """Update a collection of lines
         
@@ -187,44 +342,33 @@ class MainPlot(Plot):
             all_ln = self.all_ln
             all_ln_label = self.all_ln_label
             label = "All estimated displacements"
-            color = "k"
-            zorder = 0
-            try:
-                alpha = 1 / len(ydatas) * 2.5
-            except:
-                pass
         elif line == "threshold":
             all_ln = self.threshold_ln
             all_ln_label = self.threshold_ln_label
             label = "All within RMS thresholds"
-            color = "C0"
-            zorder = 1
-            try:
-                alpha = .1 * len(ydatas)/10
-            except:
-                pass
-
-        for ln in all_ln:
-            if ln in self.ax.lines: ln.remove()
-
-        all_ln = []
+        else:
+            raise ValueError(f"{line} lines do not exist.")
 
-        if xdata is None or ydatas is None:
+        attribute = f"{line}_ln"
+        self.shown_bins.pop(attribute, None)
+        if xdata is None or ydatas is None or len(ydatas) == 0:
+            self.full_data.pop(attribute, None)
+            all_ln.set_segments([])
             all_ln_label.set_label("_nolegend_")
         else:
-            for ydata in ydatas:
-                ln, = self.ax.loglog(
-                    xdata, ydata, color=color, alpha=alpha, zorder=zorder)
-                all_ln.append(ln)
+            ydatas = np.asarray(ydatas)
+            if line == "all":
+                alpha = 1 / len(ydatas) * 2.5
+            else:
+                alpha = .1 * len(ydatas)/10
+            self.full_data[attribute] = (np.asarray(xdata), ydatas)
+            all_ln.set_alpha(min(alpha, 1))
             all_ln_label.set_label(label)
-        
-        if line == "all":
-            self.all_ln = all_ln
-        elif line == "threshold":
-            self.threshold_ln = all_ln
+            self.update_limits(xdata, ydatas)
+        self.redecimate()
 
         self.update_legend()
-        self.canvas.draw()
+        self.draw()
     
     def update_bounds(
             self, bounds, xdata=None, bound_lower=None, bound_upper=None):
@@ -245,38 +389,56 @@ class MainPlot(Plot):
             Updated upper bound.
             Defaults None.
         """
-        if bounds == "all":
-            ln = self.all_bound_ln
-            label = "All estimated displacements (bounds)"
-            color = "k"
-            alpha = .1
-            zorder = 0
-        elif bounds == "threshold":
-            ln = self.threshold_bound_ln
-            label = "All within RMS threshold (bounds)"
-            color = "C0"
-            alpha = .2
-            zorder = 1
-
-        if ln in self.ax.collections: ln.remove()
+        if bounds not in ["all", "threshold"]:
+            raise ValueError(f"{bounds} bounds do not exist.")
+        attribute = f"{bounds}_bound_ln"
+        ln = getattr(self, attribute)
+        self.shown_bins.pop(attribute, None)
 
         if xdata is None or bound_lower is None or bound_upper is None:
+            self.full_data.pop(attribute, None)
+            if ln in self.ax.collections: ln.remove()
             ln.set_label("_nolegend_")
-        else:    
-            ln = self.ax.fill_between(
-                xdata, bound_lower, bound_upper,
-                color=color, label=label, alpha=alpha, zorder=zorder
-            )
-        
-        if bounds == "all":
-            self.all_bound_ln = ln
-        elif bounds == "threshold":
-            self.threshold_bound_ln = ln
+        else:
+            self.full_data[attribute] = (
+                np.asarray(xdata), np.stack([bound_lower, bound_upper]))
+        self.redecimate()
 
         self.update_legend()
         # self.ax.relim()
         # self.ax.autoscale_view()
-        self.canvas.draw()
+        self.draw()
+
+    def set_decimated(self, attribute, n_bins):
+        """Show the full data of an artist decimated
+
+        Parameters
+        ----------
+        attribute : str
+            Attribute name of the artist.
+        n_bins : int
+            Number of decimation bins.
+        """
+        xdata, ydata = self.full_data.get(attribute, (None, None))
+        if attribute in ["all_ln", "threshold_ln"]:
+            xdatas, ydatas = self.decimate(xdata, ydata, n_bins)
+            getattr(self, attribute).set_segments(
+                np.stack([xdatas, ydatas], axis=-1))
+        elif attribute in ["all_bound_ln", "threshold_bound_ln"]:
+            label, color, alpha, zorder = self.bounds[attribute]
+            ln = getattr(self, attribute)
+            if ln in self.ax.collections: ln.remove()
+            # Keep the extrema of both bounds at the screen resolution.
+            indices = seibot.gui.decimate.get_indices(
+                xdata, ydata, n_bins, log=self.ax.get_xscale() == "log")
+            indices = np.unique(indices)
+            ln = self.ax.fill_between(
+                xdata[indices], ydata[0, indices], ydata[1, indices],
+                color=color, label=label, alpha=alpha, zorder=zorder
+            )
+            setattr(self, attribute, ln)
+        else:
+            super().set_decimated(attribute, n_bins)
         
     def update_legend(self):
         """Update legend"""
@@ -311,6 +473,19 @@ class MainPlot(Plot):
 
 class SensorCorrectionPlot(Plot):
     """Filter Plot"""
+    lines = {
+        "selected": ("selected_ln", "Selected sensor correction"),
+        "min_disp": ("min_disp_ln", "Min. disp. sensor correction"),
+        "min_vel": ("min_vel_ln", "Min. vel. sensor correction"),
+        "tebo": ("tebo_ln", "TEBO sensor correction"),
+        "current": ("current_ln", "Current sensor correction"),
+        "selected_comp": ("selected_comp_ln", "Selected transmissivity"),
+        "min_disp_comp": ("min_disp_comp_ln", "Min. disp. transmissivity"),
+        "min_vel_comp": ("min_vel_comp_ln", "Min. vel. transmissivity"),
+        "tebo_comp": ("tebo_comp_ln", "TEBO transmissivity"),
+        "current_comp": ("current_comp_ln", "Current transmissivity"),
+    }
+
     def __init__(self, master, figsize=(16*1/3, 9*1/3)):
         """Constructor
         
@@ -323,109 +498,33 @@ class SensorCorrectionPlot(Plot):
             Defaults (16*1/3, 9*1/3).
         """
         super().__init__(master, figsize)
-        self.selected_ln, = self.ax.loglog([], [], "C1", zorder=2)
-        self.min_disp_ln, = self.ax.loglog([], [], "C2", zorder=3)
-        self.min_vel_ln, = self.ax.loglog([], [], "C3", zorder=4)
-        self.tebo_ln, = self.ax.loglog([], [], "C4", zorder=5)
-        self.current_ln, = self.ax.loglog([], [], "C0", zorder=1)
-
-        self.selected_comp_ln, = self.ax.loglog([], [], "C1--", zorder=2)
-        self.min_disp_comp_ln, = self.ax.loglog([], [], "C2--", zorder=3)
-        self.min_vel_comp_ln, = self.ax.loglog([], [], "C3--", zorder=4)
-        self.tebo_comp_ln, = self.ax.loglog([], [], "C4--", zorder=5)
-        self.current_comp_ln, = self.ax.loglog([], [], "C0--", zorder=1)
+        self.selected_ln, = self.ax.loglog(
+            [], [], "C1", zorder=2, animated=True)
+        self.min_disp_ln, = self.ax.loglog(
+            [], [], "C2", zorder=3, animated=True)
+        self.min_vel_ln, = self.ax.loglog(
+            [], [], "C3", zorder=4, animated=True)
+        self.tebo_ln, = self.ax.loglog(
+            [], [], "C4", zorder=5, animated=True)
+        self.current_ln, = self.ax.loglog(
+            [], [], "C0", zorder=1, animated=True)
+
+        self.selected_comp_ln, = self.ax.loglog(
+            [], [], "C1--", zorder=2, animated=True)
+        self.min_disp_comp_ln, = self.ax.loglog(
+            [], [], "C2--", zorder=3, animated=True)
+        self.min_vel_comp_ln, = self.ax.loglog(
+            [], [], "C3--", zorder=4, animated=True)
+        self.tebo_comp_ln, = self.ax.loglog(
+            [], [], "C4--", zorder=5, animated=True)
+        self.current_comp_ln, = self.ax.loglog(
+            [], [], "C0--", zorder=1, animated=True)
 
         self.ax.set_title("Sensor correction filters")
         self.ax.set_ylabel("Amplitude")
         self.ax.set_xlabel("Frequency (Hz)")
         self.ax.grid(which="both")
 
-    def update_line(self, line, xdata=None, ydata=None):
-        """Update line
-
-        Parameters
-        ----------
-        line : str
-            Line to be updated.
-            Select from ["selected", "min_disp", "min_vel", "tebo",
-            "selected_comp", "min_disp_comp", "min_vel_comp", "tebo_comp"]
-        xdata : array, optional
-            Updated x data.
-            Defaults None.
-        ydata : array, optional
-            Updated y data.
-            Defaults None.
-        """
-        if line == "selected":
-            ln = self.selected_ln
-            label = "Selected sensor correction"
-        elif line == "min_disp":
-            ln = self.min_disp_ln
-            label = "Min. disp. sensor correction"
-        elif line == "min_vel":
-            ln = self.min_vel_ln
-            label = "Min. vel. sensor correction"
-        elif line == "tebo":
-            ln = self.tebo_ln
-            label = "TEBO sensor correction"
-        elif line == "current":
-            ln = self.current_ln
-            label = "Current sensor correction"
-        elif line == "selected_comp":
-            ln = self.selected_comp_ln
-            label = "Selected transmissivity"
-        elif line == "min_disp_comp":
-            ln = self.min_disp_comp_ln
-            label = "Min. disp. transmissivity"
-        elif line == "min_vel_comp":
-            ln = self.min_vel_comp_ln
-            label = "Min. vel. transmissivity"
-        elif line == "tebo_comp":
-            ln = self.tebo_comp_ln
-            label = "TEBO transmissivity"
-        elif line == "current_comp":
-            ln = self.current_comp_ln
-            label = "Current transmissivity"
-        else:
-            raise ValueError(f"{line} line does not exist.")
-
-        color = ln.get_color()
-        ls = ln.get_ls()
-        zorder = ln.zorder
-
-        if ln in self.ax.lines: ln.remove()
-
-        if xdata is None or ydata is None:
-            ln, = self.ax.loglog([], [], color=color, ls=ls, zorder=zorder)
-        else:
-            ln, = self.ax.loglog(
-                xdata, ydata, color=color, ls=ls, zorder=zorder, label=label
-            )
-
-        if line == "selected":
-            self.selected_ln = ln
-        elif line == "min_disp":
-            self.min_disp_ln = ln
-        elif line == "min_vel":
-            self.min_vel_ln = ln
-        elif line == "tebo":
-            self.tebo_ln = ln
-        elif line == "current":
-            self.current_ln = ln
-        elif line == "selected_comp":
-            self.selected_comp_ln = ln
-        elif line == "min_disp_comp":
-            self.min_disp_comp_ln = ln
-        elif line == "min_vel_comp":
-            self.min_vel_comp_ln = ln
-        elif line == "tebo_comp":
-            self.tebo_comp_ln = ln
-        elif line == "current_comp":
-            self.current_comp_ln = ln
-
-        self.update_legend()
-        self.canvas.draw()
-
     def update_legend(self):
         """Update legend"""
         filter1_handles = [
@@ -457,6 +556,19 @@ class SensorCorrectionPlot(Plot):
 
 class BlendPlot(Plot):
     """Filter Plot"""
+    lines = {
+        "selected": ("selected_ln", "Selected low-pass"),
+        "min_disp": ("min_disp_ln", "Min. disp. low-pass"),
+        "min_vel": ("min_vel_ln", "Min. vel. low-pass"),
+        "tebo": ("tebo_ln", "TEBO low-pass"),
+        "current": ("current_ln", "Current low-pass"),
+        "selected_comp": ("selected_comp_ln", "Selected high-pass"),
+        "min_disp_comp": ("min_disp_comp_ln", "Min. disp. high-pass"),
+        "min_vel_comp": ("min_vel_comp_ln", "Min. vel. high-pass"),
+        "tebo_comp": ("tebo_comp_ln", "TEBO high-pass"),
+        "current_comp": ("current_comp_ln", "Current high-pass"),
+    }
+
     def __init__(self, master, figsize=(16*1/3, 9*1/3)):
         """Constructor
         
@@ -469,108 +581,33 @@ class BlendPlot(Plot):
             Defaults (16*1/3, 9*1/3).
         """
         super().__init__(master, figsize)
-        self.selected_ln, = self.ax.loglog([], [], "C1", zorder=2)
-        self.min_disp_ln, = self.ax.loglog([], [], "C2", zorder=3)
-        self.min_vel_ln, = self.ax.loglog([], [], "C3", zorder=4)
-        self.tebo_ln, = self.ax.loglog([], [], "C4", zorder=5)
-        self.current_ln, = self.ax.loglog([], [], "C0", zorder=1)
-
-        self.selected_comp_ln, = self.ax.loglog([], [], "C1--", zorder=2)
-        self.min_disp_comp_ln, = self.ax.loglog([], [], "C2--", zorder=3)
-        self.min_vel_comp_ln, = self.ax.loglog([], [], "C3--", zorder=4)
-        self.tebo_comp_ln, = self.ax.loglog([], [], "C4--", zorder=5)
-        self.current_comp_ln, = self.ax.loglog([], [], "C0--", zorder=1)
+        self.selected_ln, = self.ax.loglog(
+            [], [], "C1", zorder=2, animated=True)
+        self.min_disp_ln, = self.ax.loglog(
+            [], [], "C2", zorder=3, animated=True)
+        self.min_vel_ln, = self.ax.loglog(
+            [], [], "C3", zorder=4, animated=True)
+        self.tebo_ln, = self.ax.loglog(
+            [], [], "C4", zorder=5, animated=True)
+        self.current_ln, = self.ax.loglog(
+            [], [], "C0", zorder=1, animated=True)
+
+        self.selected_comp_ln, = self.ax.loglog(
+            [], [], "C1--", zorder=2, animated=True)
+        self.min_disp_comp_ln, = self.ax.loglog(
+            [], [], "C2--", zorder=3, animated=True)
+        self.min_vel_comp_ln, = self.ax.loglog(
+            [], [], "C3--", zorder=4, animated=True)
+        self.tebo_comp_ln, = self.ax.loglog(
+            [], [], "C4--", zorder=5, animated=True)
+        self.current_comp_ln, = self.ax.loglog(
+            [], [], "C0--", zorder=1, animated=True)
 
         self.ax.set_title("Complementary filters (blends)")
         self.ax.set_ylabel("Amplitude")
         self.ax.set_xlabel("Frequency (Hz)")
         self.ax.grid(which="both")
 
-    def update_line(self, line, xdata=None, ydata=None):
-        """Update line
-
-        Parameters
-        ----------
-        line : str
-            Line to be updated.
-            Select from ["selected", "min_disp", "min_vel", "tebo",
-            "selected_comp", "min_disp_comp", "min_vel_comp", "tebo_comp"]
-        xdata : array, optional
-            Updated x data.
-            Defaults None.
-        ydata : array, optional
-            Updated y data.
-            Defaults None.
-        """
-        if line == "selected":
-            ln = self.selected_ln
-            label = "Selected low-pass"
-        elif line == "min_disp":
-            ln = self.min_disp_ln
-            label = "Min. disp. low-pass"
-        elif line == "min_vel":
-            ln = self.min_vel_ln
-            label = "Min. vel. low-pass"
-        elif line == "tebo":
-            ln = self.tebo_ln
-            label = "TEBO low-pass"
-        elif line == "current":
-            ln = self.current_ln
-            label = "Current low-pass"
-        elif line == "selected_comp":
-            ln = self.selected_comp_ln
-            label = "Selected high-pass"
-        elif line == "min_disp_comp":
-            ln = self.min_disp_comp_ln
-            label = "Min. disp. high-pass"
-        elif line == "min_vel_comp":
-            ln = self.min_vel_comp_ln
-            label = "Min. vel. high-pass"
-        elif line == "tebo_comp":
-            ln = self.tebo_comp_ln
-            label = "TEBO high-pass"
-        elif line == "current_comp":
-            ln = self.current_comp_ln
-            label = "Current high-pass"
-        else:
-            raise ValueError(f"{line} line does not exist.")
-        
-        color = ln.get_color()
-        ls = ln.get_ls()
-        zorder = ln.zorder
-        
-        if ln in self.ax.lines: ln.remove()
-
-        if xdata is None or ydata is None:
-            ln, = self.ax.loglog([], [], color=color, ls=ls, zorder=zorder)
-        else:
-            ln, = self.ax.loglog(
-                xdata, ydata, color=color, ls=ls, zorder=zorder, label=label)
-
-        if line == "selected":
-            self.selected_ln = ln
-        elif line == "min_disp":
-            self.min_disp_ln = ln
-        elif line == "min_vel":
-            self.min_vel_ln = ln
-        elif line == "tebo":
-            self.tebo_ln = ln
-        elif line == "current":
-            self.current_ln = ln
-        elif line == "selected_comp":
-            self.selected_comp_ln = ln
-        elif line == "min_disp_comp":
-            self.min_disp_comp_ln = ln
-        elif line == "min_vel_comp":
-            self.min_vel_comp_ln = ln
-        elif line == "tebo_comp":
-            self.tebo_comp_ln = ln
-        elif line == "current_comp":
-            self.current_comp_ln = ln
-
-        self.update_legend()
-        self.canvas.draw()
-
     def update_legend(self):
         """Update legend"""
         filter1_handles = [
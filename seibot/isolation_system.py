@@ -1,5 +1,6 @@
 """Isolation system class"""
 import control
+import numpy as np
 
 import seibot.forecast
 
@@ -78,6 +79,64 @@ class Process(control.TransferFunction):
         self._mag = _mag
 
 
+class FrequencyResponse:
+    """A control process defined by its frequency response
+
+    The transfer function is only formed when it is asked for.
+
+    Parameters
+    ----------
+    f : array
+        Frequency array.
+    response : array
+        The complex frequency response evaluated at `f`.
+    get_tf : callable, optional
+        Function returning the transfer function of the process.
+        Defaults None.
+    """
+    def __init__(self, f, response, get_tf=None):
+        """Constructor
+
+        Parameters
+        ----------
+        f : array
+            Frequency array.
+        response : array
+            The complex frequency response evaluated at `f`.
+        get_tf : callable, optional
+            Function returning the transfer function of the process.
+            Defaults None.
+        """
+        self.f = f
+        self.response = response
+        self.mag = abs(response)
+        self._get_tf = get_tf
+        self._tf = None
+
+    def __call__(self, s):
+        """Evaluate the transfer function at s"""
+        return self.tf(s)
+
+    @property
+    def mag(self):
+        """Magnitude response"""
+        return self._mag
+
+    @mag.setter
+    def mag(self, _mag):
+        """mag.setter"""
+        self._mag = _mag
+
+    @property
+    def tf(self):
+        """Transfer function, built on first access"""
+        if self._tf is None:
+            if self._get_tf is None:
+                raise ValueError("Transfer function is not available.")
+            self._tf = self._get_tf()
+        return self._tf
+
+
 class IsolationSystem:
     """Isolation system class
 
@@ -106,9 +165,9 @@ class IsolationSystem:
             The seismic transmissivity.
         controller : seibot.Process or seibot.Filter
             The feedback controller.
-        sensitivity : seibot.Process
+        sensitivity : seibot.Process or FrequencyResponse
             The sensitivity function of the closed-loop system.
-        complement : seibot.Process
+        complement : seibot.Process or FrequencyResponse
             The complementary sensitivity of the closed-loop system.
         """
         self.relative_sensor = relative_sensor
@@ -127,13 +186,16 @@ class IsolationSystem:
             "high pass filter": None,
         }
 
-    def get_displacement(self, seismic_noise):
+    def get_displacement(self, seismic_noise, index=None):
         """Get closed-loop displacement
         
         Parameters
         ----------
         seismic_noise : array
             The amplitude spectral density of the seismic noise.
+        index : array, optional
+            Indices of the frequency array to evaluate at.
+            Defaults None, which evaluates at all frequencies.
 
         Returns
         -------
@@ -146,27 +208,74 @@ class IsolationSystem:
             raise ValueError("sensor_correction_filter, low_pass_filter"
                              "or high_pass_filter is not set.")
         
-        forecaster = seibot.forecast.Forecast()
-        forecaster.f = self.relative_sensor.f
-        disturbance = forecaster.get_disturbance(
-            seismic_noise=seismic_noise,
-            transmissivity=self.transmissivity.mag
-        )
-        noise = forecaster.get_noise(
+        displacement = self.forecast(
             seismic_noise=seismic_noise,
-            seismometer_noise=self.seismometer.noise,
-            relative_sensor_noise=self.relative_sensor.noise,
-            inertial_sensor_noise=self.inertial_sensor.noise,
             sensor_correction_filter=self.sensor_correction_filter.mag,
             sensor_correction_comp=self.sensor_correction_filter.mag_comp,
             h1=self.low_pass_filter.mag,
             h2=self.high_pass_filter.mag,
+            index=index,
+        )
+        
+        return displacement
+
+    def forecast(self, seismic_noise, sensor_correction_filter,
+                 sensor_correction_comp, h1, h2, index=None):
+        """Get closed-loop displacement from filter magnitude responses
+
+        All arrays have the frequency as the last axis and broadcast
+        against each other, e.g. sensor correction filters with shape
+        (n_sc, 1, n_f) and blends with shape (1, n_blend, n_f)
+        give the displacements of all configurations at once.
+
+        Parameters
+        ----------
+        seismic_noise : array
+            The amplitude spectral density of the seismic noise.
+        sensor_correction_filter : array
+            The magnitude response of the sensor correction filter.
+        sensor_correction_comp : array
+            The magnitude response of the sensor correction complementary.
+        h1 : array
+            The magnitude response of the low-pass filter.
+        h2 : array
+            The magnitude response of the high-pass filter.
+        index : array, optional
+            Indices of the frequency array to evaluate at.
+            All arrays are given at all frequencies.
+            Defaults None, which evaluates at all frequencies.
+
+        Returns
+        -------
+        displacement : array
+            The closed-loop displacement.
+        """
+        def take(array):
+            if index is None:
+                return array
+            return np.asarray(array)[..., index]
+
+        forecaster = seibot.forecast.Forecast()
+        forecaster.f = take(self.relative_sensor.f)
+        disturbance = forecaster.get_disturbance(
+            seismic_noise=take(seismic_noise),
+            transmissivity=take(self.transmissivity.mag)
+        )
+        noise = forecaster.get_noise(
+            seismic_noise=take(seismic_noise),
+            seismometer_noise=take(self.seismometer.noise),
+            relative_sensor_noise=take(self.relative_sensor.noise),
+            inertial_sensor_noise=take(self.inertial_sensor.noise),
+            sensor_correction_filter=take(sensor_correction_filter),
+            sensor_correction_comp=take(sensor_correction_comp),
+            h1=take(h1),
+            h2=take(h2),
         )
         displacement = forecaster.get_displacement(
             disturbance=disturbance,
             noise=noise,
-            sensitivity=self.sensitivity.mag,
-            complement=self.complement.mag
+            sensitivity=take(self.sensitivity.mag),
+            complement=take(self.complement.mag)
         )
         
         return displacement
@@ -296,5 +405,9 @@ class IsolationSystem:
     
     @filter_configuration.setter
     def filter_configuration(self, _filter_configuration):
-        """Filter configuration setter"""
-        self._filter_configuration = _filter_configuration
+        """Filter configuration setter
+        
+        The filters are copied into a dictionary so that
+        the filters can be set individually.
+        """
+        self._filter_configuration = dict(_filter_configuration)
@@ -0,0 +1,292 @@
+"""Precomputed recommendations keyed by seismic state
+
+Historical seismic spectra are clustered into a few recurring states,
+e.g. quiet, microseism and wind, and the best filter configuration of
+each state is evaluated once.
+Live spectra are then served by a nearest-neighbour lookup.
+"""
+import numpy as np
+import scipy.cluster.vq
+
+import seibot.evaluate
+
+
+# RMS quantity minimized by the criteria a table can serve.
+quantities = {
+    "min_rms_displacement": "displacement",
+    "min_rms_velocity": "velocity",
+}
+
+
+class RecommendationTable:
+    """Recommendations of clustered seismic states
+
+    Distances are the RMS difference of the log10 amplitude spectral
+    densities across frequencies, i.e. in decades.
+
+    Parameters
+    ----------
+    f : array
+        Frequency array.
+    centroids : array
+        log10 seismic noise ASDs of the states with shape (n_states, n_f).
+    indices : array
+        Configuration indices (i, j) of the states with shape (n_states, 2).
+    rms : array
+        RMS values of the recommendations, (m or m/s).
+    shape : tuple of int
+        Shape (n_sc, n_blend) of the filter configurations.
+    max_distance : float or array
+        Maximum distance of a spectrum to its state for the recommendation
+        to be used, for all states or for each state.
+    quantity : str
+        The RMS "displacement" or "velocity" minimized by the
+        recommendations.
+    """
+    def __init__(self, f, centroids, indices, rms, shape, max_distance,
+                 quantity):
+        """Constructor
+
+        Parameters
+        ----------
+        f : array
+            Frequency array.
+        centroids : array
+            log10 seismic noise ASDs of the states with shape
+            (n_states, n_f).
+        indices : array
+            Configuration indices (i, j) of the states with shape
+            (n_states, 2).
+        rms : array
+            RMS values of the recommendations, (m or m/s).
+        shape : tuple of int
+            Shape (n_sc, n_blend) of the filter configurations.
+        max_distance : float or array
+            Maximum distance of a spectrum to its state for the
+            recommendation to be used, for all states or for each state.
+        quantity : str
+            The RMS "displacement" or "velocity" minimized by the
+            recommendations.
+        """
+        self.f = np.asarray(f)
+        self.centroids = np.asarray(centroids)
+        self.indices = [(int(i), int(j)) for i, j in indices]
+        self.rms = np.asarray(rms)
+        self.shape = tuple(int(n) for n in shape)
+        self.max_distance = max_distance
+        self.quantity = str(quantity)
+
+    @property
+    def max_distance(self):
+        """Maximum distance of each state"""
+        return self._max_distance
+
+    @max_distance.setter
+    def max_distance(self, _max_distance):
+        """Maximum distance setter, a float applies to all states"""
+        self._max_distance = np.broadcast_to(
+            np.asarray(_max_distance, dtype=float), len(self.centroids)
+        ).copy()
+
+    @classmethod
+    def from_spectra(cls, isolation_system, filter_configurations, f,
+                     seismic_noises, n_states=3, quantity="displacement",
+                     f_lower=None, f_upper=None, max_distance=None,
+                     percentile=95, seed=0):
+        """Cluster seismic spectra and evaluate the best configurations
+
+        Parameters
+        ----------
+        isolation_system : seibot.isolation_system.IsolationSystem
+           The isolation system with sensors and plants specified.
+        filter_configurations : seibot.filter.FilterConfigurations
+            The filter configurations.
+        f : array
+            Frequency array.
+        seismic_noises : array
+            Historical seismic noise ASDs with shape (n_spectra, n_f).
+        n_states : int, optional
+            Number of seismic states.
+            Defaults 3.
+        quantity : str, optional
+            Minimize the RMS "displacement" or "velocity".
+            Defaults "displacement".
+        f_lower : float, optional
+            Lower bound of the frequency band.
+            Defaults None.
+        f_upper : float, optional
+            Upper bound of the frequency band.
+            Defaults None.
+        max_distance : float, optional
+            Maximum distance for a recommendation to be used.
+            Defaults None, which uses the percentile of the distances of
+            the historical spectra to their state, for each state.
+        percentile : float, optional
+            Percentile of the distances used as the radius of the states.
+            Defaults 95.
+        seed : int, optional
+            Seed of the k-means initialization.
+            Defaults 0.
+
+        Returns
+        -------
+        RecommendationTable
+            The table.
+        """
+        log_asd = np.log10(np.atleast_2d(seismic_noises))
+        n_states = min(n_states, len(log_asd))
+        centroids, labels = scipy.cluster.vq.kmeans2(
+            log_asd, n_states, minit="++", seed=seed)
+
+        # States without spectra are dropped.
+        occupied = np.unique(labels)
+        centroids = centroids[occupied]
+        labels = np.searchsorted(occupied, labels)
+
+        # All states are evaluated at once along the ensemble axis.
+        evaluate = seibot.evaluate.EnsembleEvaluate(
+            isolation_system, filter_configurations, f, 10**centroids)
+        rms_matrices = evaluate.get_ensemble_rms_matrix(
+            f_lower, f_upper, quantity)
+        shape = rms_matrices.shape[1:]
+        argmin = np.argmin(rms_matrices.reshape(len(centroids), -1), axis=1)
+        indices = np.stack(np.unravel_index(argmin, shape), axis=-1)
+        rms = rms_matrices.reshape(len(centroids), -1)[
+            np.arange(len(centroids)), argmin]
+
+        if max_distance is None:
+            # A radius per state, not dominated by outlier spectra.
+            distances = get_distance(log_asd, centroids[labels])
+            max_distance = np.array([
+                np.percentile(distances[labels == state], percentile)
+                for state in range(len(centroids))])
+
+        return cls(f, centroids, indices, rms, shape, max_distance, quantity)
+
+    def lookup(self, seismic_noise):
+        """Find the nearest seismic state
+
+        Parameters
+        ----------
+        seismic_noise : array
+            The seismic noise ASD.
+
+        Returns
+        -------
+        state : int
+            Index of the nearest state.
+        distance : float
+            Distance to the state.
+        """
+        if len(seismic_noise) != len(self.f):
+            raise ValueError(f"Spectrum has {len(seismic_noise)} points, "
+                             f"the table has {len(self.f)}.")
+        distances = get_distance(np.log10(seismic_noise), self.centroids)
+        state = int(np.argmin(distances))
+        return state, float(distances[state])
+
+    def recommend(self, seismic_noise, fallback=None):
+        """Recommend a configuration for a seismic noise ASD
+
+        Parameters
+        ----------
+        seismic_noise : array
+            The seismic noise ASD.
+        fallback : callable, optional
+            Called without arguments when the spectrum is further than
+            `max_distance` from all states, e.g. a full evaluation.
+            Defaults None.
+
+        Returns
+        -------
+        tuple of int or None
+            The configuration indices (i, j),
+            or the return value of fallback if the spectrum is too far.
+        """
+        state, distance = self.lookup(seismic_noise)
+        if distance > self.max_distance[state]:
+            if fallback is None:
+                return None
+            return fallback()
+        return self.indices[state]
+
+    def check(self, filter_configurations, f, quantity):
+        """Check that the table matches an evaluation
+
+        Parameters
+        ----------
+        filter_configurations : seibot.filter.FilterConfigurations
+            The filter configurations.
+        f : array
+            Frequency array.
+        quantity : str
+            The RMS "displacement" or "velocity" to be minimized.
+
+        Raises
+        ------
+        ValueError
+            If the number of filters, the frequency arrays or the
+            quantities differ.
+        """
+        shape = (len(filter_configurations.sc_pool),
+                 len(filter_configurations.lp_pool))
+        if shape != self.shape:
+            raise ValueError(f"Table is for {self.shape} configurations, "
+                             f"got {shape}.")
+        if not np.array_equal(f, self.f):
+            raise ValueError("Table is for a different frequency array.")
+        if quantity != self.quantity:
+            raise ValueError(f"Table minimizes the RMS {self.quantity}, "
+                             f"got {quantity}.")
+
+    def save(self, path):
+        """Save the table into an .npz file
+
+        Parameters
+        ----------
+        path : str
+            Path of the file.
+        """
+        np.savez(
+            path, f=self.f, centroids=self.centroids,
+            indices=np.array(self.indices), rms=self.rms,
+            shape=self.shape, max_distance=self.max_distance,
+            quantity=self.quantity)
+
+    @classmethod
+    def load(cls, path):
+        """Load a table from an .npz file
+
+        Parameters
+        ----------
+        path : str
+            Path of the file.
+
+        Returns
+        -------
+        RecommendationTable
+            The table.
+        """
+        with np.load(path) as file:
+            return cls(
+                file["f"], file["centroids"], file["indices"], file["rms"],
+                file["shape"], file["max_distance"], file["quantity"])
+
+
+def get_distance(log_asd, centroids):
+    """RMS difference of log10 ASDs across frequencies
+
+    Parameters
+    ----------
+    log_asd : array
+        log10 ASDs with the frequency as the last axis.
+    centroids : array
+        log10 ASDs broadcastable against log_asd.
+
+    Returns
+    -------
+    distance : array
+        The distances in decades.
+    """
+    difference = log_asd - centroids
+    return np.sqrt(np.mean(difference**2, axis=-1))
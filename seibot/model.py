@@ -1,5 +1,7 @@
 """Model Library
 """
+import hashlib
+
 import control
 import numpy as np
 import scipy
@@ -127,12 +129,116 @@ class Model:
         spectrum
             The interpolated spectrum.
         """
-        data = np.load(npz_data)
-        f_data = data["f"]
-        spectrum_data = data["data"]
-        log_interp = scipy.interpolate.interp1d(
-            f_data, np.log10(spectrum_data), fill_value="extrapolate")
+        log_interp = registry.get_interpolant(npz_data)
         spectrum = 10**log_interp(f)
         
         return spectrum
 
+
+class ModelRegistry:
+    """Cache of evaluated models
+
+    Evaluated models are keyed by the model name, the contents of the
+    parameter file and the frequency array, so repeated evaluations,
+    e.g. from repeated constructions of `seibot.Data`, are reused.
+    """
+    def __init__(self):
+        """Constructor"""
+        self.model = Model()
+        self._evaluated = {}
+        self._interpolants = {}
+
+    def evaluate(self, model_name, path_parameters, f):
+        """Evaluate a model with parameters from a file
+
+        Parameters
+        ----------
+        model_name : str
+            Name of the model method in `seibot.model.Model`.
+        path_parameters : str
+            Path of the model parameter file.
+            For the "interpolate" model, it is the path to the .npz data.
+        f : array
+            Frequency array.
+
+        Returns
+        -------
+        frequency_series : array or TransferFunction
+            The modeled frequency series.
+        """
+        contents = self._read(path_parameters)
+        key = (model_name, self._digest(contents), self._get_grid_key(f))
+        if key not in self._evaluated:
+            model_method = getattr(self.model, model_name)
+            if model_name == "interpolate":
+                # Interpolate from data.
+                frequency_series = model_method(f, path_parameters)
+            else:
+                parameters = np.loadtxt(path_parameters)
+                frequency_series = model_method(f, *parameters)
+            self._evaluated[key] = frequency_series
+
+        frequency_series = self._evaluated[key]
+        if isinstance(frequency_series, np.ndarray):
+            # Protect the cache from in-place modifications.
+            frequency_series = frequency_series.copy()
+
+        return frequency_series
+
+    def get_interpolant(self, npz_data):
+        """Get the log-log interpolant of saved .npz data
+
+        Parameters
+        ----------
+        npz_data : str
+            Path to the .npz data with keys ["f", "data"].
+
+        Returns
+        -------
+        log_interp : scipy.interpolate.interp1d
+            Interpolant of log10 of the data.
+        """
+        key = self._digest(self._read(npz_data))
+        if key not in self._interpolants:
+            data = np.load(npz_data)
+            f_data = data["f"]
+            spectrum_data = data["data"]
+            self._interpolants[key] = scipy.interpolate.interp1d(
+                f_data, np.log10(spectrum_data), fill_value="extrapolate")
+
+        return self._interpolants[key]
+
+    def clear(self):
+        """Clear all cached models"""
+        self._evaluated.clear()
+        self._interpolants.clear()
+
+    def _read(self, path):
+        """Read file contents
+
+        Parameters
+        ----------
+        path : str
+            Path of the file.
+
+        Returns
+        -------
+        bytes
+            The file contents.
+        """
+        with open(path, "rb") as file:
+            contents = file.read()
+        return contents
+
+    def _digest(self, contents):
+        """Digest of file contents"""
+        return hashlib.sha1(contents).hexdigest()
+
+    def _get_grid_key(self, f):
+        """Key of a frequency array"""
+        f = np.ascontiguousarray(f)
+        return (f.shape, f.dtype.str, self._digest(f.tobytes()))
+
+
+registry = ModelRegistry()
+
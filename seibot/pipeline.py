@@ -0,0 +1,349 @@
+"""Pipelined fetch, spectral estimation and evaluation
+
+Windows flow through three stages connected by bounded queues:
+
+1. fetch: waits on the network,
+2. spectra: estimates the spectra with `seibot.data.Data`,
+3. evaluate: evaluates the filter configurations.
+
+Each stage runs in an executor, so the next window is fetched while
+the current one is being processed, and the throughput is bounded by
+the slowest stage instead of the sum of them.
+Full queues block the upstream stages.
+"""
+import asyncio
+import concurrent.futures
+import csv
+import os
+import time
+
+import numpy as np
+
+import seibot.backtest
+import seibot.data
+import seibot.evaluate
+import seibot.filter
+import seibot.gps
+
+
+class Pipeline(seibot.backtest.WindowedSeibot):
+    """Pipelined Seibot runner over consecutive windows
+
+    The filter pools are built once and shared by all windows.
+
+    Parameters
+    ----------
+    config : str
+        Path of the Seibot configuration file.
+        The window length is `duration` of `[CDSutils]`.
+    max_queue : int, optional
+        Number of windows that may wait between two stages.
+        Defaults 1.
+    workers : int, optional
+        Number of threads of the spectral and evaluation stages.
+        Defaults 2.
+    """
+    stages = ["fetch", "spectra", "evaluate"]
+
+    def __init__(self, config, max_queue=1, workers=2):
+        """Constructor
+
+        Parameters
+        ----------
+        config : str
+            Path of the Seibot configuration file.
+        max_queue : int, optional
+            Number of windows that may wait between two stages.
+            Defaults 1.
+        workers : int, optional
+            Number of threads of the spectral and evaluation stages.
+            Defaults 2.
+        """
+        super().__init__(config)
+        self.max_queue = max_queue
+        self.workers = workers
+        self.evaluate_options = self.get_evaluate_options()
+        # Busy time (s) of each stage for each window.
+        self.timings = {stage: [] for stage in self.stages}
+
+    def fetch_window(self, start):
+        """Fetch a window
+
+        Parameters
+        ----------
+        start : float
+            GPS start time.
+
+        Returns
+        -------
+        list of seibot.backtest.TimeSeries
+            The time series of the window.
+        """
+        return self.fetch(start, start+self.duration)
+
+    def get_data(self, time_series):
+        """Estimate the spectra of a window
+
+        Parameters
+        ----------
+        time_series : list of seibot.backtest.TimeSeries
+            The time series of the window.
+
+        Returns
+        -------
+        seibot.data.Data
+            The data.
+        """
+        return seibot.data.Data(self.path_config, time_series=time_series)
+
+    def evaluate_data(self, start, data):
+        """Evaluate the filter configurations of a window
+
+        Parameters
+        ----------
+        start : float
+            GPS start time.
+        data : seibot.data.Data
+            The data of the window.
+
+        Returns
+        -------
+        row : dict
+            The recommendation and its RMS values (nm and nm/s).
+        """
+        isolation_system = self.get_isolation_system(data)
+        evaluate = seibot.evaluate.Evaluate(
+            isolation_system, self.filter_configurations,
+            data.f, data.seismic_noise, **self.evaluate_options)
+        i, j = getattr(evaluate, self.criterion)().indices
+        displacement = evaluate.get_displacement(i, j)
+        band_rms = evaluate.get_band_rms(displacement) * 1e9  # m to nm
+        velocity_rms = evaluate.get_band_rms(displacement, "velocity") * 1e9
+
+        get_label = seibot.filter.get_label
+        row = {
+            "gps": start,
+            "i": int(i),
+            "j": int(j),
+            "sc": get_label(self.filter_configurations.sc_pool[i]),
+            "lp": get_label(self.filter_configurations.lp_pool[j]),
+            "hp": get_label(self.filter_configurations.hp_pool[j]),
+            "rms_displacement": band_rms[0],
+            "rms_velocity": velocity_rms[0],
+        }
+        for (f_lower, f_upper), rms in zip(evaluate.bands, band_rms[1:]):
+            row[f"rms_displacement_{f_lower:g}_{f_upper:g}"] = rms
+
+        return row
+
+    async def run_stage(self, stage, function, queue_in, queue_out,
+                        executor):
+        """Run a stage until the end of its input
+
+        Parameters
+        ----------
+        stage : str
+            Name of the stage.
+        function : callable
+            Called as function(start, value) in the executor.
+        queue_in : asyncio.Queue
+            Input (start, value) items, ending with None.
+        queue_out : asyncio.Queue
+            Output (start, value) items, ending with None.
+        executor : concurrent.futures.Executor
+            The executor.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await queue_in.get()
+            if item is None:
+                await queue_out.put(None)
+                return
+            start, value = item
+            begin = time.perf_counter()
+            try:
+                value = await loop.run_in_executor(
+                    executor, function, start, value)
+            except Exception as e:
+                print(f"Window {start} {stage} failed:", e)
+                continue
+            self.timings[stage].append(time.perf_counter() - begin)
+            await queue_out.put((start, value))
+
+    async def feed(self, starts, queue, live):
+        """Put window start times into a queue
+
+        Parameters
+        ----------
+        starts : iterable of float
+            GPS start times.
+        queue : asyncio.Queue
+            The queue.
+        live : bool
+            Wait until the windows have ended before putting them.
+        """
+        for start in starts:
+            if live:
+                wait = start + self.duration - seibot.gps.get_gpstime_now()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            await queue.put((start, None))
+        await queue.put(None)
+
+    async def process_async(self, starts, callback=None, live=False):
+        """Run the pipeline
+
+        Parameters
+        ----------
+        starts : iterable of float
+            GPS start times of the windows.
+        callback : callable, optional
+            Called with each row as soon as it is evaluated.
+            Defaults None.
+        live : bool, optional
+            Wait until the windows have ended before fetching them.
+            Defaults False.
+
+        Returns
+        -------
+        rows : list of dict
+            The rows in the order of the windows.
+        """
+        queues = [asyncio.Queue(self.max_queue) for _ in range(4)]
+        fetch_executor = concurrent.futures.ThreadPoolExecutor(1)
+        executor = concurrent.futures.ThreadPoolExecutor(self.workers)
+        functions = [
+            lambda start, _: self.fetch_window(start),
+            lambda start, time_series: self.get_data(time_series),
+            self.evaluate_data,
+        ]
+        try:
+            tasks = [asyncio.ensure_future(
+                self.feed(starts, queues[0], live))]
+            for k, (stage, function) in enumerate(
+                    zip(self.stages, functions)):
+                tasks.append(asyncio.ensure_future(self.run_stage(
+                    stage, function, queues[k], queues[k+1],
+                    fetch_executor if stage == "fetch" else executor)))
+
+            rows = []
+            while True:
+                item = await queues[-1].get()
+                if item is None:
+                    break
+                _, row = item
+                rows.append(row)
+                if callback is not None:
+                    callback(row)
+            await asyncio.gather(*tasks)
+        finally:
+            fetch_executor.shutdown(wait=False)
+            executor.shutdown(wait=False)
+
+        return rows
+
+    def process(self, starts, callback=None, live=False):
+        """Run the pipeline
+
+        Parameters
+        ----------
+        starts : iterable of float
+            GPS start times of the windows.
+        callback : callable, optional
+            Called with each row as soon as it is evaluated.
+            Defaults None.
+        live : bool, optional
+            Wait until the windows have ended before fetching them.
+            Defaults False.
+
+        Returns
+        -------
+        rows : list of dict
+            The rows in the order of the windows.
+        """
+        return asyncio.run(self.process_async(starts, callback, live))
+
+    def get_live_starts(self, stride=None):
+        """Start times of consecutive windows from now on
+
+        Parameters
+        ----------
+        stride : float, optional
+            Time between the starts of consecutive windows in seconds.
+            Defaults None, which uses the window length.
+
+        Yields
+        ------
+        float
+            GPS start time.
+        """
+        if stride is None:
+            stride = self.duration
+        start = np.floor(seibot.gps.get_gpstime_now() - self.duration)
+        while True:
+            yield start
+            start += stride
+
+    def monitor(self, path, stride=None):
+        """Evaluate consecutive windows until interrupted
+
+        Parameters
+        ----------
+        path : str
+            Path of the CSV table the rows are appended to.
+        stride : float, optional
+            Time between the starts of consecutive windows in seconds.
+            Defaults None, which uses the window length.
+        """
+        writer = TableWriter(path)
+        try:
+            self.process(self.get_live_starts(stride), callback=writer.write,
+                         live=True)
+        except KeyboardInterrupt:
+            pass
+
+    def get_throughput(self):
+        """Summarize the busy time of the stages
+
+        Returns
+        -------
+        dict
+            Mean busy time (s) of each stage per window.
+        """
+        return {stage: float(np.mean(timings)) if timings else None
+                for stage, timings in self.timings.items()}
+
+
+class TableWriter:
+    """Append rows to a CSV table as they come
+
+    Parameters
+    ----------
+    path : str
+        Path of the CSV file.
+    """
+    def __init__(self, path):
+        """Constructor
+
+        Parameters
+        ----------
+        path : str
+            Path of the CSV file.
+        """
+        self.path = path
+
+    def write(self, row):
+        """Append a row
+
+        Parameters
+        ----------
+        row : dict
+            The row.
+        """
+        new = not os.path.exists(self.path)
+        with open(self.path, "a", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(row))
+            if new:
+                writer.writeheader()
+            writer.writerow(row)
+        print(f"{row['gps']}: {row['sc']}, {row['lp']}, {row['hp']}")
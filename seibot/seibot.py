@@ -3,13 +3,14 @@
 import configparser
 
 import numpy as np
-import ezca
 
+import seibot.channel
 import seibot.data
 import seibot.evaluate
 import seibot.forecast
 import seibot.filter
 import seibot.isolation_system
+import seibot.lookup
 
 
 class Seibot:
@@ -25,14 +26,29 @@ class Seibot:
     data : seibot.data.Data
     forecaster :
     """
-    def __init__(self, config):
+    def __init__(self, config, channel_access=None, progress=None,
+                 always_evaluate=False):
         """Constructor
 
         Parameters
         ----------
         config : str
             Path of the Seibot configuration file.
+        channel_access : seibot.channel.ChannelAccess, optional
+            Channel access used to read the current filter states.
+            Defaults None, which reads from ezca.
+        progress : callable, optional
+            Called with (stage, fraction) when each stage starts,
+            where stage is a description and fraction is in [0, 1].
+            Exceptions raised by it abort the construction.
+            Defaults None.
+        always_evaluate : bool, optional
+            Evaluate the filter configurations even if the lookup table
+            has a recommendation, e.g. for the GUI.
+            Defaults False.
         """
+        self.progress = progress
+        self.report_progress("Reading configuration", 0)
         self.config = configparser.ConfigParser(allow_no_value=True)
         self.config.optionxform = str
         self.config.read(config)
@@ -41,69 +57,85 @@ class Seibot:
         self.filter_file = self.config.get("Defaults", "filter_file")
 
         # time spent 200ms
+        self.report_progress("Fetching data", 0.05)
         # Fetch sensor noise and plant data from database/real-time.
         self.data = seibot.data.Data(config)
 
         # time spent 227ms
+        self.report_progress("Constructing isolation system", 0.3)
         # Construct isolation system from database
         self.isolation_system = self.get_isolation_system(self.data)
         
         # time spend 200ms ??
+        self.report_progress("Building filter pools", 0.35)
         # Fetch all available filters from foton file.
-        sc_config = self.config.get("Sensor correction filters", "config")
-        sc_inverse = self.config.get("Sensor correction filters",
-                                     "inverse_filter", fallback="none")
-        lp_config = self.config.get("Low pass filters", "config")
-        lp_inverse = self.config.get("Low pass filters",
-                                     "inverse_filter", fallback="none")
-        hp_config = self.config.get("High pass filters", "config")
-        hp_inverse = self.config.get("High pass filters",
-                                     "inverse_filter", fallback="none")
-        
-        # time spend 211ms
-        inverse_filters = seibot.filter.InverseFilters()
-        sc_inverse_filter = getattr(inverse_filters, sc_inverse)
-        lp_inverse_filter = getattr(inverse_filters, lp_inverse)
-        hp_inverse_filter = getattr(inverse_filters, hp_inverse)
-
-
-        f = self.data.f
         # time spend 1.43s (small bottleneck here)
         # New time spent 702ms
-        sc_pool = seibot.filter.FilterPool(f, sc_config, sc_inverse_filter)
-        lp_pool = seibot.filter.FilterPool(f, lp_config, lp_inverse_filter)
-        hp_pool = seibot.filter.FilterPool(f, hp_config, hp_inverse_filter)
-
-        # time spend 707ms
-        self.filter_configurations = seibot.filter.FilterConfigurations(
-            sc_pool=sc_pool,
-            lp_pool=lp_pool,
-            hp_pool=hp_pool)
+        self.filter_configurations = self.get_filter_configurations(
+            self.data.f)
 
         # time spend 714ms
         self.isolation_system = self.get_isolation_system(self.data)
 
         # time spend 717ms
         self.criterion = self.config.get("Evaluate", "criterion")
-        seismic_noise = self.data.seismic_noise
 
-        # time spend 17s
-        # Total times spent 3.25s.
-        self.evaluate = seibot.evaluate.Evaluate(
-            self.isolation_system, self.filter_configurations,
-            f, seismic_noise)
-        self.evaluate_method = getattr(self.evaluate, self.criterion)
-        
+        # Precomputed recommendations of recurring seismic states.
+        # The filter configurations are only evaluated if the seismic
+        # noise is not close to any of its states.
+        self.lookup_table = None
+        self.recommendation = None
+        table = self.config.get("Lookup", "table", fallback=None)
+        if table is not None:
+            self.lookup_table = seibot.lookup.RecommendationTable.load(table)
+            try:
+                if self.criterion not in seibot.lookup.quantities:
+                    raise ValueError(f"Criterion {self.criterion} cannot "
+                                     "be looked up.")
+                self.lookup_table.check(
+                    self.filter_configurations, self.data.f,
+                    seibot.lookup.quantities[self.criterion])
+            except ValueError as e:
+                print("Lookup table not used:", e)
+                self.lookup_table = None
+        if self.lookup_table is not None:
+            max_distance = self.config.getfloat(
+                "Lookup", "max_distance", fallback=None)
+            if max_distance is not None:
+                self.lookup_table.max_distance = max_distance
+            self.recommendation = self.lookup_table.recommend(
+                self.data.seismic_noise)
+
+        self._evaluate = None
+        if self.recommendation is None or always_evaluate:
+            # time spend 17s
+            self.report_progress("Evaluating filter configurations", 0.6)
+            # Total times spent 3.25s.
+            self._evaluate = self.get_evaluate()
 
         # Get current filters
-        self.ezca = ezca.Ezca(prefix="", ifo="")
+        self.report_progress("Reading current filters", 0.9)
+        if channel_access is None:
+            timeout = self.config.getfloat(
+                "Channel access", "timeout", fallback=5)
+            try:
+                channel_access = seibot.channel.ChannelAccess(timeout=timeout)
+            except seibot.channel.ChannelAccessError as e:
+                print("Ezca error", e)
+        self.channel_access = channel_access
 
-        ## Find currently used channel number
-        sc_cur_chan = self.config.get("Sensor correction channels", "cur_chan")
-        blend_cur_chan = self.config.get("Blend channels", "cur_chan")
         try:
-            sc_cur = int(self.ezca.read(sc_cur_chan))
-            blend_cur = int(self.ezca.read(blend_cur_chan))
+            if self.channel_access is None:
+                raise seibot.channel.ChannelAccessError(
+                    "No channel access available.")
+
+            ## Find currently used channel number
+            sc_cur_chan = self.config.get(
+                "Sensor correction channels", "cur_chan")
+            blend_cur_chan = self.config.get("Blend channels", "cur_chan")
+            cur = self.channel_access.read([sc_cur_chan, blend_cur_chan])
+            sc_cur = int(cur[sc_cur_chan])
+            blend_cur = int(cur[blend_cur_chan])
 
             ## Check number
             if sc_cur > 4:
@@ -131,25 +163,194 @@ class Seibot:
             lp_chan = blend_chan + lp_suffix
             hp_chan = blend_chan + hp_suffix 
 
+            # Read all switch states in one batch.
+            swstat_masks = self.channel_access.get_swstat_masks(
+                [sc_chan, lp_chan, hp_chan])
+
             # Get filter instances
+            sc_inverse_filter = self.get_inverse_filter(
+                "Sensor correction filters")
+            lp_inverse_filter = self.get_inverse_filter("Low pass filters")
+            hp_inverse_filter = self.get_inverse_filter("High pass filters")
             current_sc = self.get_current_filter(
                 filter_chan=sc_chan, filter_file=self.filter_file,
-                inverse_filter=sc_inverse_filter)
+                inverse_filter=sc_inverse_filter,
+                swstat_mask=swstat_masks[sc_chan])
             current_lp = self.get_current_filter(
                 filter_chan=lp_chan, filter_file=self.filter_file,
-                inverse_filter=lp_inverse_filter)
+                inverse_filter=lp_inverse_filter,
+                swstat_mask=swstat_masks[lp_chan])
             current_hp = self.get_current_filter(
                 filter_chan=hp_chan, filter_file=self.filter_file,
-                inverse_filter=hp_inverse_filter)
+                inverse_filter=hp_inverse_filter,
+                swstat_mask=swstat_masks[hp_chan])
 
             # Make current filters
             self.current_filters = seibot.filter.FilterConfiguration(
                 sc=current_sc, lp=current_lp, hp=current_hp)
-        except ezca.errors.EzcaConnectError as e:
+        except seibot.channel.ChannelAccessError as e:
             print("Ezca error", e)
             self.current_filters = None
+
+        self.report_progress("Done", 1)
+
+    def report_progress(self, stage, fraction):
+        """Report construction progress
+        
+        Parameters
+        ----------
+        stage : str
+            Description of the stage.
+        fraction : float
+            Fraction of the construction done.
+        """
+        if self.progress is not None:
+            self.progress(stage, fraction)
+        
+    @property
+    def evaluate(self):
+        """Evaluation of the filter configurations, built on first use"""
+        if self._evaluate is None:
+            self._evaluate = self.get_evaluate()
+        return self._evaluate
+
+    def get_evaluate(self):
+        """Evaluate the filter configurations
+
+        Returns
+        -------
+        seibot.evaluate.Evaluate
+            The evaluation of the seismic noise.
+        """
+        return seibot.evaluate.Evaluate(
+            self.isolation_system, self.filter_configurations,
+            self.data.f, self.data.seismic_noise,
+            **self.get_evaluate_options())
+
+    @property
+    def evaluate_method(self):
+        """The evaluation method of the criterion"""
+        return getattr(self.evaluate, self.criterion)
+
+    def get_inverse_filter(self, section):
+        """Get the inverse filter of a filter pool section
+
+        Parameters
+        ----------
+        section : str
+            The configuration section of the pool.
+
+        Returns
+        -------
+        TransferFunction
+            The inverse filter named by the `inverse_filter` option.
+        """
+        inverse = self.config.get(section, "inverse_filter", fallback="none")
+        return seibot.filter.registry.get_inverse_filter(inverse)
+
+    def get_filter_configurations(self, f):
+        """Build the filter pools and their configurations
+
+        Parameters
+        ----------
+        f : array
+            Frequency array.
+
+        Returns
+        -------
+        seibot.filter.FilterConfigurations
+            The filter configurations.
+        """
+        pools = []
+        for section in [
+                "Sensor correction filters", "Low pass filters",
+                "High pass filters"]:
+            pools.append(self.get_filter_pool(
+                section, f, self.config.get(section, "config"),
+                self.get_inverse_filter(section)))
+        sc_pool, lp_pool, hp_pool = pools
+
+        filter_configurations = seibot.filter.FilterConfigurations(
+            sc_pool=sc_pool,
+            lp_pool=lp_pool,
+            hp_pool=hp_pool)
+
+        return filter_configurations
+
+    def get_filter_pool(self, section, f, filter_config, inverse_filter):
+        """Get a filter pool of the type set in a section
+
+        Parameters
+        ----------
+        section : str
+            The configuration section of the pool.
+            The `type` option is "list" (default) for a `FilterPool`
+            or "combinatorial" for a `CombinatorialPool`.
+        f : array
+            Frequency array.
+        filter_config : str
+            Path of the filter pool configuration.
+        inverse_filter : TransferFunction
+            Inverse filter embedded in the filters.
+
+        Returns
+        -------
+        seibot.filter.FilterPool or seibot.filter.CombinatorialPool
+            The filter pool.
+        """
+        pool_type = self.config.get(section, "type", fallback="list")
+        if pool_type == "list":
+            return seibot.filter.FilterPool(f, filter_config, inverse_filter)
+        elif pool_type == "combinatorial":
+            return seibot.filter.CombinatorialPool(
+                f, filter_config, inverse_filter)
+        raise ValueError(f"Pool type {pool_type} in [{section}] is not "
+                         "supported. Choose from list or combinatorial.")
+
+    def get_bands(self):
+        """Get the frequency bands of the performance table
         
-    def get_isolation_system(self, data):
+        Bands are read from the `bands` option of the `Performance` section,
+        as comma-separated pairs of lower and upper frequencies in Hz,
+        e.g. "0.03 0.1, 0.1 0.3".
+
+        Returns
+        -------
+        bands : list of (float, float) or None
+            The frequency bands.
+            None if not configured.
+        """
+        bands = self.config.get("Performance", "bands", fallback=None)
+        if bands is None:
+            return None
+        bands_list = []
+        for band in bands.split(","):
+            f_lower, f_upper = [float(f) for f in band.split()]
+            if f_lower >= f_upper:
+                raise ValueError(f"Invalid frequency band: {band.strip()}")
+            bands_list.append((f_lower, f_upper))
+
+        return bands_list
+
+    def get_evaluate_options(self):
+        """Get the keyword arguments of Evaluate from the configuration
+
+        Returns
+        -------
+        dict
+            The `bands`, `adaptive`, `coarse_step` and `rtol` arguments.
+        """
+        return {
+            "bands": self.get_bands(),
+            "adaptive": self.config.getboolean(
+                "Evaluate", "adaptive", fallback=False),
+            "coarse_step": self.config.getint(
+                "Evaluate", "coarse_step", fallback=8),
+            "rtol": self.config.getfloat("Evaluate", "rtol", fallback=1e-3),
+        }
+
+    @staticmethod
+    def get_isolation_system(data):
         """Construct an isolation system instance from a data instance
         
         Parameters
@@ -172,15 +373,24 @@ class Seibot:
         transmissivity = seibot.isolation_system.Process(data.transmissivity)
         controller = seibot.isolation_system.Process(data.controller)
 
-        oltf = data.plant * data.controller
-        sensitivity = seibot.isolation_system.Process(1/(1+oltf))
-        complement = seibot.isolation_system.Process(oltf/(1+oltf))
-
-        plant.mag = abs(plant(1j*2*np.pi*data.f))
-        transmissivity.mag = abs(transmissivity(1j*2*np.pi*data.f))
-        controller.mag = abs(controller(1j*2*np.pi*data.f))
-        sensitivity.mag = abs(sensitivity(1j*2*np.pi*data.f))
-        complement.mag = abs(complement(1j*2*np.pi*data.f))
+        s = 1j*2*np.pi*data.f
+        plant_response = plant(s)
+        plant.mag = abs(plant_response)
+        transmissivity.mag = abs(transmissivity(s))
+
+        # Closed-loop responses are formed from the frequency responses.
+        # Forming them with TransferFunction algebra is slow and
+        # ill-conditioned for high-order controllers.
+        controller_response = controller(s)
+        controller.mag = abs(controller_response)
+        oltf_response = plant_response * controller_response
+        sensitivity = seibot.isolation_system.FrequencyResponse(
+            data.f, 1/(1+oltf_response),
+            get_tf=lambda: 1/(1+data.plant*data.controller))
+        complement = seibot.isolation_system.FrequencyResponse(
+            data.f, oltf_response/(1+oltf_response),
+            get_tf=lambda: (data.plant*data.controller
+                            / (1+data.plant*data.controller)))
         
         isolation_system = seibot.isolation_system.IsolationSystem(
             relative_sensor=relative_sensor,
@@ -197,6 +407,9 @@ class Seibot:
     
     def get_best_filters(self):
         """Get best filters
+
+        The lookup table is used if configured and the seismic noise is
+        close to one of its states, otherwise the criterion is evaluated.
         
         Returns
         -------
@@ -204,6 +417,8 @@ class Seibot:
             Dictionary with keys
             ["sensor correction filter", "low pass filter", "high pass filter"]
         """
+        if self.recommendation is not None:
+            return self.filter_configurations(*self.recommendation)
         best_filters = self.evaluate_method()
         return best_filters
 
@@ -219,7 +434,7 @@ class Seibot:
         best_filters.export(path)
 
     def get_current_filter(
-            self, filter_chan, filter_file, inverse_filter):
+            self, filter_chan, filter_file, inverse_filter, swstat_mask=None):
         """Get a filter from engaged FMs.
         
         Parameters
@@ -230,6 +445,9 @@ class Seibot:
             Path to Foton filter file.
         inverse filter : TransferFunction
             Inverse filter embedded in filter.
+        swstat_mask : list of str, optional
+            Switch status mask of the filter module.
+            Defaults None, which reads it from the channel access.
 
         Returns
         -------
@@ -237,7 +455,9 @@ class Seibot:
             Filter.
         """
         # Find engaged FMs
-        swstat_mask = self.ezca.LIGOFilter(filter_chan).get_current_swstat_mask() 
+        if swstat_mask is None:
+            swstat_mask = self.channel_access.get_swstat_masks(
+                [filter_chan])[filter_chan]
         fm = []
         for string in swstat_mask:
             if "FM" in string:
@@ -246,7 +466,8 @@ class Seibot:
         # Find Module
         module = filter_chan.lstrip("L1:ISI-")
 
-        filter_ = seibot.filter.Filter(
+        # Shared with the pool entry if the filter is in a pool.
+        filter_ = seibot.filter.registry.get_filter(
             filter_file=filter_file,
             module=module,
             fm=fm,
@@ -0,0 +1,374 @@
+"""Local recommendation service
+
+A long-lived Seibot answers JSON queries over HTTP.
+Answers are computed once per data refresh and served from a bounded
+cache keyed by the parsed query parameters.
+
+Endpoints
+---------
+/recommendation
+    The recommended configuration and its RMS values.
+/top?k=5&quantity=displacement
+    The k configurations with the lowest RMS.
+/band_rms?i=0&j=0&quantity=displacement
+    Overall and band-limited RMS values of a configuration.
+    Defaults to the recommended configuration.
+/spectra?i=0&j=0
+    The seismic noise and the displacement of a configuration.
+    Defaults to the recommended configuration.
+/status
+    Freshness of the results.
+
+All responses contain the `version` and the `updated` time of the
+results they are computed from.
+"""
+import collections
+import http.server
+import json
+import threading
+import time
+import urllib.parse
+
+import numpy as np
+
+import seibot.filter
+import seibot.seibot
+
+
+# Results of a refresh, answers are computed from one snapshot.
+Results = collections.namedtuple(
+    "Results", ["bot", "best", "version", "updated"])
+
+
+def get_quantity(quantity):
+    """Parse a quantity query parameter"""
+    if quantity not in ["displacement", "velocity"]:
+        raise ValueError(f"Quantity {quantity} is not supported. "
+                         "Choose from displacement or velocity.")
+    return quantity
+
+
+class RecommendationService:
+    """Recommendation service wrapping a long-lived Seibot
+
+    Parameters
+    ----------
+    config : str
+        Path of the Seibot configuration file.
+    interval : float, optional
+        Rerun Seibot every interval seconds.
+        Defaults None, which runs it once.
+    max_responses : int, optional
+        Number of cached answers.
+        Defaults 256.
+    """
+    def __init__(self, config, interval=None, max_responses=256):
+        """Constructor
+
+        Parameters
+        ----------
+        config : str
+            Path of the Seibot configuration file.
+        interval : float, optional
+            Rerun Seibot every interval seconds.
+            Defaults None, which runs it once.
+        max_responses : int, optional
+            Number of cached answers.
+            Defaults 256.
+        """
+        self.config = config
+        self.interval = interval
+        self.max_responses = max_responses
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.results = None
+        self.refresh()
+
+    def refresh(self):
+        """Rerun Seibot and drop the cached answers"""
+        bot = seibot.seibot.Seibot(self.config)
+        best = bot.get_best_filters()
+        with self.lock:
+            version = 1 if self.results is None else self.results.version+1
+            self.results = Results(
+                bot=bot, best=tuple(int(k) for k in best.indices),
+                version=version, updated=time.time())
+            # Least recently used answers first.
+            self.responses = collections.OrderedDict()
+
+        # Warm up the cache.
+        for path in ["/recommendation", "/top", "/band_rms", "/spectra"]:
+            self.handle(path, "")
+
+    def run_refresh(self):
+        """Refresh every interval until stopped"""
+        while not self.stopped.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the previous results.
+                print("Refresh error", e)
+
+    def get_freshness(self, results):
+        """Freshness of the results
+
+        Parameters
+        ----------
+        results : Results
+            The results.
+
+        Returns
+        -------
+        dict
+            The `version`, `updated` time and refresh `interval`.
+        """
+        return {
+            "version": results.version,
+            "updated": results.updated,
+            "interval": self.interval,
+        }
+
+    def get_configuration(self, results, i, j):
+        """Describe a configuration
+
+        Parameters
+        ----------
+        results : Results
+            The results.
+        i : int
+            Sensor correction index.
+        j : int
+            Complementary filter index.
+
+        Returns
+        -------
+        dict
+            The indices and filter labels.
+        """
+        filter_configurations = results.bot.filter_configurations
+        return {
+            "i": int(i),
+            "j": int(j),
+            "sc": seibot.filter.get_label(filter_configurations.sc_pool[i]),
+            "lp": seibot.filter.get_label(filter_configurations.lp_pool[j]),
+            "hp": seibot.filter.get_label(filter_configurations.hp_pool[j]),
+        }
+
+    def get_index(self, results, i=None, j=None):
+        """Get the configuration indices of a query
+
+        Parameters
+        ----------
+        results : Results
+            The results.
+        i : int, optional
+            Sensor correction index.
+            Defaults None, which uses the recommended one.
+        j : int, optional
+            Complementary filter index.
+            Defaults None, which uses the recommended one.
+
+        Returns
+        -------
+        i : int
+            Sensor correction index.
+        j : int
+            Complementary filter index.
+        """
+        best_i, best_j = results.best
+        i = best_i if i is None else i
+        j = best_j if j is None else j
+        evaluate = results.bot.evaluate
+        if not (0 <= i < evaluate.n_sc and 0 <= j < evaluate.n_blend):
+            raise ValueError(f"Configuration ({i}, {j}) out of range.")
+        return i, j
+
+    def get_recommendation(self, results):
+        """The recommended configuration and its RMS values"""
+        i, j = results.best
+        answer = self.get_configuration(results, i, j)
+        answer.update(self.get_band_rms(results, i, j))
+        return answer
+
+    def get_top(self, results, k=5, quantity="displacement"):
+        """The k configurations with the lowest RMS"""
+        rms = results.bot.evaluate.get_rms_matrix(quantity=quantity) * 1e9
+        k = max(min(k, rms.size), 0)
+        flat = rms.ravel()
+        top = np.argpartition(flat, k-1)[:k] if k else np.array([], int)
+        top = top[np.argsort(flat[top])]
+        configurations = []
+        for index in top:
+            i, j = np.unravel_index(index, rms.shape)
+            configuration = self.get_configuration(results, i, j)
+            configuration["rms"] = float(flat[index])
+            configurations.append(configuration)
+        return {"quantity": quantity, "configurations": configurations}
+
+    def get_band_rms(self, results, i, j):
+        """Overall and band-limited RMS values of a configuration"""
+        evaluate = results.bot.evaluate
+        displacement = evaluate.get_displacement(i, j)
+        answer = {"i": i, "j": j, "bands": evaluate.bands}
+        for quantity in ["displacement", "velocity"]:
+            band_rms = evaluate.get_band_rms(displacement, quantity) * 1e9
+            answer[f"rms_{quantity}"] = float(band_rms[0])
+            answer[f"band_rms_{quantity}"] = band_rms[1:].tolist()
+        return answer
+
+    def get_spectra(self, results, i, j):
+        """The seismic noise and the displacement of a configuration"""
+        evaluate = results.bot.evaluate
+        return {
+            "i": i,
+            "j": j,
+            "f": evaluate.f.tolist(),
+            "seismic_noise": np.asarray(evaluate.seismic_noise).tolist(),
+            "displacement": evaluate.get_displacement(i, j).tolist(),
+        }
+
+    def get_status(self, results):
+        """Freshness of the results"""
+        return {"config": self.config}
+
+    @property
+    def endpoints(self):
+        """Answer methods and parsers of their query parameters
+
+        Keyed by path.
+        Configuration indices "i" and "j" default to the recommendation.
+        """
+        return {
+            "/recommendation": (self.get_recommendation, {}),
+            "/top": (self.get_top, {"k": int, "quantity": get_quantity}),
+            "/band_rms": (self.get_band_rms, {"i": int, "j": int}),
+            "/spectra": (self.get_spectra, {"i": int, "j": int}),
+            "/status": (self.get_status, {}),
+        }
+
+    def parse_query(self, results, parameters, query):
+        """Parse the known parameters of a query
+
+        Unknown parameters are ignored.
+
+        Parameters
+        ----------
+        results : Results
+            The results.
+        parameters : dict
+            Parsers of the parameters keyed by name.
+        query : str
+            The query string.
+
+        Returns
+        -------
+        dict
+            The parsed parameters.
+        """
+        query = urllib.parse.parse_qs(query)
+        arguments = {
+            name: parse(query[name][0])
+            for name, parse in parameters.items() if name in query}
+        if "i" in parameters:
+            arguments["i"], arguments["j"] = self.get_index(
+                results, arguments.get("i"), arguments.get("j"))
+        return arguments
+
+    def handle(self, path, query):
+        """Answer a query
+
+        Answers are cached by path and parsed parameters.
+
+        Parameters
+        ----------
+        path : str
+            The endpoint.
+        query : str
+            The query string.
+
+        Returns
+        -------
+        status : int
+            The HTTP status code.
+        body : bytes
+            The JSON answer.
+        """
+        endpoint = self.endpoints.get(path)
+        if endpoint is None:
+            return 404, json.dumps({"error": f"Unknown path {path}"}).encode()
+        method, parameters = endpoint
+
+        # Answers are computed from one snapshot of the results,
+        # a refresh may replace them meanwhile.
+        with self.lock:
+            results = self.results
+        try:
+            arguments = self.parse_query(results, parameters, query)
+        except ValueError as e:
+            return 400, json.dumps({"error": str(e)}).encode()
+
+        key = (path, tuple(sorted(arguments.items())))
+        with self.lock:
+            if results is self.results and key in self.responses:
+                self.responses.move_to_end(key)
+                return self.responses[key]
+
+        try:
+            answer = method(results, **arguments)
+        except (ValueError, IndexError) as e:
+            return 400, json.dumps({"error": str(e)}).encode()
+
+        answer.update(self.get_freshness(results))
+        response = 200, json.dumps(answer).encode()
+        # Only cache answers of the results they were computed from.
+        with self.lock:
+            if results is self.results:
+                self.responses[key] = response
+                while len(self.responses) > self.max_responses:
+                    self.responses.popitem(last=False)
+        return response
+
+    def serve(self, host="127.0.0.1", port=8080):
+        """Serve until interrupted
+
+        Parameters
+        ----------
+        host : str, optional
+            Host address.
+            Defaults "127.0.0.1".
+        port : int, optional
+            Port.
+            Defaults 8080.
+        """
+        server = http.server.ThreadingHTTPServer((host, port), RequestHandler)
+        server.service = self
+        if self.interval is not None:
+            threading.Thread(target=self.run_refresh, daemon=True).start()
+        print(f"Serving on http://{host}:{server.server_address[1]}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stopped.set()
+            server.server_close()
+
+
+class RequestHandler(http.server.BaseHTTPRequestHandler):
+    """Request handler of RecommendationService"""
+    def do_GET(self):
+        """Answer a GET request"""
+        service = self.server.service
+        url = urllib.parse.urlsplit(self.path)
+        status, body = service.handle(url.path, url.query)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header(
+            "Age", str(int(time.time()-service.results.updated)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Do not log every request"""
+        pass
@@ -0,0 +1,509 @@
+"""Shared-memory publication of Seibot results
+
+A producer publishes the frequency array, the noise spectra, the
+magnitude responses of the isolation system and the filter pools and the
+displacement matrix into shared memory.
+Clients on the same machine map them read-only, at the OS level,
+without copying or recomputing.
+
+The arrays of a publication are stored in one data block and described
+by a JSON manifest in a fixed-size manifest block named after the
+publication.
+Each publication writes a new data block, so attached clients keep
+a consistent view until they attach again.
+"""
+import configparser
+import json
+import mmap
+import multiprocessing.shared_memory
+import os
+import time
+import types
+
+import numpy as np
+
+import seibot.evaluate
+import seibot.isolation_system
+import seibot.seibot
+
+
+# Offsets of the arrays in the data block are aligned to this many bytes.
+alignment = 64
+
+# Directory of the POSIX shared memory blocks.
+shm_directory = "/dev/shm"
+
+
+def get_seibot_arrays(bot):
+    """Get the arrays of a Seibot instance to publish
+
+    Parameters
+    ----------
+    bot : seibot.seibot.Seibot
+        The Seibot instance.
+
+    Returns
+    -------
+    arrays : dict
+        The arrays keyed by name.
+    """
+    sc, sc_comp, lp, hp = bot.filter_configurations.get_magnitude_matrices()
+    isolation_system = bot.isolation_system
+    arrays = {
+        "f": bot.data.f,
+        "seismic_noise": bot.data.seismic_noise,
+        "seismometer_noise": bot.data.seismometer_noise,
+        "inertial_sensor_noise": bot.data.inertial_sensor_noise,
+        "relative_sensor_noise": bot.data.relative_sensor_noise,
+        "transmissivity": isolation_system.transmissivity.mag,
+        "sensitivity": isolation_system.sensitivity.mag,
+        "complement": isolation_system.complement.mag,
+        "sc": sc,
+        "sc_comp": sc_comp,
+        "lp": lp,
+        "hp": hp,
+        "displacement_matrix": bot.evaluate.displacement_matrix,
+    }
+    if bot.data.witness_sensor is not None:
+        arrays["witness_sensor"] = bot.data.witness_sensor
+    return arrays
+
+
+def publish_seibot(config, name, interval=None):
+    """Run Seibot and publish its arrays until interrupted
+
+    Parameters
+    ----------
+    config : str
+        Path of the Seibot configuration file.
+    name : str
+        Name of the publication.
+    interval : float, optional
+        Rerun Seibot every interval seconds.
+        Defaults None, which publishes once.
+    """
+    with Publisher(name) as publisher:
+        try:
+            while True:
+                bot = seibot.seibot.Seibot(config)
+                best = bot.get_best_filters()
+                publisher.publish(
+                    get_seibot_arrays(bot),
+                    metadata={"config": os.path.abspath(config),
+                              "best": [int(k) for k in best.indices]})
+                print(f"Published {name} version {publisher.version}")
+                if interval is None:
+                    while True:
+                        time.sleep(3600)
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+
+class Publisher:
+    """Publish arrays into shared memory
+
+    Parameters
+    ----------
+    name : str
+        Name of the publication.
+    manifest_size : int, optional
+        Size of the manifest block in bytes.
+        Defaults 65536.
+    """
+    def __init__(self, name, manifest_size=65536):
+        """Constructor
+
+        Parameters
+        ----------
+        name : str
+            Name of the publication.
+        manifest_size : int, optional
+            Size of the manifest block in bytes.
+            Defaults 65536.
+        """
+        self.name = name
+        self.block = None
+        self.version = 0
+        try:
+            self.manifest = multiprocessing.shared_memory.SharedMemory(
+                name=name, create=True, size=manifest_size)
+        except FileExistsError:
+            # Left behind by a producer that did not close, take it over.
+            self.manifest = multiprocessing.shared_memory.SharedMemory(
+                name=name)
+            manifest = Subscriber(name).read_manifest()
+            if manifest is not None:
+                self.version = manifest["version"]
+                try:
+                    self.block = multiprocessing.shared_memory.SharedMemory(
+                        name=manifest["block"])
+                except FileNotFoundError:
+                    pass
+        else:
+            self.manifest.buf[:5] = b"null\0"
+
+    def publish(self, arrays, metadata=None):
+        """Publish arrays
+
+        Parameters
+        ----------
+        arrays : dict
+            Arrays keyed by name.
+        metadata : dict, optional
+            JSON-serializable metadata of the publication.
+            Defaults None.
+        """
+        layout = {}
+        offset = 0
+        arrays = {key: np.ascontiguousarray(array)
+                  for key, array in arrays.items()}
+        for key, array in arrays.items():
+            layout[key] = {
+                "offset": offset,
+                "shape": array.shape,
+                "dtype": array.dtype.str,
+            }
+            offset += -(-array.nbytes // alignment) * alignment
+
+        self.version += 1
+        block = multiprocessing.shared_memory.SharedMemory(
+            name=f"{self.name}_{self.version}", create=True,
+            size=max(offset, 1))
+        for key, array in arrays.items():
+            view = np.ndarray(
+                array.shape, dtype=array.dtype, buffer=block.buf,
+                offset=layout[key]["offset"])
+            view[...] = array
+
+        manifest = json.dumps({
+            "block": block.name,
+            "version": self.version,
+            "time": time.time(),
+            "arrays": layout,
+            "metadata": metadata or {},
+        }).encode()
+        if len(manifest) >= self.manifest.size:
+            block.close()
+            block.unlink()
+            raise ValueError(f"Manifest of {len(manifest)} bytes does not "
+                             f"fit in {self.manifest.size} bytes.")
+        self.manifest.buf[:len(manifest)+1] = manifest + b"\0"
+
+        # Attached clients keep their mapping of the previous block.
+        if self.block is not None:
+            self.block.close()
+            self.block.unlink()
+        self.block = block
+
+    def close(self):
+        """Remove the publication"""
+        for shared_memory in [self.block, self.manifest]:
+            if shared_memory is not None:
+                shared_memory.close()
+                shared_memory.unlink()
+        self.block = None
+        self.manifest = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class Subscriber:
+    """Attach to arrays published into shared memory
+
+    Parameters
+    ----------
+    name : str
+        Name of the publication.
+    """
+    def __init__(self, name):
+        """Constructor
+
+        Parameters
+        ----------
+        name : str
+            Name of the publication.
+        """
+        self.name = name
+        self.block = None
+        self.detached = []
+        self.arrays = {}
+        self.metadata = {}
+        self.version = None
+        self.time = None
+
+    def read_manifest(self):
+        """Read the manifest of the publication
+
+        Returns
+        -------
+        manifest : dict or None
+            The manifest.
+            None if nothing is published yet.
+        """
+        shared_memory = attach(self.name)
+        try:
+            # Retry if read while the producer is writing.
+            for _ in range(10):
+                raw = bytes(shared_memory.buf).split(b"\0", 1)[0]
+                try:
+                    return json.loads(raw.decode())
+                except ValueError:
+                    time.sleep(1e-3)
+        finally:
+            shared_memory.close()
+        raise ValueError(f"Cannot read the manifest of {self.name}.")
+
+    def attach(self):
+        """Attach to the latest publication
+
+        Returns
+        -------
+        arrays : dict
+            Read-only arrays keyed by name, backed by the shared memory.
+        """
+        # The producer unlinks the previous block right after rewriting
+        # the manifest, so a manifest read just before may name a block
+        # that is gone.
+        for _ in range(10):
+            manifest = self.read_manifest()
+            if manifest is None:
+                raise ValueError(f"Nothing is published in {self.name} yet.")
+            if manifest["version"] == self.version:
+                return self.arrays
+            try:
+                block = attach(manifest["block"])
+                break
+            except FileNotFoundError:
+                time.sleep(1e-3)
+        else:
+            raise ValueError(f"Cannot attach to {self.name}, "
+                             "the publications change too fast.")
+
+        arrays = {}
+        for key, layout in manifest["arrays"].items():
+            # frombuffer holds the buffer, so the block cannot be
+            # unmapped while the array is in use.
+            # The mapping is read-only, so the flag cannot be set back.
+            dtype = np.dtype(layout["dtype"])
+            shape = tuple(layout["shape"])
+            array = np.frombuffer(
+                block.buf, dtype=dtype, count=int(np.prod(shape)),
+                offset=layout["offset"]).reshape(shape)
+            array.flags.writeable = False
+            arrays[key] = array
+
+        self.detach()
+        self.block = block
+        self.arrays = arrays
+        self.metadata = manifest["metadata"]
+        self.version = manifest["version"]
+        self.time = manifest["time"]
+
+        return self.arrays
+
+    def is_stale(self):
+        """Whether a newer publication is available"""
+        manifest = self.read_manifest()
+        return manifest is not None and manifest["version"] != self.version
+
+    def detach(self):
+        """Detach from the publication
+
+        Blocks still referred to by arrays are unmapped
+        by a later call once the arrays are released.
+        """
+        self.arrays = {}
+        if self.block is not None:
+            self.detached.append(self.block)
+            self.block = None
+        self.version = None
+
+        # Blocks are unmapped once no array refers to them.
+        detached = []
+        for block in self.detached:
+            try:
+                block.close()
+            except BufferError:
+                detached.append(block)
+        self.detached = detached
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.detach()
+
+
+class SharedSeibot(seibot.seibot.Seibot):
+    """Seibot attached to a publication
+
+    The noise spectra, the magnitude responses of the isolation system
+    and the displacement matrix are the published arrays,
+    so nothing is fetched or evaluated.
+    Only the filter pools are built from the published configuration,
+    which must not have changed since.
+    The current filters are not read.
+
+    Parameters
+    ----------
+    name : str
+        Name of the publication.
+    progress : callable, optional
+        Called with (stage, fraction) when each stage starts.
+        Defaults None.
+    """
+    def __init__(self, name, progress=None):
+        """Constructor
+
+        Parameters
+        ----------
+        name : str
+            Name of the publication.
+        progress : callable, optional
+            Called with (stage, fraction) when each stage starts.
+            Defaults None.
+        """
+        self.progress = progress
+        self.report_progress("Attaching", 0)
+        # Keeps the block mapped while the arrays are in use.
+        self.subscriber = Subscriber(name)
+        arrays = self.subscriber.attach()
+        config = self.subscriber.metadata["config"]
+
+        self.report_progress("Reading configuration", 0.1)
+        self.config = configparser.ConfigParser(allow_no_value=True)
+        self.config.optionxform = str
+        self.config.read(config)
+        self.filter_file = self.config.get("Defaults", "filter_file")
+        self.criterion = self.config.get("Evaluate", "criterion")
+
+        self.data = types.SimpleNamespace(
+            f=arrays["f"],
+            seismic_noise=arrays["seismic_noise"],
+            seismometer_noise=arrays["seismometer_noise"],
+            inertial_sensor_noise=arrays["inertial_sensor_noise"],
+            relative_sensor_noise=arrays["relative_sensor_noise"],
+            witness_sensor=arrays.get("witness_sensor"))
+        self.isolation_system = self.get_shared_isolation_system(arrays)
+
+        self.report_progress("Building filter pools", 0.2)
+        self.filter_configurations = self.get_filter_configurations(
+            self.data.f)
+        published = [arrays[key] for key in ["sc", "sc_comp", "lp", "hp"]]
+        built = self.filter_configurations.get_magnitude_matrices()
+        if any(a.shape != b.shape or not np.allclose(a, b)
+               for a, b in zip(published, built)):
+            raise ValueError(f"The filter pools of {config} changed since "
+                             f"version {self.subscriber.version} of {name} "
+                             "was published.")
+
+        self.lookup_table = None
+        self.recommendation = None
+        self._evaluate = seibot.evaluate.Evaluate(
+            self.isolation_system, self.filter_configurations,
+            self.data.f, self.data.seismic_noise,
+            displacement_matrix=arrays["displacement_matrix"],
+            **self.get_evaluate_options())
+        self.channel_access = None
+        self.current_filters = None
+
+        self.report_progress("Done", 1)
+
+    @staticmethod
+    def get_shared_isolation_system(arrays):
+        """Isolation system of the published magnitude responses
+
+        Parameters
+        ----------
+        arrays : dict
+            The published arrays.
+
+        Returns
+        -------
+        seibot.isolation_system.IsolationSystem
+            The isolation system.
+            Only the magnitude responses of its processes are available.
+        """
+        f = arrays["f"]
+        Sensor = seibot.isolation_system.Sensor
+        FrequencyResponse = seibot.isolation_system.FrequencyResponse
+        return seibot.isolation_system.IsolationSystem(
+            relative_sensor=Sensor(f, arrays["relative_sensor_noise"]),
+            inertial_sensor=Sensor(f, arrays["inertial_sensor_noise"]),
+            seismometer=Sensor(f, arrays["seismometer_noise"]),
+            plant=None,
+            transmissivity=FrequencyResponse(f, arrays["transmissivity"]),
+            controller=None,
+            sensitivity=FrequencyResponse(f, arrays["sensitivity"]),
+            complement=FrequencyResponse(f, arrays["complement"]),
+        )
+
+
+class ReadOnlyBlock:
+    """Read-only mapping of a shared memory block
+
+    Unlike `multiprocessing.shared_memory.SharedMemory`, the block is
+    mapped without write access, so it cannot be modified through
+    the mapping, and it is not tracked, so that it is not removed when
+    the attaching process exits.
+
+    Parameters
+    ----------
+    name : str
+        Name of the block.
+    """
+    def __init__(self, name):
+        """Constructor
+
+        Parameters
+        ----------
+        name : str
+            Name of the block.
+        """
+        self.name = name
+        fd = os.open(os.path.join(shm_directory, name), os.O_RDONLY)
+        try:
+            self.size = os.fstat(fd).st_size
+            self.mmap = mmap.mmap(fd, self.size, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        self.buf = memoryview(self.mmap)
+
+    def close(self):
+        """Unmap the block
+
+        Raises
+        ------
+        BufferError
+            If arrays still refer to the block.
+        """
+        if self.buf is not None:
+            self.buf.release()
+            self.buf = None
+        self.mmap.close()
+
+
+def attach(name):
+    """Attach read-only to an existing shared memory block
+
+    Parameters
+    ----------
+    name : str
+        Name of the block.
+
+    Returns
+    -------
+    ReadOnlyBlock
+        The block.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the block does not exist.
+    """
+    return ReadOnlyBlock(name)
@@ -0,0 +1,825 @@
+"""Spectral estimation
+
+Welch estimates of whole time series batch the segments of all
+channels into one FFT call on `scipy.fft` worker threads.
+For long durations, time series are consumed chunk by chunk and only
+the Welch averages are kept, so memory is bounded by the chunk and
+segment lengths instead of the duration.
+The estimates follow `scipy.signal.welch`, `scipy.signal.csd` and
+`scipy.signal.coherence` with a Hann window, constant detrending and
+one-sided density scaling.
+"""
+import functools
+
+import numpy as np
+import scipy.fft
+import scipy.signal
+
+
+@functools.lru_cache(maxsize=16)
+def get_window(nperseg):
+    """Hann window, cached across channels and calls
+
+    Parameters
+    ----------
+    nperseg : int
+        Segment length.
+
+    Returns
+    -------
+    array
+        The read-only window.
+    """
+    window = scipy.signal.get_window("hann", nperseg)
+    window.flags.writeable = False
+    return window
+
+
+def get_segment_spectra(data, nperseg, noverlap, workers=None):
+    """FFTs of the detrended and windowed Welch segments
+
+    The segments of all channels are transformed in one batched FFT.
+    scipy.fft reuses its plans for repeated lengths.
+
+    Parameters
+    ----------
+    data : array
+        Time series with the time as the last axis,
+        e.g. shape (n_channels, n).
+    nperseg : int
+        Segment length.
+    noverlap : int
+        Overlap of consecutive segments.
+    workers : int, optional
+        Number of FFT worker threads, -1 for all cores.
+        Defaults None, which uses one.
+
+    Returns
+    -------
+    array
+        The spectra with shape data.shape[:-1] + (n_segments, n_f).
+    """
+    nperseg = int(nperseg)
+    step = nperseg - int(noverlap)
+    segments = np.lib.stride_tricks.sliding_window_view(
+        data, nperseg, axis=-1)[..., ::step, :]
+    segments = segments - segments.mean(axis=-1, keepdims=True)
+    segments *= get_window(nperseg)
+    return scipy.fft.rfft(segments, axis=-1, workers=workers)
+
+
+def get_density_scale(fs, nperseg):
+    """One-sided density scale of the Hann window
+
+    Parameters
+    ----------
+    fs : float
+        Sample rate.
+    nperseg : int
+        Segment length.
+
+    Returns
+    -------
+    array
+        The scale of each frequency.
+    """
+    scale = np.full(nperseg//2+1, 2 / (fs*np.sum(get_window(nperseg)**2)))
+    # Not doubled at 0 Hz and at the Nyquist frequency.
+    scale[0] /= 2
+    if nperseg % 2 == 0:
+        scale[-1] /= 2
+    return scale
+
+
+def welch(data, fs, nperseg, noverlap, workers=None):
+    """Power spectral densities as `scipy.signal.welch`
+
+    Parameters
+    ----------
+    data : array
+        Time series with the time as the last axis,
+        e.g. shape (n_channels, n).
+    fs : float
+        Sample rate.
+    nperseg : int
+        Segment length.
+    noverlap : int
+        Overlap of consecutive segments.
+    workers : int, optional
+        Number of FFT worker threads, -1 for all cores.
+        Defaults None, which uses one.
+
+    Returns
+    -------
+    f : array
+        Frequency array.
+    psd : array
+        The power spectral densities with shape data.shape[:-1] + (n_f,).
+    """
+    nperseg = int(nperseg)
+    spectra = get_segment_spectra(data, nperseg, noverlap, workers)
+    psd = np.mean(abs(spectra)**2, axis=-2) * get_density_scale(fs, nperseg)
+    return scipy.fft.rfftfreq(nperseg, 1/fs), psd
+
+
+def coherence(x, y, fs, nperseg, noverlap, workers=None):
+    """Magnitude squared coherence as `scipy.signal.coherence`
+
+    Both time series are transformed in one batched FFT.
+
+    Parameters
+    ----------
+    x : array
+        Time series x.
+    y : array
+        Time series y, with the length of x.
+    fs : float
+        Sample rate.
+    nperseg : int
+        Segment length.
+    noverlap : int
+        Overlap of consecutive segments.
+    workers : int, optional
+        Number of FFT worker threads, -1 for all cores.
+        Defaults None, which uses one.
+
+    Returns
+    -------
+    f : array
+        Frequency array.
+    coh : array
+        The coherence.
+    """
+    nperseg = int(nperseg)
+    spectra = get_segment_spectra(
+        np.stack([x, y]), nperseg, noverlap, workers)
+    pxx, pyy = np.mean(abs(spectra)**2, axis=-2)
+    pxy = np.mean(spectra[0].conj() * spectra[1], axis=-2)
+    # The density scale cancels out.
+    return scipy.fft.rfftfreq(nperseg, 1/fs), abs(pxy)**2 / (pxx*pyy)
+
+
+class Welch:
+    """Welch cross spectral densities accumulated segment by segment
+
+    Parameters
+    ----------
+    fs : float
+        Sample rate.
+    nperseg : int
+        Segment length.
+    noverlap : int
+        Overlap of consecutive segments.
+    n_channels : int, optional
+        Number of channels.
+        Defaults 1.
+    workers : int, optional
+        Number of FFT worker threads, -1 for all cores.
+        Defaults None, which uses one.
+    """
+    def __init__(self, fs, nperseg, noverlap, n_channels=1, workers=None):
+        """Constructor
+
+        Parameters
+        ----------
+        fs : float
+            Sample rate.
+        nperseg : int
+            Segment length.
+        noverlap : int
+            Overlap of consecutive segments.
+        n_channels : int, optional
+            Number of channels.
+            Defaults 1.
+        workers : int, optional
+            Number of FFT worker threads, -1 for all cores.
+            Defaults None, which uses one.
+        """
+        self.fs = fs
+        self.nperseg = int(nperseg)
+        self.noverlap = int(noverlap)
+        if not 0 <= self.noverlap < self.nperseg:
+            raise ValueError("noverlap must be less than nperseg.")
+        self.n_channels = n_channels
+        self.workers = workers
+        self.window = get_window(self.nperseg)
+        self.f = scipy.fft.rfftfreq(self.nperseg, 1/fs)
+        self.buffer = np.zeros((n_channels, 0))
+        self.sum = np.zeros((n_channels, n_channels, len(self.f)), complex)
+        self.n_segments = 0
+
+    def feed(self, *chunks):
+        """Consume a chunk of each channel
+
+        Parameters
+        ----------
+        *chunks : array
+            Consecutive samples of each channel, with equal lengths.
+        """
+        chunk = np.array(chunks, dtype=float, ndmin=2)
+        if chunk.shape[0] != self.n_channels:
+            raise ValueError(f"Expected {self.n_channels} channels, "
+                             f"got {chunk.shape[0]}.")
+        buffer = np.concatenate([self.buffer, chunk], axis=-1)
+        step = self.nperseg - self.noverlap
+        start = 0
+        # One segment at a time, so that only one is held in memory.
+        while start + self.nperseg <= buffer.shape[-1]:
+            self.add(self.get_cross(buffer[:, start:start+self.nperseg]))
+            start += step
+
+        # Keep the samples of the next segment only.
+        self.buffer = buffer[:, start:].copy()
+
+    def get_cross(self, segment):
+        """Cross spectra of a segment
+
+        Parameters
+        ----------
+        segment : array
+            Samples of each channel with shape (n_channels, nperseg).
+
+        Returns
+        -------
+        cross : array
+            conj(X_k) X_l as in scipy.signal.csd, with shape
+            (n_channels, n_channels, n_f).
+        """
+        segment = segment - segment.mean(axis=-1, keepdims=True)
+        segment *= self.window
+        spectrum = scipy.fft.rfft(segment, axis=-1, workers=self.workers)
+        cross = np.empty((self.n_channels,)*2 + spectrum.shape[-1:], complex)
+        for k in range(self.n_channels):
+            for l in range(self.n_channels):
+                cross[k, l] = spectrum[k].conj() * spectrum[l]
+        return cross
+
+    def add(self, cross):
+        """Add the cross spectra of a segment to the average
+
+        Parameters
+        ----------
+        cross : array
+            The cross spectra returned by get_cross.
+        """
+        self.sum += cross
+        self.n_segments += 1
+
+    def get_csd(self, k=0, l=0):
+        """Averaged cross spectral density
+
+        Parameters
+        ----------
+        k : int, optional
+            Channel x.
+            Defaults 0.
+        l : int, optional
+            Channel y.
+            Defaults 0.
+
+        Returns
+        -------
+        f : array
+            Frequency array.
+        csd : array
+            The one-sided cross spectral density of x and y.
+        """
+        if self.n_segments == 0:
+            raise ValueError("Not enough samples for one segment.")
+        scale = get_density_scale(self.fs, self.nperseg)
+        return self.f, self.sum[k, l] / self.n_segments * scale
+
+    def get_psd(self, k=0):
+        """Averaged power spectral density
+
+        Parameters
+        ----------
+        k : int, optional
+            The channel.
+            Defaults 0.
+
+        Returns
+        -------
+        f : array
+            Frequency array.
+        psd : array
+            The one-sided power spectral density.
+        """
+        f, psd = self.get_csd(k, k)
+        return f, psd.real
+
+    def get_coherence(self, k=0, l=1):
+        """Magnitude squared coherence
+
+        Parameters
+        ----------
+        k : int, optional
+            Channel x.
+            Defaults 0.
+        l : int, optional
+            Channel y.
+            Defaults 1.
+
+        Returns
+        -------
+        f : array
+            Frequency array.
+        coh : array
+            The coherence of x and y.
+        """
+        f, pxy = self.get_csd(k, l)
+        _, pxx = self.get_psd(k)
+        _, pyy = self.get_psd(l)
+        return f, abs(pxy)**2 / (pxx*pyy)
+
+
+class SlidingWelch(Welch):
+    """Welch estimates of sliding windows sharing their segments
+
+    Windows of `window_length` samples start every `stride` samples.
+    The cross spectra of each segment are computed once and shared by
+    the overlapping windows whose segment grids coincide, i.e. when the
+    stride is a multiple of nperseg - noverlap.
+    Only the samples and segments of unfinished windows are kept.
+
+    Parameters
+    ----------
+    fs : float
+        Sample rate.
+    nperseg : int
+        Segment length.
+    noverlap : int
+        Overlap of consecutive segments.
+    n_channels : int
+        Number of channels.
+    window_length : int
+        Window length in samples.
+    stride : int
+        Samples between the starts of consecutive windows.
+    workers : int, optional
+        Number of FFT worker threads, -1 for all cores.
+        Defaults None, which uses one.
+    """
+    def __init__(self, fs, nperseg, noverlap, n_channels, window_length,
+                 stride, workers=None):
+        """Constructor
+
+        Parameters
+        ----------
+        fs : float
+            Sample rate.
+        nperseg : int
+            Segment length.
+        noverlap : int
+            Overlap of consecutive segments.
+        n_channels : int
+            Number of channels.
+        window_length : int
+            Window length in samples.
+        stride : int
+            Samples between the starts of consecutive windows.
+        workers : int, optional
+            Number of FFT worker threads, -1 for all cores.
+            Defaults None, which uses one.
+        """
+        super().__init__(fs, nperseg, noverlap, n_channels, workers)
+        if stride <= 0:
+            raise ValueError("stride must be positive.")
+        self.window_length = int(window_length)
+        self.stride = int(stride)
+        self.buffer_start = 0  # Sample index of the first buffered sample.
+        self.segments = {}  # Cross spectra keyed by segment start.
+        self.n_windows = 0  # Number of completed windows.
+
+    def drop(self):
+        """Drop the samples and segments before the next window"""
+        start = self.n_windows * self.stride
+        n_drop = min(max(start-self.buffer_start, 0), self.buffer.shape[-1])
+        self.buffer = self.buffer[:, n_drop:]
+        self.buffer_start += n_drop
+        self.segments = {
+            segment_start: cross
+            for segment_start, cross in self.segments.items()
+            if segment_start >= start}
+
+    def feed(self, *chunks):
+        """Consume a chunk of each channel
+
+        Parameters
+        ----------
+        *chunks : array
+            Consecutive samples of each channel, with equal lengths.
+
+        Returns
+        -------
+        list of Welch
+            The estimates of the windows completed by the chunk.
+        """
+        chunk = np.array(chunks, dtype=float, ndmin=2)
+        if chunk.shape[0] != self.n_channels:
+            raise ValueError(f"Expected {self.n_channels} channels, "
+                             f"got {chunk.shape[0]}.")
+        self.buffer = np.concatenate([self.buffer, chunk], axis=-1)
+        self.drop()
+
+        step = self.nperseg - self.noverlap
+        windows = []
+        while True:
+            start = self.n_windows * self.stride
+            end = start + self.window_length
+            if self.buffer_start + self.buffer.shape[-1] < end:
+                break
+            welch = Welch(self.fs, self.nperseg, self.noverlap,
+                          self.n_channels, self.workers)
+            for segment_start in range(start, end-self.nperseg+1, step):
+                if segment_start not in self.segments:
+                    offset = segment_start - self.buffer_start
+                    self.segments[segment_start] = self.get_cross(
+                        self.buffer[:, offset:offset+self.nperseg])
+                welch.add(self.segments[segment_start])
+            windows.append(welch)
+            self.n_windows += 1
+            self.drop()
+
+        return windows
+
+
+class Decimator:
+    """Down sample chunk by chunk
+
+    A causal version of `scipy.signal.decimate(ts, q, ftype="fir")`.
+    The FIR filter state is carried across chunks and the group delay
+    is removed, so the output is aligned with the input.
+
+    Parameters
+    ----------
+    q : int
+        Down sampling factor.
+    """
+    def __init__(self, q):
+        """Constructor
+
+        Parameters
+        ----------
+        q : int
+            Down sampling factor.
+        """
+        self.q = int(q)
+        n = 20 * self.q
+        self.b = scipy.signal.firwin(n+1, 1/self.q, window="hamming")
+        self.zi = np.zeros(n)
+        self.delay = n // 2  # Samples to drop.
+        self.phase = 0  # Offset of the next kept sample in a chunk.
+
+    def feed(self, chunk):
+        """Down sample a chunk
+
+        Parameters
+        ----------
+        chunk : array
+            Consecutive samples.
+
+        Returns
+        -------
+        array
+            The down sampled samples.
+        """
+        filtered, self.zi = scipy.signal.lfilter(
+            self.b, 1, chunk, zi=self.zi)
+        drop = min(self.delay, len(filtered))
+        filtered = filtered[drop:]
+        self.delay -= drop
+        decimated = filtered[self.phase::self.q]
+        self.phase = (self.phase - len(filtered)) % self.q
+        return decimated
+
+    def flush(self):
+        """Down sample the samples held back by the group delay
+
+        The input is zero-padded as in `scipy.signal.decimate`.
+
+        Returns
+        -------
+        array
+            The remaining down sampled samples.
+        """
+        return self.feed(np.zeros(len(self.zi)//2))
+
+
+class Spectra:
+    """Welch estimates of named channels
+
+    Parameters
+    ----------
+    sample_rates : dict
+        Sample rates keyed by channel name.
+    products : dict
+        (channels, decimators, Welch) keyed by channel name for the ASDs
+        and by channel pairs for the coherences.
+    asd : dict
+        (product key, channel index) of the ASD of each channel.
+    """
+    def __init__(self, sample_rates, products, asd):
+        """Constructor
+
+        Parameters
+        ----------
+        sample_rates : dict
+            Sample rates keyed by channel name.
+        products : dict
+            (channels, decimators, Welch) keyed by channel name for the
+            ASDs and by channel pairs for the coherences.
+        asd : dict
+            (product key, channel index) of the ASD of each channel.
+        """
+        self.sample_rates = sample_rates
+        self.products = products
+        self.asd = asd
+
+    def get_asd(self, channel):
+        """Amplitude spectral density of a channel
+
+        Returns
+        -------
+        f : array
+            Frequency array.
+        asd : array
+            The amplitude spectral density.
+        """
+        key, index = self.asd[channel]
+        _, _, welch = self.products[key]
+        f, psd = welch.get_psd(index)
+        return f, psd**.5
+
+    def get_coherence(self, channel1, channel2):
+        """Coherence of two channels
+
+        Returns
+        -------
+        f : array
+            Frequency array.
+        coh : array
+            The coherence.
+        """
+        _, _, welch = self.products[(channel1, channel2)]
+        return welch.get_coherence()
+
+
+class SpectralEstimator(Spectra):
+    """Amplitude spectral densities and coherences of named channels
+
+    Parameters
+    ----------
+    sample_rates : dict
+        Sample rates keyed by channel name.
+    duration : float
+        Total duration in seconds.
+    n_average : int
+        Number of Welch averages.
+    overlap : float
+        Welch overlap.
+    asd : list of str
+        Channels of the amplitude spectral densities.
+    coherence : list of (str, str)
+        Channel pairs of the coherences.
+        They are estimated at the lower sample rate of the pair.
+    workers : int, optional
+        Number of FFT worker threads, -1 for all cores.
+        Defaults None, which uses one.
+    """
+    def __init__(self, sample_rates, duration, n_average, overlap,
+                 asd=(), coherence=(), workers=None):
+        """Constructor
+
+        Parameters
+        ----------
+        sample_rates : dict
+            Sample rates keyed by channel name.
+        duration : float
+            Total duration in seconds.
+        n_average : int
+            Number of Welch averages.
+        overlap : float
+            Welch overlap.
+        asd : list of str
+            Channels of the amplitude spectral densities.
+        coherence : list of (str, str)
+            Channel pairs of the coherences.
+            They are estimated at the lower sample rate of the pair.
+        workers : int, optional
+            Number of FFT worker threads, -1 for all cores.
+            Defaults None, which uses one.
+        """
+        super().__init__(sample_rates, {}, {})
+        self.workers = workers
+        self.n_average = n_average
+        self.overlap = overlap
+        self.duration = duration
+
+        for channels in coherence:
+            fs = min(sample_rates[channel] for channel in channels)
+            decimators = [
+                Decimator(int(sample_rates[channel]/fs))
+                if sample_rates[channel] > fs else None
+                for channel in channels]
+            self.products[tuple(channels)] = (
+                list(channels), decimators, self.get_welch(fs, 2))
+
+        # (product, channel index) of the ASDs.
+        # The ASD of a channel that is not decimated in a coherence
+        # product is taken from it instead of being accumulated twice.
+        # The other channels of the same sample rate share a product,
+        # so their segments are transformed in one FFT.
+        groups = {}
+        for channel in asd:
+            for key, (channels, decimators, _) in self.products.items():
+                if (channel, None) in zip(channels, decimators):
+                    self.asd[channel] = (key, channels.index(channel))
+                    break
+            else:
+                groups.setdefault(sample_rates[channel], []).append(channel)
+        for fs, channels in groups.items():
+            key = ("asd", fs)
+            self.products[key] = (
+                channels, [None]*len(channels),
+                self.get_welch(fs, len(channels)))
+            for index, channel in enumerate(channels):
+                self.asd[channel] = (key, index)
+
+        # Samples waiting for the other channels of a product,
+        # e.g. while a decimator fills its delay.
+        self.pending = {
+            key: [np.zeros(0) for _ in channels]
+            for key, (channels, _, _) in self.products.items()}
+
+    def get_welch(self, fs, n_channels):
+        """Welch accumulator with the segment length of `Data.ts2asd`"""
+        n_samples = self.duration * fs
+        nperseg = n_samples / ((1+(1-self.overlap)*(self.n_average-1)))
+        noverlap = self.overlap * nperseg
+        return Welch(fs, int(nperseg), int(noverlap), n_channels,
+                     self.workers)
+
+    def feed(self, chunks):
+        """Consume a chunk of each channel
+
+        Parameters
+        ----------
+        chunks : dict
+            Consecutive samples keyed by channel name,
+            covering the same time span.
+        """
+        for key, (channels, decimators, welch) in self.products.items():
+            data = []
+            for channel, decimator, pending in zip(
+                    channels, decimators, self.pending[key]):
+                chunk = np.asarray(chunks[channel], dtype=float)
+                if decimator is not None:
+                    chunk = decimator.feed(chunk)
+                data.append(np.concatenate([pending, chunk]))
+            length = min(len(chunk) for chunk in data)
+            self.feed_product(key, [chunk[:length] for chunk in data])
+            self.pending[key] = [chunk[length:] for chunk in data]
+
+    def feed_product(self, key, data):
+        """Feed aligned samples to the accumulator of a product
+
+        Parameters
+        ----------
+        key : str or tuple of str
+            The product.
+        data : list of array
+            Samples of the channels of the product, with equal lengths.
+        """
+        _, _, welch = self.products[key]
+        welch.feed(*data)
+
+    def flush(self):
+        """Consume the samples held back by the decimators
+
+        Call once after the last chunk.
+        """
+        for key, (channels, decimators, welch) in self.products.items():
+            data = [
+                np.concatenate([pending, decimator.flush()])
+                if decimator is not None else pending
+                for decimator, pending in zip(decimators, self.pending[key])]
+            length = min(len(chunk) for chunk in data)
+            self.feed_product(key, [chunk[:length] for chunk in data])
+            self.pending[key] = [chunk[length:] for chunk in data]
+
+
+class SlidingSpectralEstimator(SpectralEstimator):
+    """Spectra of sliding windows over a continuous stretch
+
+    The stretch is consumed chunk by chunk and the spectra of each
+    window are returned as soon as the window is complete.
+    Welch segments shared by overlapping windows are computed once.
+
+    Parameters
+    ----------
+    sample_rates : dict
+        Sample rates keyed by channel name.
+    duration : float
+        Window length in seconds.
+    stride : float
+        Time between the starts of consecutive windows in seconds.
+    n_average : int
+        Number of Welch averages.
+    overlap : float
+        Welch overlap.
+    asd : list of str
+        Channels of the amplitude spectral densities.
+    coherence : list of (str, str)
+        Channel pairs of the coherences.
+    workers : int, optional
+        Number of FFT worker threads, -1 for all cores.
+        Defaults None, which uses one.
+    """
+    def __init__(self, sample_rates, duration, stride, n_average, overlap,
+                 asd=(), coherence=(), workers=None):
+        """Constructor
+
+        Parameters
+        ----------
+        sample_rates : dict
+            Sample rates keyed by channel name.
+        duration : float
+            Window length in seconds.
+        stride : float
+            Time between the starts of consecutive windows in seconds.
+        n_average : int
+            Number of Welch averages.
+        overlap : float
+            Welch overlap.
+        asd : list of str
+            Channels of the amplitude spectral densities.
+        coherence : list of (str, str)
+            Channel pairs of the coherences.
+        workers : int, optional
+            Number of FFT worker threads, -1 for all cores.
+            Defaults None, which uses one.
+        """
+        self.stride = stride
+        super().__init__(sample_rates, duration, n_average, overlap,
+                         asd=asd, coherence=coherence, workers=workers)
+        # Completed window estimates of each product, oldest first.
+        self.windows = {key: [] for key in self.products}
+
+    def get_welch(self, fs, n_channels):
+        """Sliding Welch accumulator with the segments of `Data.ts2asd`"""
+        welch = super().get_welch(fs, n_channels)
+        return SlidingWelch(
+            fs, welch.nperseg, welch.noverlap, n_channels,
+            int(round(self.duration*fs)), int(round(self.stride*fs)),
+            self.workers)
+
+    def feed_product(self, key, data):
+        """Feed aligned samples to the accumulator of a product"""
+        _, _, welch = self.products[key]
+        self.windows[key] += welch.feed(*data)
+
+    def pop_windows(self):
+        """Spectra of the windows completed by all products
+
+        Returns
+        -------
+        list of Spectra
+            The spectra, oldest first.
+        """
+        n_windows = min(len(windows) for windows in self.windows.values())
+        spectra = []
+        for _ in range(n_windows):
+            products = {
+                key: (channels, None, self.windows[key].pop(0))
+                for key, (channels, _, _) in self.products.items()}
+            spectra.append(Spectra(self.sample_rates, products, self.asd))
+        return spectra
+
+    def feed(self, chunks):
+        """Consume a chunk of each channel
+
+        Parameters
+        ----------
+        chunks : dict
+            Consecutive samples keyed by channel name,
+            covering the same time span.
+
+        Returns
+        -------
+        list of Spectra
+            The spectra of the windows completed by the chunk.
+        """
+        super().feed(chunks)
+        return self.pop_windows()
+
+    def flush(self):
+        """Consume the samples held back by the decimators
+
+        Returns
+        -------
+        list of Spectra
+            The spectra of the remaining complete windows.
+        """
+        super().flush()
+        return self.pop_windows()